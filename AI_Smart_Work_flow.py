@@ -1,54 +1,161 @@
+import sys
 import time
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Tuple, Union
 import logging
-import numpy as np
-from Plane_Layers import PlaneLayer
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation, PillowWriter
 
-from Plane_Layers import PlaneLayer
-from Animations import create_pressure_animation
-
-# تهيئة السجل (Logging)
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from Plane_Layers import PlaneLayer, PlaneLayerSet
+from Plane_Index import PlaneGridIndex, overlapping_pairs
+from Parallel_Render import DependencyExecutor, dry_run, step_time
+from Integration_Groups import GROUPING_STRATEGIES, select_groups
+from Event_Log import (
+    EventLog,
+    EVENT_ANIMATION, EVENT_INTERACTION, EVENT_INTERACTION_SKIPPED, EVENT_PAIR_FORCE,
+    EVENT_PLANE_CREATED, EVENT_PROXY_APPLIED, EVENT_RENDER_TOTAL, EVENT_STEP, EVENT_TASK_ADDED,
+    TABLE_ANIMATION,
+)
+from Instrumentation import (
+    Metrics, default_metrics, instrumented,
+    STAGE_CHAIN_SIMULATION, STAGE_PLANE_CREATION,
+    STAGE_RENDERING, STAGE_SEQUENCING,
+)
 
-"""
-Professional animated demo: Invisible Plane Layer
-- Slow pressure buildup on the fish through the invisible plane
-- Exports GIF
-"""
 
 # ────────────────────────────────────────────────
-# إعدادات مشتركة
+# طبقة الرسم (matplotlib + Animations) تُحمَّل عند أول أنيميشن فقط
+# – عمال الجدولة لا يدفعون تكلفة استيراد matplotlib
 # ────────────────────────────────────────────────
-x = np.linspace(-6, 6, 400)
-base_height = 1.25
-
-# شكل السمكة الأصلي
-y_original = (
-    base_height
-    + 0.45 * np.sin(1.15 * x)
-    + 0.18 * np.cos(5 * x)
-    + 0.15 * np.cos(3 * x)
-    - 0.12 * (np.abs(x) / 6) ** 1.2
-    + 0.3 * np.sin(1.2 * x)
-)
+_animations = None
+
+
+def _load_animations():
+    """استيراد Animations بـ backend غير تفاعلي (Agg) ما لم يكن pyplot محمّلًا بالفعل"""
+    global _animations
+    if _animations is None:
+        import matplotlib
+        if "matplotlib.pyplot" not in sys.modules:
+            matplotlib.use("Agg")
+        import Animations
+        _animations = Animations
+    return _animations
+
+
+def create_pressure_animation(*args, **kwargs) -> str:
+    """Animations.create_pressure_animation بتحميل كسول"""
+    return _load_animations().create_pressure_animation(*args, **kwargs)
+
+
+def create_chain_animation(*args, **kwargs) -> str:
+    """Animations.create_chain_animation بتحميل كسول"""
+    return _load_animations().create_chain_animation(*args, **kwargs)
+
+
+# كاش قوى الأزواج: حد أقصى للمدخلات، وعدد الأزواج الناقصة الذي يستحق حسابًا vectorized
+PAIR_FORCE_CACHE_LIMIT = 100_000
+PAIR_FORCE_BATCH_MIN = 32
+
+
+# قوى افتراضية لكل نوع تفاعل (تُستخدم لو ما اتمررتش plane_force)
+INTERACTION_FORCE_MAP: Dict[str, float] = {
+    "touch": 2.0,
+    "hold": 5.0,
+    "press": 8.0,
+    "grip": 10.0,
+}
+DEFAULT_INTERACTION_FORCE = 5.0
+
+# معاملات السيناريو (مشتركة مع Parameter_Sweep)
+DEFORMATION_BONUS_FACTOR = 0.38                 # متوسط: bonus = weight × pressure_factor × 0.38
+DEFAULT_INTERACTION_POSITION = [0.0, 1.0, 0.0]
+INTERACTION_SECOND_FORCE_RATIO = 0.7            # الطرف الثاني أقل قوة
+INTERACTION_PLANE_GAP = 0.08                    # مسافة y بين طبقتي التفاعل
+INTERACTION_PLANE_DEPTH = 0.05
+PLANE_TASK_COMPLEXITY = 1.0                     # complexity مهام add_plane_task / طبقات التفاعل
+
+
+def _plane_task(name: str, plane: PlaneLayer, complexity: float = PLANE_TASK_COMPLEXITY) -> Dict:
+    """مهمة طبقة (add_plane_task / add_interactions) – بنفس حقول الرندر التي يضعها add_task"""
+    return {"name": name, "type": "plane", "complexity": complexity, "is_plane": True, "plane": plane}
 
-# إعدادات الـ animation
-frames = 120
-max_pressure_frame = 70
-fps = 24
 
 class AISmartWorkflow:
-    def __init__(self):
+    def __init__(self, metrics: Metrics = None, render_queue=None, events: EventLog = None):
         self.tasks: List[Dict] = []
+        self.task_index: Dict[str, Dict] = {}    # اسم المهمة → المهمة (بحث O(1))
         self.dependencies: Dict[str, List[str]] = {}
         self.integration_rules: Dict[tuple, int] = {}
         self.planes: Dict[str, PlaneLayer] = {}
+        self.plane_index = PlaneGridIndex()
+        # (a, b) → (version a، version b، x2_effected) – يسقط تلقائيًا لما أي طبقة تتغير
+        self._pair_forces: Dict[Tuple[str, str], Tuple[int, int, float]] = {}
         self.render_time = 0.0
+        self.metrics = metrics or default_metrics()    # قياس فعلي لكل مرحلة (زمن، CPU، ذاكرة)
+        # أحداث المهام / القوى / الخطوات – النص يُبنى عند الطلب (events.lines / events.dump)
+        self.events = events if events is not None else EventLog()
         # جديد: تخزين chains التلقائية
         self.auto_chains: List[List[str]] = []                               # وقت الرندر
-        
+        # RenderQueue → أنيميشن التفاعلات التلقائية في الخلفية بدل الترميز داخل add_task
+        self.render_queue = render_queue
+        self._preview_speed: Dict[str, float] = None    # معاملات سرعة الـ preview لهذا الـ workflow (تتعلم)
+
+        # خطة التنفيذ المخزنة – تُحدَّث تدريجيًا مع كل add_task / set_integration_rule
+        self._plan_planes: List[List[str]] = []
+        self._plan_plane_names = set()
+        self._plan_rest: Dict[str, None] = {}    # المهام غير الـ plane بترتيب الإضافة
+        self._plan_groups: List[List[str]] = []
+        self.grouping_strategy = "priority"      # "priority" أو "cost" (set_grouping_strategy)
+        self._plan_grouped = set()
+        self._groups_dirty = False
+        self._rules_by_task: Dict[str, List[tuple]] = {}
+        self._depended_on = set()               # كل اسم ظهر في dependencies مهمة ما
+        self._sequence_cache: List[List[str]] = None
+
+    def get_task(self, name: str) -> Dict:
+        return self.task_index[name]
+
+    def register_task(self, task: Dict, dependencies: List[str]):
+        """إضافة مهمة جاهزة (dict بحقولها النهائية) بدون add_task – للتحميل من ملف"""
+        self._register_task(task, dependencies)
+
+    def _register_task(self, task: Dict, dependencies: List[str]):
+        """إضافة مهمة للقائمة والفهرس وتحديث الخطة المخزنة بدل إعادة بنائها"""
+        name = task["name"]
+        self.tasks.append(task)
+        self.task_index[name] = task
+        self.dependencies[name] = dependencies
+        if self.grouping_strategy == "cost" and self.integration_rules and name in self._depended_on:
+            # اختيار "cost" يعتمد على أعماق الـ DAG: مهمة تعتمد عليها مهام موجودة قد تغيّر أعماقها
+            # (مهمة بلا تابعين لا تغيّر عمق أي عضو في قاعدة – وعضوية القواعد تُفحص بالأسفل)
+            self._groups_dirty = True
+            self._sequence_cache = None
+        self._depended_on.update(dependencies)
+
+        is_plane = bool(task.get("is_plane", False))
+        if is_plane and name in self._plan_rest or not is_plane and name in self._plan_plane_names:
+            # نفس الاسم تحوّل بين plane وغير plane → يُحذف من مكانه القديم أولًا
+            self._plan_rest.pop(name, None)
+            if name in self._plan_plane_names:
+                self._plan_plane_names.discard(name)
+                self._plan_planes.remove([name])
+            self._groups_dirty = True
+            self._sequence_cache = None
+
+        if is_plane:
+            if name in self._plan_plane_names:
+                return
+            self._plan_plane_names.add(name)
+            self._plan_planes.append([name])
+            if self._sequence_cache is not None:
+                self._sequence_cache.insert(len(self._plan_planes) - 1, [name])
+        elif name not in self._plan_rest:
+            self._plan_rest[name] = None
+            if self._sequence_cache is not None:
+                self._sequence_cache.append([name])
+
+        # المهمة عضو في قاعدة دمج → اختيار المجموعات قد يتغير
+        if name in self._rules_by_task:
+            self._groups_dirty = True
+            self._sequence_cache = None
+
     def add_task(
         self,
         name: str,
@@ -74,25 +181,27 @@ class AISmartWorkflow:
             "interacts_with": interacts_with,
             "interaction_type": interaction_type,
         }
-        self.tasks.append(task)
-        self.dependencies[name] = dependencies
+        self._register_task(task, dependencies)
+        self.events.record(EVENT_TASK_ADDED, name, a=complexity)
 
         if is_plane:
             if plane_position is None:
                 plane_position = [0.0, 0.0, 0.0]
             force = plane_force if plane_force is not None else (proxy_weight or 0.0)
 
-            plane = PlaneLayer(
-                name=name,
-                position=plane_position,
-                force=force
-            )
-            self.planes[name] = plane
+            with self.metrics.stage(STAGE_PLANE_CREATION):
+                plane = PlaneLayer(
+                    name=name,
+                    position=plane_position,
+                    force=force
+                )
+                self.planes[name] = plane
+                self.plane_index.add(plane)
             task["plane"] = plane
 
         if proxy_weight is not None:
             pressure_factor = proxy_pressure_factor
-            deform_bonus = proxy_weight * pressure_factor * 0.38  # متوسط
+            deform_bonus = proxy_weight * pressure_factor * DEFORMATION_BONUS_FACTOR
 
             task["physics_proxy"] = {
                 "weight_kg": proxy_weight,
@@ -102,33 +211,11 @@ class AISmartWorkflow:
 
             task["complexity"] += deform_bonus
 
-            logging.info(
-                f"Physics proxy added to '{name}': weight={proxy_weight}kg → "
-                f"+{deform_bonus:.2f} complexity (factor={pressure_factor})"
-            )
+            self.events.record(EVENT_PROXY_APPLIED, name, a=proxy_weight, b=deform_bonus, c=pressure_factor)
              
-        # ─── الجزء الديناميكي الجديد ───
-        if interaction_type and interaction_with:
-            self._auto_create_interaction_planes(
-                task_name=name,
-                interaction_with=interaction_with,
-                interaction_type=interaction_type,
-                plane_position=plane_position
-            )
-               
-        # ────── الجزء الديناميكي الجديد ──────
-        if interacts_with and interaction_type:
-            self._auto_create_interaction_planes(
-                name,
-                interacts_with,
-                interaction_type,
-                plane_position,
-                plane_force,
-                interaction_force_multiplier
-            )
         # ────── الجزء الديناميكي ──────
         if interacts_with and interaction_type:
-            if interacts_with not in self.dependencies:
+            if interacts_with not in self.task_index:
                 logging.warning(f"المهمة '{interacts_with}' غير موجودة بعد – سيتم الإنشاء لاحقًا")
                 return
 
@@ -147,16 +234,17 @@ class AISmartWorkflow:
         position: List[float],
         force: float,
         depth: float = 1.0,
-        dependencies: List[str] = None
+        dependencies: List[str] = None,
+        complexity: float = PLANE_TASK_COMPLEXITY,
     ):
-        plane = PlaneLayer(name, position, force, depth)
-        self.planes[name] = plane
-        self.tasks.append({"name": name, "type": "plane", "plane": plane})
-        self.dependencies[name] = dependencies or []
+        with self.metrics.stage(STAGE_PLANE_CREATION):
+            plane = PlaneLayer(name, position, force, depth)
+            self.planes[name] = plane
+            self.plane_index.add(plane)
+        self._register_task(_plane_task(name, plane, complexity), dependencies or [])
 
     def add_object_task(self, name: str, complexity: float, dependencies: List[str] = None):
-        self.tasks.append({"name": name, "type": "object", "complexity": complexity})
-        self.dependencies[name] = dependencies or []
+        self._register_task({"name": name, "type": "object", "complexity": complexity}, dependencies or [])
 
     def _auto_create_interaction_planes(
         self,
@@ -174,69 +262,207 @@ class AISmartWorkflow:
         - إضافة تلقائية للـ animation chain
         """
         # تحقق إن المهمتين موجودتين فعلاً
-        if task1_name not in [t["name"] for t in self.tasks] or task2_name not in [t["name"] for t in self.tasks]:
+        if task1_name not in self.task_index or task2_name not in self.task_index:
             logging.warning(f"مهمة '{task1_name}' أو '{task2_name}' غير موجودة – لا يمكن إنشاء تفاعل")
             return
 
         # قوى افتراضية من force_map
-        base_force = base_force or INTERACTION_FORCE_MAP.get(interaction_type, 5.0)
+        base_force = base_force or INTERACTION_FORCE_MAP.get(interaction_type, DEFAULT_INTERACTION_FORCE)
         force1 = base_force * multiplier
-        force2 = force1 * 0.7  # الطرف الثاني أقل قوة (يمكن تخصيصه لاحقًا)
+        force2 = force1 * INTERACTION_SECOND_FORCE_RATIO  # الطرف الثاني أقل قوة (يمكن تخصيصه لاحقًا)
 
         plane1_name = f"plane_{task1_name}_{interaction_type}"
         plane2_name = f"plane_{task2_name}_{interaction_type}"
 
         # شرط عدم التكرار (نفس الطبقة ما تُنشأ مرتين)
         if plane1_name in self.planes or plane2_name in self.planes:
-            logging.info(f"التفاعل '{interaction_type}' بين {task1_name} و {task2_name} موجود بالفعل – تجاهل")
+            self.events.record(EVENT_INTERACTION_SKIPPED, task1_name, task2_name, interaction_type)
             return
 
         # موقع افتراضي إذا ما مررش
-        pos1 = base_position or [0.0, 1.0, 0.0]
-        pos2 = [pos1[0], pos1[1] - 0.08, pos1[2]]  # قريب جدًا (المنتصف)
+        pos1 = base_position or DEFAULT_INTERACTION_POSITION
+        pos2 = [pos1[0], pos1[1] - INTERACTION_PLANE_GAP, pos1[2]]  # قريب جدًا (المنتصف)
 
         # إنشاء الطبقة الأولى
         self.add_plane_task(
             name=plane1_name,
             position=pos1,
             force=force1,
-            depth=0.05,
+            depth=INTERACTION_PLANE_DEPTH,
             dependencies=[task1_name]
         )
-        logging.info(f"أُنشئت طبقة تلقائية: {plane1_name} (force={force1:.1f})")
+        self.events.record(EVENT_PLANE_CREATED, plane1_name, a=force1)
 
         # إنشاء الطبقة الثانية
         self.add_plane_task(
             name=plane2_name,
             position=pos2,
             force=force2,
-            depth=0.05,
+            depth=INTERACTION_PLANE_DEPTH,
             dependencies=[task2_name]
         )
-        logging.info(f"أُنشئت طبقة تلقائية: {plane2_name} (force={force2:.1f})")
+        self.events.record(EVENT_PLANE_CREATED, plane2_name, a=force2)
 
         # ربط في chain تلقائي
         chain = [plane1_name, plane2_name]
         self.auto_chains.append(chain)  # لتتبع الـ chains التلقائية
         forces = self.simulate_chain(chain)
-        logging.info(f"تفاعل '{interaction_type}' أُنشئ تلقائيًا: {task1_name} ↔ {task2_name} → قوى: {forces}")
+        self.events.record(EVENT_INTERACTION, task1_name, task2_name, interaction_type, forces)
 
         # ربط تلقائي في الـ animation (لو الدالة موجودة)
         if hasattr(self, 'animate_interaction'):
             output_file = f"auto_{interaction_type}_{task1_name}_{task2_name}.gif"
-            self.animate_interaction(chain, output_file=output_file)
-            logging.info(f"تم إنشاء أنيميشن تلقائي: {output_file}")
-        
+            if self.render_queue is not None:
+                self.queue_animation(chain, output_file=output_file)
+                self.events.record(EVENT_ANIMATION, output_file, a=True)
+            else:
+                self.animate_interaction(chain, output_file=output_file)
+                self.events.record(EVENT_ANIMATION, output_file, a=False)
+
+    def add_interactions(
+        self,
+        interaction_type: Union[str, Callable[[str, str], Optional[str]]] = "touch",
+        force_map: Dict[str, float] = None,
+        names: List[str] = None,
+        multiplier: float = 1.0,
+    ) -> Dict:
+        """
+        طبقات التفاعل لكل المشهد دفعة واحدة بدل add_task(interacts_with=...) لكل زوج
+        - الأزواج المتفاعلة = طبقات المهام المتداخلة (overlapping_pairs على names أو كل طبقات المهام)
+        - interaction_type: نوع واحد لكل الأزواج، أو دالة (task1, task2) → نوع أو None (تجاهل الزوج)
+        - force_map: نوع التفاعل → القوة (الافتراضي INTERACTION_FORCE_MAP)
+        - نفس أسماء وقوى _auto_create_interaction_planes، والطبقتان في منتصف المهمتين
+        - شرط عدم التكرار كما هو، بدون logging أو أنيميشن لكل زوج
+        يرجع chains الجديدة وقواها وعدد الأزواج المتجاهلة
+        """
+        force_map = INTERACTION_FORCE_MAP if force_map is None else force_map
+        if names is None:
+            # طبقات التفاعل نفسها ليست جزءًا من المشهد
+            generated = {plane for chain in self.auto_chains for plane in chain}
+            names = [n for n in self.planes if n in self.task_index and n not in generated]
+        missing = [n for n in names if n not in self.planes or n not in self.task_index]
+        if missing:
+            raise ValueError(f"مهام بدون طبقات: {missing}")
+
+        scene = self.plane_set(names)
+        first, second = overlapping_pairs(scene.positions, scene.radii)
+        midpoints = (scene.positions[first] + scene.positions[second]) * 0.5
+
+        chains: List[List[str]] = []
+        created: List[PlaneLayer] = []
+        skipped = 0
+        with self.metrics.stage(STAGE_PLANE_CREATION, mode="bulk"):
+            for i, j, middle in zip(first.tolist(), second.tolist(), midpoints.tolist()):
+                task1, task2 = scene.names[i], scene.names[j]
+                kind = interaction_type(task1, task2) if callable(interaction_type) else interaction_type
+                if kind is None:
+                    continue
+                plane1_name = f"plane_{task1}_{kind}"
+                plane2_name = f"plane_{task2}_{kind}"
+                if plane1_name in self.planes or plane2_name in self.planes:
+                    skipped += 1
+                    continue
+
+                force1 = force_map.get(kind, DEFAULT_INTERACTION_FORCE) * multiplier
+                force2 = force1 * INTERACTION_SECOND_FORCE_RATIO
+                pos2 = [middle[0], middle[1] - INTERACTION_PLANE_GAP, middle[2]]
+                for plane_name, position, force, task_name in (
+                    (plane1_name, middle, force1, task1),
+                    (plane2_name, pos2, force2, task2),
+                ):
+                    plane = PlaneLayer(plane_name, position, force, INTERACTION_PLANE_DEPTH)
+                    self.planes[plane_name] = plane
+                    created.append(plane)
+                    self._register_task(_plane_task(plane_name, plane), [task_name])
+                chains.append([plane1_name, plane2_name])
+            self.plane_index.add_many(created)
+        self.auto_chains.extend(chains)
+
+        with self.metrics.stage(STAGE_CHAIN_SIMULATION, mode="bulk"):
+            forces = self.pair_forces([(chain[0], chain[1]) for chain in chains])
+        logging.info(f"تفاعلات المشهد: {len(chains)} جديدة، {skipped} موجودة بالفعل")
+        return {"chains": chains, "forces": forces, "skipped": skipped}
+
+    def save(self, path: str) -> None:
+        """حفظ الـ workflow في ملف ثنائي مضغوط (Workflow_Store)"""
+        from Workflow_Store import save_workflow
+        save_workflow(self, path)
+
+    @classmethod
+    def load(cls, path: str, metrics: Metrics = None) -> 'AISmartWorkflow':
+        """تحميل workflow محفوظ بدون إعادة add_task (نسخة كاملة – Workflow_Store.rebuild_workflow)"""
+        from Workflow_Store import rebuild_workflow
+        return rebuild_workflow(path, metrics=metrics)
+
+    def plane_set(self, names: List[str] = None) -> PlaneLayerSet:
+        """نسخة struct-of-arrays من self.planes (أو من جزء منها) للحساب دفعة واحدة"""
+        if names is None:
+            return PlaneLayerSet.from_layers(self.planes)
+        return PlaneLayerSet.from_layers(self.planes[n] for n in names)
+
+    def pair_forces(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        planes[a].x2_effected(planes[b]) لكل زوج مع كاش على مستوى الـ workflow
+        المدخل صالح طالما version الطبقتين كما هو (position / force / depth / radius)
+        """
+        planes = self.planes
+        cache = self._pair_forces
+        result = [0.0] * len(pairs)
+        missing = []
+        for k, pair in enumerate(pairs):
+            entry = cache.get(pair)
+            if entry is not None and entry[0] == planes[pair[0]].version and entry[1] == planes[pair[1]].version:
+                result[k] = entry[2]
+            else:
+                missing.append(k)
+        if not missing:
+            return result
+
+        if len(missing) >= PAIR_FORCE_BATCH_MIN:
+            first = [pairs[k][0] for k in missing]
+            second = [pairs[k][1] for k in missing]
+            plane_set = self.plane_set(list(dict.fromkeys(first + second)))
+            values = plane_set.pair_x2_effected(first, second).tolist()
+        else:
+            values = [planes[pairs[k][0]].x2_effected(planes[pairs[k][1]]) for k in missing]
+
+        if len(cache) + len(missing) > PAIR_FORCE_CACHE_LIMIT:
+            cache.clear()
+        for k, value in zip(missing, values):
+            a, b = pairs[k]
+            cache[(a, b)] = (planes[a].version, planes[b].version, value)
+            result[k] = value
+        return result
+
+    def move_plane(self, name: str, position: List[float]) -> PlaneLayer:
+        """تحريك طبقة مع تحديث الفهرس المكاني"""
+        plane = self.planes[name]
+        plane.position = position
+        self.plane_index.update(plane)
+        return plane
+
+    def overlapping_planes(self, name: str) -> List[PlaneLayer]:
+        """الطبقات التي تتداخل مع طبقة معينة (عبر الفهرس بدل فحص كل الأزواج)"""
+        return self.plane_index.query(self.planes[name])
+
+    def overlapping_plane_pairs(self) -> List[tuple]:
+        """كل أزواج الطبقات المتداخلة في المشهد"""
+        return self.plane_index.pairs()
+
     def simulate_chain(self, chain: List[str]):
         """محاكاة سلسلة تفاعلات مع plane.x2"""
-        forces = []
-        for i in range(len(chain)-1):
-            layer1 = self.planes.get(chain[i])
-            layer2 = self.planes.get(chain[i+1])
-            if layer1 and layer2:
-                effected = layer1.x2_effected(layer2)
-                forces.append(effected)
-                logging.info(f"{chain[i]} → {chain[i+1]} : {effected:.3f}")
+        pairs = [
+            (chain[i], chain[i+1]) for i in range(len(chain)-1)
+            if chain[i] in self.planes and chain[i+1] in self.planes
+        ]
+        if not pairs:
+            return []
+
+        with self.metrics.stage(STAGE_CHAIN_SIMULATION):
+            forces = self.pair_forces(pairs)
+        record = self.events.record
+        for (name1, name2), effected in zip(pairs, forces):
+            record(EVENT_PAIR_FORCE, name1, name2, effected)
         return forces
 
     def set_integration_rule(self, group: List[str], priority: int):
@@ -245,112 +471,253 @@ class AISmartWorkflow:
             return
         
         sorted_group = tuple(sorted(group))
+        if sorted_group not in self.integration_rules:
+            for name in sorted_group:
+                self._rules_by_task.setdefault(name, []).append(sorted_group)
         self.integration_rules[sorted_group] = priority
-    
+        self._groups_dirty = True
+        self._sequence_cache = None
+
+    def set_grouping_strategy(self, strategy: str):
+        """
+        طريقة اختيار مجموعات الدمج:
+        - "priority": القواعد بترتيب الأولوية، أول قاعدة تأخذ أعضاءها (الافتراضي)
+        - "cost": أقل زمن رندر تقديري مع احترام الاعتماديات (Integration_Groups.select_groups)
+        """
+        if strategy not in GROUPING_STRATEGIES:
+            raise ValueError(f"استراتيجية غير معروفة: {strategy} (المتاح: {', '.join(GROUPING_STRATEGIES)})")
+        if strategy != self.grouping_strategy:
+            self.grouping_strategy = strategy
+            self._groups_dirty = True
+            self._sequence_cache = None
+
+    def _refresh_groups(self):
+        """إعادة اختيار مجموعات الدمج فقط (بدون المرور على كل المهام)"""
+        processed = set(self._plan_plane_names)
+        if self.grouping_strategy == "cost":
+            groups = select_groups(self.integration_rules, self.task_index, self.dependencies, processed)
+            for group in groups:
+                processed.update(group)
+        else:
+            groups = []
+            for group_tuple, prio in sorted(self.integration_rules.items(), key=lambda x: x[1]):
+                if all(t in self.task_index for t in group_tuple) and not any(t in processed for t in group_tuple):
+                    groups.append(list(group_tuple))
+                    processed.update(group_tuple)
+        self._plan_groups = groups
+        self._plan_grouped = processed - self._plan_plane_names
+        self._groups_dirty = False
+
+    @instrumented(STAGE_SEQUENCING)
     def optimize_sequence(self) -> List[List[str]]:
         """ترتيب ذكي: planes أولاً + دمج + باقي المهام"""
-        sequence = []
-        processed = set()
-
-        # 1. كل الـ planes أولاً
-        for task in self.tasks:
-            if task.get("is_plane", False) and task["name"] not in processed:
-                sequence.append([task["name"]])
-                processed.add(task["name"])
-
-        # 2. مجموعات الدمج حسب الأولوية
-        for group_tuple, prio in sorted(self.integration_rules.items(), key=lambda x: x[1]):
-            group = list(group_tuple)
-            if all(t in self.dependencies for t in group) and not any(t in processed for t in group):
-                sequence.append(group)
-                processed.update(group)
+        if self._groups_dirty:
+            self._refresh_groups()
+            self._sequence_cache = None
+
+        if self._sequence_cache is None:
+            grouped = self._plan_grouped
+            self._sequence_cache = (
+                self._plan_planes                                          # 1. كل الـ planes أولاً
+                + self._plan_groups                                        # 2. مجموعات الدمج حسب الأولوية
+                + [[name] for name in self._plan_rest if name not in grouped]  # 3. الباقي فرديًا
+            )
+        return [list(step) for step in self._sequence_cache]
 
-        # 3. الباقي فرديًا
-        for task in self.tasks:
-            if task["name"] not in processed:
-                sequence.append([task["name"]])
+    @instrumented(STAGE_RENDERING, mode="sequential")
+    def render_sequentially(self, show_animation_log: bool = True, time_scale: float = 0.2):
+        """
+        تنفيذ متسلسل + عرض log animation بسيط
+        time_scale: نسبة النوم لكل ثانية محاكاة (0 → بدون نوم، للقياس)
+        """
+        total_time = 0.0
 
-        return sequence
+        for seconds in self._render_steps():
+            if time_scale > 0:
+                time.sleep(seconds * time_scale)  # تسريع المحاكاة
+            total_time += seconds
 
-    def render_sequentially(self, show_animation_log: bool = True):
-        """تنفيذ متسلسل + عرض log animation بسيط"""
-        sequence = self.optimize_sequence()
-        total_time = 0.0
-        anim_log = []
+        return self._finish_render(total_time, show_animation_log)
+
+    async def render_async(self, show_animation_log: bool = True, time_scale: float = 0.2,
+                           timeout: float = None) -> float:
+        """
+        نفس render_sequentially بدون حجز الـ event loop (asyncio.sleep بين الخطوات)
+        timeout → asyncio.TimeoutError، والإلغاء (task.cancel) يتوقف عند أول خطوة تالية
+        """
+        from Async_Workflow import render_workflow
+        return await render_workflow(self, show_animation_log, time_scale, timeout)
 
-        for step in sequence:
+    def _render_steps(self):
+        """
+        خطوات الرندر واحدة واحدة: صف في جدول TABLE_ANIMATION (قناة الجداول الكاملة في self.events)
+        + حدث EVENT_STEP للـ telemetry، ويرجع زمن الخطوة (النوم على المستدعي)
+        """
+        record = self.events.record
+        self.events.begin_table(TABLE_ANIMATION)
+        task_index = self.task_index
+        for step in self.optimize_sequence():
+            seconds = step_time(step, task_index)   # نفس نموذج Parallel_Render
             if len(step) > 1:
-                step_time = sum(t["complexity"] for t in self.tasks if t["name"] in step) * 0.88
-                logging.info(f"دمج مجموعة: {', '.join(step)} → {step_time:.1f}s")
+                # صف جدول الأنيميشن للمجموعة: أول عضو plane أو عليه physics proxy
+                task = next((task_index[n] for n in step
+                             if task_index[n].get("is_plane", False) or "physics_proxy" in task_index[n]), None)
             else:
-                task_name = step[0]
-                task = next(t for t in self.tasks if t["name"] == task_name)
-                step_time = task["complexity"] * (0.75 if task.get("is_plane", False) else 1.1)
-                logging.info(f"معالجة: {task_name} → {step_time:.1f}s")
-
-            time.sleep(step_time / 5)  # تسريع المحاكاة
-            total_time += step_time
-
-            # جمع بيانات للـ animation log
-            if task.get("is_plane", False):
-                anim_log.append({
-                    "step": task_name if len(step)==1 else " + ".join(step),
-                    "time": round(step_time, 1),
-                    "weight": task.get("physics_proxy", {}).get("weight_kg"),
-                    "deform_bonus": task.get("physics_proxy", {}).get("deformation_bonus")
-                })
-            elif "physics_proxy" in task:
-                anim_log.append({...})  # لو عايز تضيف الـ proxy في خطوة المهمة اللي فيها
-                
-                anim_log.append({
-                    "step": task_name if len(step)==1 else " + ".join(step),
-                    "time": round(step_time, 1),
-                    "weight": task.get("physics_proxy", {}).get("weight_kg"),
-                    "deform_bonus": task.get("physics_proxy", {}).get("deformation_bonus")
-                })
-
+                task = task_index[step[0]]
+
+            record(EVENT_STEP, step, a=seconds)
+            if task is not None:
+                proxy = task.get("physics_proxy")
+                if task.get("is_plane", False) or proxy is not None:
+                    self.events.add_row(TABLE_ANIMATION, {
+                        "step": step[0] if len(step) == 1 else " + ".join(step),
+                        "time": round(seconds, 1),
+                        "weight": proxy and proxy.get("weight_kg"),
+                        "deform_bonus": proxy and proxy.get("deformation_bonus"),
+                    })
+            yield seconds
+
+    def _finish_render(self, total_time: float, show_animation_log: bool) -> float:
         self.render_time = total_time
-        logging.info(f"إجمالي وقت التوليد: {total_time:.1f} ثانية")
+        self.events.record(EVENT_RENDER_TOTAL, a=total_time)
 
+        anim_log = self.animation_log()
         if show_animation_log and anim_log:
             self._print_animation_log(anim_log)
 
         return total_time
 
-    def animate_interaction(self, chain: List[str], output_file="plane_chain.gif"):
-        """animation بسيط للسلسلة"""
+    def animation_log(self) -> List[Dict]:
+        """صفوف جدول الأنيميشن لآخر رندر (كاملة مهما كانت إعدادات sampling / rate limit في self.events)"""
+        return self.events.table(TABLE_ANIMATION)
+
+    @instrumented(STAGE_RENDERING, mode="parallel")
+    def render_parallel(
+        self,
+        max_workers: int = None,
+        use_processes: bool = False,
+        time_scale: float = 0.2,
+    ) -> Dict:
+        """
+        تنفيذ متوازي حسب الاعتماديات بدل render_sequentially
+        - الخطوات المستقلة ومجموعات الدمج تعمل في نفس الوقت
+        - يرجع تقرير بالزمن الفعلي واستغلال كل عامل، و total_work / makespan للخطة المتوازية
+        - render_time يبقى زمن النموذج المتسلسل (sequential_time) مثل render_sequentially
+        """
+        report = DependencyExecutor(
+            self,
+            max_workers=max_workers,
+            use_processes=use_processes,
+            time_scale=time_scale,
+        ).run()
+        self.render_time = report["sequential_time"]
+        return report
+
+    def estimate_render(self, workers=None) -> Dict:
+        """
+        تقدير الرندر بدون تنفيذ ولا نوم (dry run): total_work و critical_path و makespan
+        workers: عدد العمال أو قائمة أعداد (مثلًا [1, 2, 4, 8]) – الافتراضي os.cpu_count()
+        """
+        return dry_run(self, workers)
+
+    def animate_interaction(self, chain: List[str], output_file="plane_chain.gif", workers: int = None,
+                            use_cache: bool = True, dpi: int = None):
+        """
+        animation بسيط للسلسلة (workers > 1 → رندر الإطارات على عدة processes)
+        output_file ينتهي بـ .npy → إطارات RGBA خام بدل GIF
+        use_cache=False → رسم من جديد حتى لو نفس السلسلة موجودة في الكاش
+        """
+        if not all(p in self.planes for p in chain):
+            logging.warning("بعض العناصر ليست planes")
+            return
+
+        positions = [self.planes[p].x for p in chain]  # x فقط
+        pair_forces = self.pair_forces(list(zip(chain, chain[1:])))
+        create_chain_animation(chain, positions, pair_forces, output_file=output_file,
+                               workers=workers, use_cache=use_cache,
+                               dpi=dpi or _load_animations().CHAIN_DPI, metrics=self.metrics)
+        logging.info(f"Animation saved: {output_file}")
+
+    def preview_interaction(self, chain: List[str], output_file="plane_chain_preview.gif",
+                            time_budget: float = None, frame_rate: float = None, use_cache: bool = True) -> Dict:
+        """
+        animate_interaction بجودة تناسب ميزانية زمن (time_budget ثوانٍ أو frame_rate إطار/ثانية)
+        يرجع تقرير المستوى المختار (dpi، عدد الإطارات، الزمن المقدر والفعلي)
+        """
+        if not all(p in self.planes for p in chain):
+            logging.warning("بعض العناصر ليست planes")
+            return {}
+
+        _load_animations()
+        from Animation_Preview import default_speed, preview_chain_animation
+        if self._preview_speed is None:
+            self._preview_speed = default_speed()
+        positions = [self.planes[p].x for p in chain]
+        pair_forces = self.pair_forces(list(zip(chain, chain[1:])))
+        report = preview_chain_animation(
+            chain, positions, pair_forces, output_file=output_file,
+            time_budget=time_budget, frame_rate=frame_rate, use_cache=use_cache, metrics=self.metrics,
+            speed=self._preview_speed,
+        )
+        logging.info(f"Preview saved: {output_file} (level {report['level']}, dpi={report['dpi']})")
+        return report
+
+    async def animate_interaction_async(self, chain: List[str], output_file="plane_chain.gif",
+                                        use_cache: bool = True, dpi: int = None,
+                                        timeout: float = None, runner=None):
+        """
+        نفس animate_interaction لكن الرسم والترميز في executor (processes افتراضيًا)
+        – الـ event loop حر، وعدد الأنيميشن المتزامنة محدود بـ runner.max_concurrency
+        """
         if not all(p in self.planes for p in chain):
             logging.warning("بعض العناصر ليست planes")
             return
 
-        fig, ax = plt.subplots(figsize=(10, 4))
-        positions = [self.planes[p].position[0] for p in chain]  # x فقط
-        forces_accum = [0]
-
-        def update(frame):
-            ax.clear()
-            current_force = 0
-            for i in range(min(frame, len(chain)-1)):
-                f = self.planes[chain[i]].x2_effected(self.planes[chain[i+1]])
-                current_force += f
-                ax.arrow(positions[i], 0, positions[i+1]-positions[i], 0,
-                         head_width=0.05, head_length=0.1, fc='blue', ec='blue', alpha=0.6)
-                ax.text((positions[i]+positions[i+1])/2, 0.1, f"{f:.2f}×2", fontsize=9)
-
-            forces_accum.append(current_force)
-            ax.plot(range(len(forces_accum)), forces_accum, 'r-o', lw=2, label="Accumulated Effect")
-            ax.set_xlim(min(positions)-0.5, max(positions)+0.5)
-            ax.set_ylim(-0.2, max(forces_accum)*1.3 + 0.5)
-            ax.set_title(f"Plane.x2 Effected Chain: {' → '.join(chain)}")
-            ax.set_xlabel("Position")
-            ax.set_ylabel("Accumulated Interaction Force")
-            ax.grid(True, alpha=0.3)
-            ax.legend()
-
-        ani = FuncAnimation(fig, update, frames=len(chain)+5, interval=800, repeat=True)
-        ani.save(output_file, writer=PillowWriter(fps=1.5), dpi=120)
-        plt.close(fig)
+        from Async_Workflow import default_runner
+        from Instrumentation import STAGE_ANIMATION_ENCODING
+        # بيانات بسيطة فقط تعبر للـ process (لا self ولا metrics)
+        positions = [self.planes[p].x for p in chain]
+        pair_forces = self.pair_forces(list(zip(chain, chain[1:])))
+        options = {"use_cache": use_cache}
+        if dpi:
+            options["dpi"] = dpi
+        with self.metrics.stage(STAGE_ANIMATION_ENCODING, kind="chain", mode="async"):
+            await (runner or default_runner()).run(
+                create_chain_animation, chain, positions, pair_forces, output_file,
+                timeout=timeout, **options,
+            )
         logging.info(f"Animation saved: {output_file}")
+        return output_file
+
+    def queue_animation(self, chain: List[str], output_file="plane_chain.gif",
+                        use_cache: bool = True, dpi: int = None):
+        """
+        نفس animate_interaction في الخلفية (render_queue، ويُنشأ واحد افتراضي لو مش موجود)
+        يرجع Future باسم الملف – الطلب المطابق لطلب معلق يرجع نفس الـ Future
+        """
+        if not all(p in self.planes for p in chain):
+            logging.warning("بعض العناصر ليست planes")
+            return None
+
+        if self.render_queue is None:
+            from Render_Queue import RenderQueue
+            self.render_queue = RenderQueue()
+        # الحالة الحالية للطبقات تُلتقط الآن – تغييرها بعد ذلك لا يؤثر على الأنيميشن
+        positions = [self.planes[p].x for p in chain]
+        pair_forces = self.pair_forces(list(zip(chain, chain[1:])))
+        options = {"use_cache": use_cache}
+        if dpi:
+            options["dpi"] = dpi
+        return self.render_queue.submit(
+            create_chain_animation, list(chain), positions, pair_forces,
+            output_file=output_file, **options,
+        )
+
+    def wait_for_animations(self, timeout: float = None) -> Dict:
+        """انتظار كل أنيميشن الطابور – يرجع stats (أو {} لو ما فيش طابور)"""
+        if self.render_queue is None:
+            return {}
+        return self.render_queue.flush(timeout)
 
     def _print_animation_log(self, steps: List[Dict]):
         """تصدير تمثيل نصي بسيط للـ animation"""
@@ -365,7 +732,11 @@ class AISmartWorkflow:
 # مثال جديد: النسر على عش فوق السمكة (nest scenario)
 # ────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    workflow = AISmartWorkflow()
+    # تهيئة السجل (Logging) – للتشغيل المباشر فقط، الاستيراد لا يغيّر إعدادات السجل العامة
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # echo → رسائل الأحداث تظهر أثناء التشغيل كما كانت
+    workflow = AISmartWorkflow(events=EventLog(echo=True))
 
     # تعريف متغير مشترك (لو مش معرّف في مكان آخر)
     base_height = 1.25
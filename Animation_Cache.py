@@ -0,0 +1,143 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+from Plane_Layers import PlaneLayer
+
+
+# ────────────────────────────────────────────────
+# إعدادات الكاش
+# ────────────────────────────────────────────────
+CACHE_DIR_ENV = "AI_SWP_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai_swp", "animations")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# يُرفع عند أي تغيير في الرسم أو الترميز يغيّر الملف الناتج
+# 2: إطارات GIF كمستطيلات متغيرة (disposal=1) + profile_samples / padding_frames
+CACHE_VERSION = 2
+
+
+def layer_signature(layer: PlaneLayer) -> Dict:
+    """المعاملات التي تحدد شكل الطبقة في أي أنيميشن"""
+    return {
+        "name": layer.name,
+        "position": list(layer.coords),
+        "force": float(layer.force),
+        "depth": float(layer.depth),
+        "radius": float(layer.radius),
+    }
+
+
+def animation_key(kind: str, layers: Iterable[PlaneLayer] = (), **arguments) -> str:
+    """
+    مفتاح المحتوى: sha256 لنوع الأنيميشن + معاملات الطبقات + معاملات الرسم
+    (نفس المدخلات → نفس المفتاح مهما اختلف اسم ملف الإخراج)
+    """
+    payload = {
+        "version": CACHE_VERSION,
+        "kind": kind,
+        "layers": [layer_signature(layer) for layer in layers],
+        "arguments": arguments,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=float)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class AnimationCache:
+    """
+    كاش ملفات أنيميشن مفتاحه محتوى المشهد (content-addressed)
+    - hit: نسخ الملف المحفوظ إلى output_file بدون أي رسم
+    - حد أقصى للحجم مع حذف الأقدم استخدامًا (LRU حسب mtime)
+    - store لا يمسح المجلد كل مرة: الحجم الكلي يُعد مرة ثم يُجمع تقديريًا،
+      والمسح + الحذف فقط لما التقدير يتجاوز max_bytes
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+        self.max_bytes = int(max_bytes)
+        self._known_bytes: Optional[int] = None     # الحجم الكلي التقديري منذ آخر مسح
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key + extension)
+
+    def _entries(self) -> List[os.DirEntry]:
+        try:
+            return [e for e in os.scandir(self.directory) if e.is_file() and not e.name.startswith(".")]
+        except FileNotFoundError:
+            return []
+
+    def fetch(self, key: str, output_file: str) -> bool:
+        """لو المفتاح موجود: ينسخ الملف إلى output_file ويرجع True"""
+        path = self._path(key, os.path.splitext(output_file)[1].lower())
+        if not os.path.isfile(path):
+            return False
+        if os.path.abspath(path) != os.path.abspath(output_file):
+            shutil.copyfile(path, output_file)
+        os.utime(path)          # آخر استخدام → مؤخرة قائمة الحذف
+        return True
+
+    def store(self, key: str, output_file: str) -> Optional[str]:
+        """حفظ نسخة من output_file تحت المفتاح ثم تطبيق حد الحجم"""
+        size = os.path.getsize(output_file)
+        if size > self.max_bytes:
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, os.path.splitext(output_file)[1].lower())
+        # كتابة لملف مؤقت ثم replace – عملية أخرى لا ترى ملفًا نصف مكتوب
+        fd, temp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(output_file, temp)
+            os.replace(temp, path)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+        if self._known_bytes is None:
+            self.evict()
+        else:
+            self._known_bytes += size
+            if self._known_bytes > self.max_bytes:
+                self.evict()
+        return path
+
+    def evict(self) -> int:
+        """حذف الأقدم استخدامًا حتى يصبح الحجم الكلي ≤ max_bytes – يرجع عدد الملفات المحذوفة"""
+        files = sorted((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries())
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._known_bytes = total
+        return removed
+
+    def size(self) -> int:
+        return sum(e.stat().st_size for e in self._entries())
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            os.remove(entry.path)
+        self._known_bytes = 0
+
+    def __repr__(self) -> str:
+        return f"AnimationCache({self.directory!r}, max_bytes={self.max_bytes})"
+
+
+_default_cache: Optional[AnimationCache] = None
+
+
+def default_cache() -> AnimationCache:
+    """الكاش المشترك (المجلد من AI_SWP_CACHE_DIR لو موجود)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AnimationCache()
+    return _default_cache
@@ -0,0 +1,179 @@
+import math
+import time
+from typing import Callable, Dict, List, Tuple
+
+from Plane_Layers import PlaneLayer
+from Deformation_Field import pressure_curve
+from Animations import (
+    CHAIN_DPI, CHAIN_FIGSIZE, CHAIN_PADDING_FRAMES, DEFAULT_FPS, DEFAULT_FRAMES,
+    DEFAULT_MAX_PRESSURE_FRAME, PRESSURE_DPI, PRESSURE_FIGSIZE, PROFILE_SAMPLES,
+    create_chain_animation, create_pressure_animation,
+)
+
+
+# ────────────────────────────────────────────────
+# مستويات التفاصيل (الأول = الجودة الكاملة، وكل مستوى أرخص من السابق)
+# ────────────────────────────────────────────────
+PRESSURE_PREVIEW_LEVELS: List[Dict] = [
+    {"dpi": PRESSURE_DPI, "profile_samples": PROFILE_SAMPLES, "frame_step": 1},
+    {"dpi": 96, "profile_samples": 300, "frame_step": 1},
+    {"dpi": 80, "profile_samples": 200, "frame_step": 1},
+    {"dpi": 64, "profile_samples": 200, "frame_step": 2},
+    {"dpi": 48, "profile_samples": 150, "frame_step": 2},
+    {"dpi": 48, "profile_samples": 100, "frame_step": 3},
+    {"dpi": 36, "profile_samples": 80, "frame_step": 4},
+    {"dpi": 30, "profile_samples": 60, "frame_step": 6},
+]
+CHAIN_PREVIEW_LEVELS: List[Dict] = [
+    {"dpi": CHAIN_DPI, "padding_frames": CHAIN_PADDING_FRAMES},
+    {"dpi": 96, "padding_frames": 3},
+    {"dpi": 80, "padding_frames": 2},
+    {"dpi": 64, "padding_frames": 1},
+    {"dpi": 48, "padding_frames": 1},
+    {"dpi": 36, "padding_frames": 0},
+    {"dpi": 30, "padding_frames": 0},
+]
+
+# نموذج الزمن: setup + إطارات مرسومة × (ثابت + لكل ميجابكسل) – مقاس على المسار السريع / التسلسلي
+_COST_MODEL = {
+    "pressure": {"setup": 0.3, "frame": 0.019, "megapixel": 0.016},
+    "chain": {"setup": 0.15, "frame": 0.095, "megapixel": 0.13},
+}
+SPEED_SMOOTHING = 0.5
+
+
+def default_speed() -> Dict[str, float]:
+    """نسبة الزمن الفعلي للتقدير لكل نوع – يملكها المستدعي (الـ workflow) وتتعلم من كل preview (EMA)"""
+    return {kind: 1.0 for kind in _COST_MODEL}
+
+
+def _megapixels(figsize: Tuple[float, float], dpi: int) -> float:
+    return figsize[0] * dpi * figsize[1] * dpi / 1e6
+
+
+def _seconds(speed: Dict[str, float], kind: str, figsize: Tuple[float, float], dpi: int,
+             rendered_frames: int) -> float:
+    model = _COST_MODEL[kind]
+    per_frame = model["frame"] + model["megapixel"] * _megapixels(figsize, dpi)
+    return speed[kind] * (model["setup"] + rendered_frames * per_frame)
+
+
+def _learn(speed: Dict[str, float], kind: str, predicted: float, actual: float) -> None:
+    ratio = actual / predicted if predicted > 0 else 1.0
+    if ratio < 0.2:
+        return      # نسخ من الكاش – ليس قياسًا للرسم
+    ratio = min(max(ratio, 0.25), 4.0)
+    speed[kind] *= (1 - SPEED_SMOOTHING) + SPEED_SMOOTHING * ratio
+
+
+def _choose(levels: List[Dict], plan: Callable[[Dict], Dict], time_budget: float, frame_rate: float) -> Tuple[int, Dict]:
+    """أول مستوى (أعلى جودة) تقديره داخل الميزانية، وإلا أرخص مستوى"""
+    if time_budget is not None and time_budget <= 0:
+        raise ValueError("time_budget لازم أكبر من صفر")
+    if frame_rate is not None and frame_rate <= 0:
+        raise ValueError("frame_rate لازم أكبر من صفر")
+    for index, level in enumerate(levels):
+        settings = plan(level)
+        seconds = settings["predicted_seconds"]
+        if time_budget is not None and seconds > time_budget:
+            continue
+        if frame_rate is not None and seconds > settings["frames"] / frame_rate:
+            continue
+        return index, settings
+    return len(levels) - 1, settings
+
+
+def _report(index: int, settings: Dict, seconds: float, time_budget: float, frame_rate: float) -> Dict:
+    report = dict(settings, level=index, seconds=seconds, time_budget=time_budget, frame_rate=frame_rate)
+    within = True
+    if time_budget is not None:
+        within = within and seconds <= time_budget
+    if frame_rate is not None:
+        within = within and seconds <= settings["frames"] / frame_rate
+    report["within_budget"] = within
+    return report
+
+
+# ────────────────────────────────────────────────
+# preview تحت ميزانية زمن
+# ────────────────────────────────────────────────
+def preview_pressure_animation(
+    pressure_layers: List[PlaneLayer],
+    output_file: str = "pressure_preview.gif",
+    time_budget: float = None,
+    frame_rate: float = None,
+    frames: int = DEFAULT_FRAMES,
+    max_pressure_frame: int = DEFAULT_MAX_PRESSURE_FRAME,
+    fps: float = DEFAULT_FPS,
+    speed: Dict[str, float] = None,
+    **kwargs,
+) -> Dict:
+    """
+    create_pressure_animation بأعلى جودة تناسب الميزانية:
+    - time_budget: أقصى زمن رسم بالثواني، frame_rate: أقل عدد إطارات مرسومة في الثانية
+    - يخفض dpi ثم دقة شكل السمكة ثم عدد الإطارات (نفس مدة الأنيميشن: fps يقل بنفس النسبة)
+    - speed: معاملات default_speed() – تُحدَّث بعد الرسم (بدونها لا يُحفظ أي تعلم)
+    يرجع التقرير: المستوى المختار وإعداداته، والزمن المقدر والفعلي، و within_budget
+    """
+    speed = speed if speed is not None else default_speed()
+
+    def plan(level: Dict) -> Dict:
+        step = level["frame_step"]
+        count = max(1, math.ceil(frames / step))
+        peak = max(1, round(max_pressure_frame / step)) if max_pressure_frame else 0
+        pressure = pressure_curve(count, peak)
+        # الإطارات بنفس الضغط بعد الإطار الأول لا تُرسم مرة أخرى (_blit_frames)
+        rendered = 1 + sum(1 for i in range(1, count) if i == 1 or pressure[i] != pressure[i - 1])
+        return {
+            "dpi": level["dpi"],
+            "profile_samples": level["profile_samples"],
+            "frames": count,
+            "max_pressure_frame": peak,
+            "fps": fps / step,
+            "predicted_seconds": _seconds(speed, "pressure", PRESSURE_FIGSIZE, level["dpi"], rendered),
+        }
+
+    index, settings = _choose(PRESSURE_PREVIEW_LEVELS, plan, time_budget, frame_rate)
+    started = time.perf_counter()
+    create_pressure_animation(
+        pressure_layers, output_file=output_file,
+        frames=settings["frames"], max_pressure_frame=settings["max_pressure_frame"], fps=settings["fps"],
+        dpi=settings["dpi"], profile_samples=settings["profile_samples"], **kwargs,
+    )
+    seconds = time.perf_counter() - started
+    _learn(speed, "pressure", settings["predicted_seconds"], seconds)
+    return dict(_report(index, settings, seconds, time_budget, frame_rate), output_file=output_file)
+
+
+def preview_chain_animation(
+    chain: List[str],
+    positions: List[float],
+    pair_forces: List[float],
+    output_file: str = "plane_chain_preview.gif",
+    time_budget: float = None,
+    frame_rate: float = None,
+    speed: Dict[str, float] = None,
+    **kwargs,
+) -> Dict:
+    """create_chain_animation بأعلى جودة تناسب الميزانية (dpi ثم إطارات الحالة الأخيرة)"""
+    speed = speed if speed is not None else default_speed()
+
+    def plan(level: Dict) -> Dict:
+        count = len(chain) + level["padding_frames"]
+        return {
+            "dpi": level["dpi"],
+            "padding_frames": level["padding_frames"],
+            "frames": count,
+            # FuncAnimation.save يرسم الإطار 0 مرة إضافية
+            "predicted_seconds": _seconds(speed, "chain", CHAIN_FIGSIZE, level["dpi"], count + 1),
+        }
+
+    index, settings = _choose(CHAIN_PREVIEW_LEVELS, plan, time_budget, frame_rate)
+    started = time.perf_counter()
+    create_chain_animation(
+        chain, positions, pair_forces, output_file=output_file,
+        dpi=settings["dpi"], padding_frames=settings["padding_frames"], **kwargs,
+    )
+    seconds = time.perf_counter() - started
+    _learn(speed, "chain", settings["predicted_seconds"], seconds)
+    return dict(_report(index, settings, seconds, time_budget, frame_rate), output_file=output_file)
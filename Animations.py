@@ -1,25 +1,54 @@
 # Animations.py
+import os
+import itertools
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation, PillowWriter
-from typing import List, Optional
+from matplotlib.animation import AbstractMovieWriter, FuncAnimation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.legend import Legend
+from matplotlib.text import Text
+from PIL import GifImagePlugin, Image
+from typing import Dict, Iterable, List, Optional, Tuple
 from Plane_Layers import PlaneLayer
+from Deformation_Field import PRESSURE_FORCE_SCALE, pressure_curve
+from Animation_Cache import animation_key, default_cache
+from Instrumentation import Metrics, STAGE_ANIMATION_ENCODING, default_metrics
 
 # ────────────────────────────────────────────────
 # إعدادات عامة
 # ────────────────────────────────────────────────
-X = np.linspace(-6, 6, 400)
+PROFILE_SAMPLES = 400
+X = np.linspace(-6, 6, PROFILE_SAMPLES)
 BASE_HEIGHT = 1.25
 
-# ──── شكل السمكة الأصلي (محافظ عليه تمامًا كما طلب ─────
-Y_ORIGINAL = (
-    BASE_HEIGHT
-    + 0.45 * np.sin(1.15 * X)
-    + 0.18 * np.cos(5 * X)
-    + 0.15 * np.cos(3 * X)
-    - 0.12 * (np.abs(X) / 6) ** 1.2
-    + 0.3 * np.sin(1.2 * X)
-)
+
+def _fish_surface(x: np.ndarray) -> np.ndarray:
+    # ──── شكل السمكة الأصلي (محافظ عليه تمامًا كما طلب ─────
+    return (
+        BASE_HEIGHT
+        + 0.45 * np.sin(1.15 * x)
+        + 0.18 * np.cos(5 * x)
+        + 0.15 * np.cos(3 * x)
+        - 0.12 * (np.abs(x) / 6) ** 1.2
+        + 0.3 * np.sin(1.2 * x)
+    )
+
+
+Y_ORIGINAL = _fish_surface(X)
+
+
+def fish_profile(samples: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(x، شكل السمكة) بعدد نقاط samples – None أو PROFILE_SAMPLES → X و Y_ORIGINAL نفسهما"""
+    if samples is None or samples == PROFILE_SAMPLES:
+        return X, Y_ORIGINAL
+    if samples < 2:
+        raise ValueError("profile_samples لازم 2 على الأقل")
+    x = np.linspace(-6, 6, samples)
+    return x, _fish_surface(x)
 
 DEFAULT_HALF_WIDTH = 1.8
 DEFAULT_FRAMES = 120
@@ -31,6 +60,415 @@ DEFAULT_FILL_THICKNESS = 0.50          # من الديمو (أنيق)
 DEFAULT_FILL_COLOR = 'lightsalmon'     # من الديمو
 DEFAULT_FILL_ALPHA = 0.38              # من الديمو
 
+PRESSURE_FIGSIZE = (12, 7)
+PRESSURE_DPI = 120
+CHAIN_FIGSIZE = (10, 4)
+CHAIN_DPI = 120
+CHAIN_FPS = 1.5
+CHAIN_PADDING_FRAMES = 5               # إطارات الحالة الأخيرة بعد اكتمال السلسلة
+PARALLEL_BATCH_FRAMES = 8              # إطارات لكل عامل في كل دفعة (يحدد حجم الذاكرة المشتركة)
+GIF_DELTA_FRAMES = True                # GIF: كل إطار يُكتب كمستطيل المنطقة المتغيرة فقط
+
+
+# ────────────────────────────────────────────────
+# حساب التشوه لكل الإطارات مرة واحدة
+# ────────────────────────────────────────────────
+def deformation_frames(
+    pressure_layers: List[PlaneLayer],
+    frames: int = DEFAULT_FRAMES,
+    max_pressure_frame: int = DEFAULT_MAX_PRESSURE_FRAME,
+    half_width: float = DEFAULT_HALF_WIDTH,
+    power_exponent: float = DEFAULT_POWER_EXPONENT,
+    max_depth_multiplier: float = 14.0,
+    profile_samples: int = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    كل إطارات التشوه كمصفوفة واحدة (frames × profile_samples)
+    - يرجع (الضغط لكل إطار، سطح السمكة المشوه لكل إطار)
+    """
+    x, y_original = fish_profile(profile_samples)
+    main_layer = pressure_layers[-1]
+    plane_center = main_layer.position[0]
+    total_force = sum(layer.force for layer in pressure_layers)
+    pressure_factor = total_force * PRESSURE_FORCE_SCALE
+
+    pressure = pressure_curve(frames, max_pressure_frame)
+    max_depth = pressure_factor * max_depth_multiplier * pressure
+
+    mask = (x >= plane_center - half_width) & (x <= plane_center + half_width)
+    falloff = 1 - (np.abs(x[mask] - plane_center) / half_width) ** power_exponent
+
+    y_frames = np.repeat(y_original[None, :], frames, axis=0)
+    y_frames[:, mask] -= max_depth[:, None] * falloff[None, :]
+    return pressure, y_frames
+
+
+def _build_pressure_artists(
+    ax,
+    pressure_layers: List[PlaneLayer],
+    pressure: np.ndarray,
+    y_frames: np.ndarray,
+    half_width: float,
+    talon_drop_factor: float,
+    title: str,
+    custom_text: Optional[str],
+):
+    """
+    إنشاء كل عناصر الرسم مرة واحدة (بنفس شكل الإطار 0)
+    ويرجع update(frame) تغيّر البيانات فقط
+    """
+    main_layer = pressure_layers[-1]
+    plane_center = main_layer.position[0]
+    plane_y = main_layer.position[1]
+    total_force = sum(layer.force for layer in pressure_layers)
+    X, Y_ORIGINAL = fish_profile(y_frames.shape[1])     # نفس دقة y_frames
+
+    def fill_bounds(y):
+        return y - DEFAULT_FILL_THICKNESS, y + DEFAULT_FILL_THICKNESS
+
+    def talon_heights(current_pressure):
+        talon_y_bottom = plane_y + 0.8 - current_pressure * talon_drop_factor
+        return talon_y_bottom, talon_y_bottom + 0.75
+
+    def label_text(current_pressure):
+        return custom_text or f"ضغط: {current_pressure*100:.0f}%\nإجمالي القوة: {total_force:.1f} كجم"
+
+    ax.plot(X, Y_ORIGINAL, color='gray', ls='--', lw=1.4, alpha=0.65, label='السمكة قبل الضغط')
+    lower, upper = fill_bounds(y_frames[0])
+    body = ax.fill_between(X, lower, upper, color=DEFAULT_FILL_COLOR, alpha=DEFAULT_FILL_ALPHA,
+                           label='جسم السمكة المشوه')
+    surface, = ax.plot(X, y_frames[0], color='darkred', lw=2.9, label='سطح السمكة بعد الضغط')
+
+    for i, layer in enumerate(pressure_layers):
+        ax.hlines(layer.position[1], plane_center - half_width, plane_center + half_width,
+                  color='royalblue', lw=5.5 - i * 0.8, alpha=max(0.25, 0.5 - i * 0.08),
+                  label=f"{layer.name} ({layer.force:.1f} كجم)")
+
+    talon_xs = np.array([-0.9, -0.3, 0.3, 0.9]) + plane_center
+    bottom, top = talon_heights(pressure[0])
+    talons = ax.fill(talon_xs, [bottom]*4, [top]*4, color='saddlebrown', alpha=0.68, label='مخالب النسر')
+
+    text = ax.text(0, plane_y + 1.35, label_text(pressure[0]),
+                   ha='center', va='bottom', fontsize=10,
+                   bbox=dict(facecolor='white', edgecolor='navy', alpha=0.85,
+                             boxstyle='round,pad=0.4'))
+
+    ax.set_title(title, fontsize=13, pad=12)
+    ax.set_xlabel("طول السمكة")
+    ax.set_ylabel("الارتفاع")
+    ax.set_ylim(0.4, 3.6)
+    ax.grid(True, alpha=0.22)
+    legend = ax.legend(loc='upper right', fontsize=9, framealpha=0.92)
+    ax.set_aspect('equal', adjustable='box')
+
+    # نفس سلوك المسار الكلاسيكي: الـ labels في الإطار 0 فقط، وبعده legend فارغ
+    empty_legend = Legend(ax, [], [], loc='upper right', fontsize=9, framealpha=0.92)
+    empty_legend.set_visible(False)
+    ax.add_artist(empty_legend)
+
+    talon_x_lines = [poly.get_xy()[:-1, 0] for poly in talons]
+
+    def update(frame):
+        y = y_frames[frame]
+        lower, upper = fill_bounds(y)
+        if hasattr(body, "set_data"):
+            body.set_data(X, lower, upper)
+        else:
+            body.set_verts([np.concatenate([
+                np.column_stack([X[:1], lower[:1]]),
+                np.column_stack([X, upper]),
+                np.column_stack([X[-1:], lower[-1:]]),
+                np.column_stack([X[::-1], lower[::-1]]),
+            ])])
+        surface.set_ydata(y)
+
+        bottom, top = talon_heights(pressure[frame])
+        for poly, xs, height in zip(talons, talon_x_lines, (bottom, top)):
+            poly.set_xy(np.column_stack([xs, np.full(len(xs), height)]))
+
+        text.set_text(label_text(pressure[frame]))
+        legend.set_visible(frame == 0)
+        empty_legend.set_visible(frame != 0)
+        return [body, surface, *talons, text, legend, empty_legend]
+
+    return update
+
+
+# ────────────────────────────────────────────────
+# رسم الإطارات بالـ blitting + حفظ GIF بلوحة ألوان مشتركة
+# ────────────────────────────────────────────────
+def _tick_lines(axis) -> list:
+    """
+    خطوط الشبكة والعلامات للـ ticks داخل المحور بنفس ترتيب Tick.draw
+    (طرف خط الشبكة يقع فوق العلامة، والعلامة تُرسم بعده – وإلا تختلف البكسلات عند dpi غير 120)
+    """
+    low, high = sorted(axis.get_view_interval())
+    locs = axis.get_majorticklocs()
+    ticks = axis.get_major_ticks(len(locs))
+    return [line for tick, loc in zip(ticks, locs) if low - 1e-9 <= loc <= high + 1e-9
+            for line in (tick.gridline, tick.tick1line, tick.tick2line)]
+
+
+def _blit_frames(fig, ax, update, frames: Iterable[int], keys: List = None):
+    """
+    الخلفية الثابتة (المحاور، التسميات، العلامات) تُرسم مرة واحدة، وكل إطار يعيد
+    رسم العناصر فوقها فقط بنفس ترتيب zorder الذي يستخدمه Axes.draw
+    - إطار بنفس مفتاح السابق لا يُعاد رسمه
+    - يرجع (مصفوفة RGBA، هل تغير الإطار) – المصفوفة تُكتب فوقها في الإطار التالي
+    """
+    frames = list(frames)
+    canvas = fig.canvas
+    if not frames:
+        return
+
+    # رسم كامل أولًا: أول رسم يضبط مواضع العنوان والعلامات
+    update(frames[0])
+    canvas.draw()
+
+    children = [a for a in ax.get_children() if a is not ax.patch and a not in (ax.xaxis, ax.yaxis)]
+    grid = _tick_lines(ax.xaxis) + _tick_lines(ax.yaxis)
+    layered = [(a.get_zorder(), i, a) for i, a in enumerate(children)]
+    layered += [(ax.xaxis.get_zorder(), len(children) + i, line) for i, line in enumerate(grid)]
+    dynamic = [a for _, _, a in sorted(layered, key=lambda item: (item[0], item[1]))]
+
+    # Axes.draw يعيد حساب موضع العنوان حسب العناصر الظاهرة – نحفظ الموضع من الرسم الكامل
+    visibility = [a.get_visible() for a in dynamic]
+    positions = [(a, a.get_position()) for a in dynamic if isinstance(a, Text)]
+    for artist in dynamic:
+        artist.set_visible(False)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    for artist, visible in zip(dynamic, visibility):
+        artist.set_visible(visible)
+    for artist, position in positions:
+        artist.set_position(position)
+
+    renderer = canvas.get_renderer()
+    previous = object()
+    buffer = None
+    for i, frame in enumerate(frames):
+        key = keys[i] if keys is not None else frame
+        if buffer is not None and key == previous:
+            yield buffer, False
+            continue
+        previous = key
+        update(frame)
+        canvas.restore_region(background)
+        for artist in dynamic:
+            if artist.get_visible():
+                artist.draw(renderer)
+        buffer = np.asarray(canvas.buffer_rgba())
+        yield buffer, True
+
+
+class _PaletteMapper:
+    """
+    تحويل RGB → فهرس في لوحة ثابتة بدقة كاملة
+    (quantize(palette=...) في PIL يقرّب الألوان لـ 5-6 بت فيتحول الأبيض إلى 252)
+    - جدول lookup بحجم 2^24 يُملأ تدريجيًا بأقرب لون
+    - لون بعيد عن كل ألوان اللوحة يُعلَّم (+FAR)، ولو غطّت هذه الألوان جزءًا
+      ملحوظًا من الإطار فهو يحتاج لوحة جديدة (بكسلات antialiasing المتفرقة لا تكفي)
+    """
+
+    MAX_ERROR = 3 * 24 ** 2
+    MAX_FAR_FRACTION = 0.001
+    FAR = 256
+
+    def __init__(self):
+        self.lut = np.empty(1 << 24, dtype=np.int16)
+        self.palette_image = None
+
+    def reset(self, palette_image: Image.Image) -> None:
+        """لوحة جديدة (median cut من إطار كامل) – الجدول يبدأ من الصفر"""
+        colors = np.array(palette_image.getpalette(), dtype=np.int32).reshape(-1, 3)[:256]
+        self.colors = colors
+        self.palette_image = palette_image
+        self.lut.fill(-1)
+
+    def map(self, rgba: np.ndarray) -> Optional[Image.Image]:
+        """يرجع صورة P باللوحة الحالية، أو None لو الإطار فيه ألوان كثيرة بعيدة عنها"""
+        # RGBA متصلة → uint32 واحد لكل بكسل (little endian: r | g << 8 | b << 16)
+        packed = np.ascontiguousarray(rgba).view(np.uint32)[..., 0] & 0xFFFFFF
+        index = self.lut[packed]
+
+        missing = index == -1
+        if missing.any():
+            new = np.unique(packed[missing])
+            values = np.stack([new & 255, (new >> 8) & 255, (new >> 16) & 255], axis=1).astype(np.int32)
+            distance = ((values[:, None, :] - self.colors[None, :, :]) ** 2).sum(axis=2)
+            best = distance.argmin(axis=1)
+            error = distance[np.arange(len(new)), best]
+            self.lut[new] = np.where(error > self.MAX_ERROR, best + self.FAR, best)
+            index = self.lut[packed]
+
+        if np.count_nonzero(index >= self.FAR) > self.MAX_FAR_FRACTION * index.size:
+            return None
+        height, width = packed.shape
+        image = Image.frombytes("P", (width, height), (index & 255).astype(np.uint8).tobytes())
+        image.putpalette(self.palette_image.getpalette())
+        return image
+
+
+# ────────────────────────────────────────────────
+# كتابة الإطارات أثناء إنتاجها (ذاكرة ثابتة مهما كان عدد الإطارات)
+# ────────────────────────────────────────────────
+class _GifStream:
+    """
+    GIF يُكتب إطارًا بإطار – في الذاكرة إطار واحد فقط (الأخير، لأن مدته لم تُحسم بعد)
+    - لوحة الألوان من الإطار الأول ولا يُعاد حسابها إلا عند ظهور ألوان بعيدة عنها
+    - الإطارات المكررة تتحول لإطالة مدة الإطار السابق
+    - delta: الإطار المتغير يُكتب كمستطيل البكسلات المتغيرة فقط فوق السابق (disposal=1)
+      – الحجم يتبع الحركة وليس عدد الإطارات، والإطارات بعد فك الترميز كما هي
+    """
+
+    def __init__(self, output_file: str, fps: float, delta: bool = GIF_DELTA_FRAMES):
+        self.duration = int(1000 / fps)
+        self.delta = delta
+        self.mapper = _PaletteMapper()
+        self.fp = open(output_file, "wb")
+        self.global_palette = None
+        self.previous = None    # (فهارس آخر إطار كامل، لوحته)
+        self.pending = None     # [صورة P (كاملة أو مقصوصة)، المدة، الإزاحة]
+
+    def append(self, rgba: np.ndarray, changed: bool = True) -> None:
+        if self.pending is not None and not changed:
+            self.pending[1] += self.duration
+            return
+
+        image = self.mapper.map(rgba) if self.mapper.palette_image is not None else None
+        if image is None:
+            rgb = np.ascontiguousarray(np.asarray(rgba)[..., :3])
+            image = Image.fromarray(rgb).convert("P", palette=Image.Palette.ADAPTIVE)
+            self.mapper.reset(image)
+
+        indices = np.asarray(image)
+        palette = image.getpalette()
+        offset = (0, 0)
+        if self.previous is not None and palette == self.previous[1]:
+            changed_pixels = indices != self.previous[0]
+            if not changed_pixels.any():
+                self.pending[1] += self.duration
+                return
+            if self.delta:
+                rows = np.flatnonzero(changed_pixels.any(axis=1))
+                cols = np.flatnonzero(changed_pixels.any(axis=0))
+                offset = (int(cols[0]), int(rows[0]))
+                image = image.crop((offset[0], offset[1], int(cols[-1]) + 1, int(rows[-1]) + 1))
+        self._flush()
+        self.previous = (indices, palette)
+        self.pending = [image, self.duration, offset]
+
+    def _flush(self) -> None:
+        if self.pending is None:
+            return
+        image, duration, offset = self.pending
+        if self.global_palette is None:
+            header, _ = GifImagePlugin.getheader(image, info={"loop": 0, "duration": duration})
+            for block in header:
+                self.fp.write(block)
+            self.global_palette = image.getpalette()
+        local = image.getpalette() != self.global_palette
+        options = {"disposal": 1} if self.delta else {}
+        for block in GifImagePlugin.getdata(image, offset, duration=duration, include_color_table=local, **options):
+            self.fp.write(block)
+        self.pending = None
+
+    def close(self) -> None:
+        try:
+            self._flush()
+            if self.global_palette is not None:
+                self.fp.write(b";")
+        finally:
+            self.fp.close()
+
+
+class _MemmapStream:
+    """
+    إطارات RGBA خام في ملف .npy (frames × H × W × 4) عبر memmap
+    – الصفحات تُكتب للقرص بدل البقاء في الذاكرة، والملف يُقرأ لاحقًا بـ np.load(mmap_mode='r')
+    """
+
+    def __init__(self, output_file: str, frames: int):
+        self.output_file = output_file
+        self.frames = frames
+        self.array = None
+        self.count = 0
+
+    def append(self, rgba: np.ndarray, changed: bool = True) -> None:
+        if self.count >= self.frames:
+            raise ValueError(f"عدد الإطارات أكبر من المتوقع ({self.frames})")
+        rgba = np.asarray(rgba)
+        if self.array is None:
+            self.array = np.lib.format.open_memmap(
+                self.output_file, mode="w+", dtype=np.uint8, shape=(self.frames,) + rgba.shape,
+            )
+        if changed or self.count == 0:
+            self.array[self.count] = rgba
+        else:
+            self.array[self.count] = self.array[self.count - 1]
+        self.count += 1
+
+    def close(self) -> None:
+        if self.array is not None:
+            self.array.flush()
+            self.array = None
+
+
+def open_frame_stream(output_file: str, fps: float, frames: int, delta: bool = None):
+    """
+    مخرج متدفق حسب امتداد الملف: .gif → GIF يُرمَّز أثناء الرسم، .npy → إطارات خام (memmap)
+    delta (GIF فقط، الافتراضي GIF_DELTA_FRAMES): الإطارات المتغيرة كمستطيلات المنطقة المتغيرة بدل إطارات كاملة
+    الواجهة: append(rgba, changed=True) ثم close()
+    """
+    extension = os.path.splitext(output_file)[1].lower()
+    if extension == ".gif":
+        return _GifStream(output_file, fps, GIF_DELTA_FRAMES if delta is None else delta)
+    if extension == ".npy":
+        return _MemmapStream(output_file, frames)
+    raise ValueError(f"صيغة غير مدعومة للأنيميشن: {output_file} (المدعوم: .gif, .npy)")
+
+
+def _encoder_settings(output_file: str) -> Dict:
+    """إعدادات الترميز التي تغيّر الملف الناتج – جزء من مفتاح الكاش"""
+    extension = os.path.splitext(output_file)[1].lower()
+    if extension == ".gif":
+        return {"format": extension, "delta": GIF_DELTA_FRAMES}
+    return {"format": extension}
+
+
+def _write_frames(frames, output_file: str, fps: float, count: int) -> None:
+    """تمرير (RGBA، تغير؟) من generator إلى المخرج المتدفق"""
+    stream = open_frame_stream(output_file, fps, count)
+    try:
+        for rgba, changed in frames:
+            stream.append(rgba, changed)
+    finally:
+        stream.close()
+
+
+class StreamingFrameWriter(AbstractMovieWriter):
+    """
+    بديل PillowWriter لـ FuncAnimation.save: كل إطار يُرمَّز فور التقاطه
+    بدل الاحتفاظ بكل الإطارات حتى النهاية
+    """
+
+    def __init__(self, fps: float = 5, frames: int = None):
+        super().__init__(fps=fps)
+        self.frames = frames
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi=dpi)
+        self._stream = open_frame_stream(str(outfile), self.fps, self.frames)
+
+    def grab_frame(self, **savefig_kwargs):
+        buf = BytesIO()
+        self.fig.savefig(buf, **{**savefig_kwargs, "format": "rgba", "dpi": self.dpi})
+        width, height = self.frame_size
+        self._stream.append(np.frombuffer(buf.getbuffer(), dtype=np.uint8).reshape(height, width, 4))
+
+    def finish(self):
+        self._stream.close()
+
 
 def create_pressure_animation(
     pressure_layers: List[PlaneLayer],
@@ -44,9 +482,81 @@ def create_pressure_animation(
     max_depth_multiplier: float = 14.0,
     title: str = "محاكاة ضغط عبر طبقات Plane Layer",
     custom_text: str = None,
-) -> None:
+    fast: bool = True,
+    workers: int = None,
+    use_cache: bool = True,
+    dpi: int = PRESSURE_DPI,
+    metrics: Metrics = None,
+    profile_samples: int = None,
+) -> str:
+    """
+    fast=True: العناصر تُنشأ مرة واحدة والتشوه محسوب مسبقًا لكل الإطارات (نفس الصورة الناتجة)
+    fast=False: المسار الكلاسيكي (ax.clear وإعادة الرسم كاملًا في كل إطار)
+    workers > 1: الإطارات تُقسم على processes (كل عامل له figure خاصة) ثم تُجمع بالترتيب
+    output_file: .gif أو .npy (إطارات RGBA خام) – في كل المسارات الإطار يُكتب فور رسمه
+    use_cache: نفس الطبقات ونفس المعاملات → نسخ الملف من الكاش بدل الرسم
+    metrics: مكان تسجيل زمن الرسم والترميز (الافتراضي: default_metrics())
+    profile_samples: عدد نقاط شكل السمكة (الافتراضي PROFILE_SAMPLES)
+    """
     if not pressure_layers:
         raise ValueError("يجب تمرير طبقة ضغط واحدة على الأقل")
+    metrics = metrics or default_metrics()
+
+    key = None
+    if use_cache:
+        # fast و workers لا يغيّران الصورة الناتجة – ليسا جزءًا من المفتاح
+        key = animation_key(
+            "pressure", pressure_layers,
+            encoder=_encoder_settings(output_file),
+            figsize=PRESSURE_FIGSIZE, dpi=dpi,
+            half_width=half_width, frames=frames, max_pressure_frame=max_pressure_frame,
+            fps=fps, talon_drop_factor=talon_drop_factor, power_exponent=power_exponent,
+            max_depth_multiplier=max_depth_multiplier, title=title, custom_text=custom_text,
+            profile_samples=profile_samples or PROFILE_SAMPLES,
+        )
+        if default_cache().fetch(key, output_file):
+            print(f"تم حفظ (من الكاش): {output_file}")
+            return output_file
+
+    if workers and workers > 1:
+        pressure = pressure_curve(frames, max_pressure_frame)
+        keys = [(frame == 0, p) for frame, p in enumerate(pressure)]
+        scene = {
+            "kind": "pressure",
+            "figsize": PRESSURE_FIGSIZE,
+            "dpi": dpi,
+            "pressure_layers": list(pressure_layers),
+            "frames": frames,
+            "max_pressure_frame": max_pressure_frame,
+            "half_width": half_width,
+            "power_exponent": power_exponent,
+            "max_depth_multiplier": max_depth_multiplier,
+            "talon_drop_factor": talon_drop_factor,
+            "title": title,
+            "custom_text": custom_text,
+            "profile_samples": profile_samples,
+        }
+        with metrics.stage(STAGE_ANIMATION_ENCODING, kind="pressure", mode="parallel"):
+            _render_frames_parallel(scene, keys, output_file, fps, workers)
+        return _finish_animation(output_file, key)
+
+    if fast:
+        pressure, y_frames = deformation_frames(
+            pressure_layers, frames, max_pressure_frame,
+            half_width, power_exponent, max_depth_multiplier, profile_samples,
+        )
+        fig, ax = plt.subplots(figsize=PRESSURE_FIGSIZE, dpi=dpi)
+        fig.tight_layout()   # نفس توقيت المسار الكلاسيكي (قبل إنشاء أي عنصر)
+        update = _build_pressure_artists(
+            ax, pressure_layers, pressure, y_frames,
+            half_width, talon_drop_factor, title, custom_text,
+        )
+        # الإطار يتحدد بالكامل بقيمة الضغط (+ الـ legend في الإطار 0)
+        keys = [(frame == 0, p) for frame, p in enumerate(pressure)]
+        with metrics.stage(STAGE_ANIMATION_ENCODING, kind="pressure", mode="fast"):
+            _write_frames(_blit_frames(fig, ax, update, range(frames), keys), output_file, fps, frames)
+        plt.close(fig)
+        return _finish_animation(output_file, key)
 
     main_layer = pressure_layers[-1]
     plane_center = main_layer.position[0]
@@ -54,9 +564,10 @@ def create_pressure_animation(
     total_force = sum(layer.force for layer in pressure_layers)
 
     # معامل ضغط من الديمو الثابت (أقل مبالغة)
-    pressure_factor = total_force * 0.018
+    pressure_factor = total_force * PRESSURE_FORCE_SCALE
+    X, Y_ORIGINAL = fish_profile(profile_samples)
 
-    fig, ax = plt.subplots(figsize=(12, 7), dpi=120)
+    fig, ax = plt.subplots(figsize=PRESSURE_FIGSIZE, dpi=dpi)
 
     def update(frame):
         ax.clear()
@@ -123,7 +634,211 @@ def create_pressure_animation(
     ani = FuncAnimation(fig, update, frames=frames, interval=60, blit=False)
     
     fig.tight_layout()
-    ani.save(output_file, writer=PillowWriter(fps=fps), dpi=120, bbox_inches='tight')
+    with metrics.stage(STAGE_ANIMATION_ENCODING, kind="pressure", mode="classic"):
+        ani.save(output_file, writer=StreamingFrameWriter(fps=fps, frames=frames), dpi=dpi)
     
     plt.close(fig)
-    print(f"تم حفظ: {output_file}")
\ No newline at end of file
+    return _finish_animation(output_file, key)
+
+
+def _finish_animation(output_file: str, key: Optional[str], announce: bool = True) -> str:
+    """حفظ نسخة في الكاش (لو مفعل) وإرجاع مسار الملف الناتج"""
+    if key is not None:
+        default_cache().store(key, output_file)
+    if announce:
+        print(f"تم حفظ: {output_file}")
+    return output_file
+
+
+# ────────────────────────────────────────────────
+# أنيميشن سلسلة plane.x2 (يستخدمها AISmartWorkflow.animate_interaction)
+# ────────────────────────────────────────────────
+def chain_curve(pair_forces: List[float]) -> Tuple[List[float], List[float]]:
+    """
+    المجموع التراكمي [0, f0, f0+f1, ...] وأعلى قيمة حتى كل نقطة – يُحسب مرة واحدة لكل أنيميشن
+    (بدل إعادة الجمع في كل إطار: O(n) كليًا بدل O(frames × n))
+    """
+    cumulative = list(itertools.accumulate(pair_forces, initial=0))
+    return cumulative, list(itertools.accumulate(cumulative, max))
+
+
+def chain_force_history(cumulative: List[float], frame: int) -> List[float]:
+    """
+    المنحنى التراكمي كما يظهر في الإطار frame (cumulative من chain_curve)
+    (FuncAnimation.save يرسم الإطار 0 مرة إضافية قبل الحفظ – لذلك أول قيمة مكررة)
+    """
+    limit = len(cumulative) - 1
+    shown = min(frame, limit) + 1
+    return [0, cumulative[0]] + cumulative[:shown] + [cumulative[limit]] * (frame + 1 - shown)
+
+
+def _draw_chain_frame(ax, frame: int, chain: List[str], positions: List[float], pair_forces: List[float],
+                      curve: Tuple[List[float], List[float]]):
+    """رسم إطار واحد من السلسلة – يعتمد فقط على رقم الإطار (curve من chain_curve)"""
+    ax.clear()
+    for i in range(min(frame, len(chain)-1)):
+        f = pair_forces[i]
+        ax.arrow(positions[i], 0, positions[i+1]-positions[i], 0,
+                 head_width=0.05, head_length=0.1, fc='blue', ec='blue', alpha=0.6)
+        ax.text((positions[i]+positions[i+1])/2, 0.1, f"{f:.2f}×2", fontsize=9)
+
+    cumulative, peaks = curve
+    forces_accum = chain_force_history(cumulative, frame)
+    ax.plot(range(len(forces_accum)), forces_accum, 'r-o', lw=2, label="Accumulated Effect")
+    ax.set_xlim(min(positions)-0.5, max(positions)+0.5)
+    ax.set_ylim(-0.2, peaks[min(frame, len(peaks) - 1)]*1.3 + 0.5)
+    ax.set_title(f"Plane.x2 Effected Chain: {' → '.join(chain)}")
+    ax.set_xlabel("Position")
+    ax.set_ylabel("Accumulated Interaction Force")
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+
+def create_chain_animation(
+    chain: List[str],
+    positions: List[float],
+    pair_forces: List[float],
+    output_file: str = "plane_chain.gif",
+    workers: int = None,
+    use_cache: bool = True,
+    dpi: int = CHAIN_DPI,
+    metrics: Metrics = None,
+    padding_frames: int = CHAIN_PADDING_FRAMES,
+) -> str:
+    """
+    animation بسيط للسلسلة (positions = x لكل طبقة، pair_forces = x2_effected لكل زوج)
+    output_file: .gif أو .npy (إطارات RGBA خام) – الإطارات تُكتب أثناء الرسم
+    use_cache: نفس السلسلة بنفس المواقع والقوى → نسخ الملف من الكاش بدل الرسم
+    metrics: مكان تسجيل زمن الرسم والترميز (الافتراضي: default_metrics())
+    padding_frames: عدد إطارات الحالة الأخيرة (الافتراضي CHAIN_PADDING_FRAMES)
+    """
+    metrics = metrics or default_metrics()
+    frames = len(chain) + padding_frames
+    positions = [float(p) for p in positions]
+    pair_forces = [float(f) for f in pair_forces]
+
+    key = None
+    if use_cache:
+        key = animation_key(
+            "chain", chain=list(chain), positions=positions, pair_forces=pair_forces,
+            encoder=_encoder_settings(output_file),
+            figsize=CHAIN_FIGSIZE, dpi=dpi, fps=CHAIN_FPS, padding_frames=padding_frames,
+        )
+        if default_cache().fetch(key, output_file):
+            return output_file
+
+    curve = chain_curve(pair_forces)
+    if workers and workers > 1:
+        scene = {
+            "kind": "chain",
+            "figsize": CHAIN_FIGSIZE,
+            "dpi": dpi,
+            "chain": list(chain),
+            "positions": positions,
+            "pair_forces": pair_forces,
+            "curve": curve,
+        }
+        with metrics.stage(STAGE_ANIMATION_ENCODING, kind="chain", mode="parallel"):
+            _render_frames_parallel(scene, list(range(frames)), output_file, CHAIN_FPS, workers)
+        return _finish_animation(output_file, key, announce=False)
+
+    fig, ax = plt.subplots(figsize=CHAIN_FIGSIZE)
+    ani = FuncAnimation(
+        fig, lambda frame: _draw_chain_frame(ax, frame, chain, positions, pair_forces, curve),
+        frames=frames, interval=800, repeat=True,
+    )
+    with metrics.stage(STAGE_ANIMATION_ENCODING, kind="chain", mode="serial"):
+        ani.save(output_file, writer=StreamingFrameWriter(fps=CHAIN_FPS, frames=frames), dpi=dpi)
+    plt.close(fig)
+    return _finish_animation(output_file, key, announce=False)
+
+
+# ────────────────────────────────────────────────
+# رندر متوازي: كل عامل له figure خاصة (Agg) ويكتب RGBA في shared memory
+# ────────────────────────────────────────────────
+def _scene_figure(scene: Dict):
+    fig = Figure(figsize=scene["figsize"], dpi=scene["dpi"])
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    return fig, ax
+
+
+# حالة كل عامل: figure + الذاكرة المشتركة تُنشأ مرة واحدة في initializer وتبقى لكل الدفعات
+_worker_state: Dict = {}
+
+
+def _init_scene_worker(scene: Dict, shm_name: str, shape: Tuple) -> None:
+    fig, ax = _scene_figure(scene)
+    update = None
+    if scene["kind"] == "pressure":
+        layers = scene["pressure_layers"]
+        fig.tight_layout()
+        pressure, y_frames = deformation_frames(
+            layers, scene["frames"], scene["max_pressure_frame"], scene["half_width"],
+            scene["power_exponent"], scene["max_depth_multiplier"], scene["profile_samples"],
+        )
+        update = _build_pressure_artists(
+            ax, layers, pressure, y_frames, scene["half_width"],
+            scene["talon_drop_factor"], scene["title"], scene["custom_text"],
+        )
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_state.update(
+        scene=scene, fig=fig, ax=ax, update=update, shm=shm,
+        out=np.ndarray(shape, dtype=np.uint8, buffer=shm.buf),
+    )
+
+
+def _render_scene_frames(frame_ids: List[int], slots: List[int]) -> int:
+    """عامل (في process منفصل): يرسم frame_ids ويكتبها في الأماكن slots من الذاكرة المشتركة"""
+    scene, fig, ax, out = (_worker_state[k] for k in ("scene", "fig", "ax", "out"))
+    if scene["kind"] == "pressure":
+        for slot, (rgba, _) in zip(slots, _blit_frames(fig, ax, _worker_state["update"], frame_ids)):
+            out[slot] = rgba
+    else:
+        for slot, frame in zip(slots, frame_ids):
+            _draw_chain_frame(ax, frame, scene["chain"], scene["positions"], scene["pair_forces"], scene["curve"])
+            fig.canvas.draw()
+            out[slot] = np.asarray(fig.canvas.buffer_rgba())
+    return len(frame_ids)
+
+
+def _render_frames_parallel(scene: Dict, keys: List, output_file: str, fps: float, workers: int) -> None:
+    """
+    keys: مفتاح حالة لكل إطار – الإطارات المتتالية بنفس المفتاح تُرسم مرة واحدة
+    الإطارات تُرسم على دفعات (PARALLEL_BATCH_FRAMES لكل عامل) في ذاكرة مشتركة بحجم دفعة واحدة،
+    وكل دفعة تُكتب بالترتيب للمخرج المتدفق قبل رسم التالية
+    """
+    frame_ids = [i for i in range(len(keys)) if i == 0 or keys[i] != keys[i-1]]
+    repeats = np.diff(frame_ids + [len(keys)]).tolist()
+    if not frame_ids:
+        return
+
+    probe = Figure(figsize=scene["figsize"], dpi=scene["dpi"])
+    width, height = FigureCanvasAgg(probe).get_width_height()
+    workers = min(workers, len(frame_ids))
+    batch = min(workers * PARALLEL_BATCH_FRAMES, len(frame_ids))
+    shape = (batch, height, width, 4)
+
+    stream = open_frame_stream(output_file, fps, len(keys))
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+    try:
+        frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_scene_worker,
+                                 initargs=(scene, shm.name, shape)) as pool:
+            for first in range(0, len(frame_ids), batch):
+                ids = frame_ids[first:first + batch]
+                chunks = [c for c in np.array_split(np.arange(len(ids)), workers) if len(c)]
+                futures = [
+                    pool.submit(_render_scene_frames, [ids[i] for i in chunk], chunk.tolist())
+                    for chunk in chunks
+                ]
+                for future in futures:
+                    future.result()
+                for slot, count in enumerate(repeats[first:first + batch]):
+                    for repeat in range(count):
+                        stream.append(frames[slot], repeat == 0)
+        del frames
+    finally:
+        stream.close()
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,122 @@
+import os
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import Executor, Future
+from typing import Callable, Optional
+
+from Instrumentation import STAGE_RENDERING
+
+
+# ────────────────────────────────────────────────
+# حد التزامن لكل process (أعمال CPU الثقيلة فقط)
+# ────────────────────────────────────────────────
+DEFAULT_MAX_CONCURRENCY = os.cpu_count() or 1
+
+
+class AsyncRunner:
+    """
+    تشغيل أعمال CPU الثقيلة (رسم وترميز الأنيميشن) من asyncio بدون حجز الـ event loop
+    - executor افتراضي: processes بـ spawn (pyplot ليس thread-safe، و spawn آمن مع loop يعمل)
+    - max_concurrency: أقصى عدد أعمال في الـ executor في نفس الوقت – الباقي ينتظر دوره
+    - timeout / إلغاء: المنتظر يتحرر فورًا، والعمل الجاري يكمل في الخلفية ويحتفظ بمقعده
+      حتى ينتهي (حتى لا يتخطى عدد الأعمال الفعلية الحد)
+    """
+
+    def __init__(self, max_concurrency: int = None, executor: Executor = None, use_processes: bool = True):
+        self.max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+        self.use_processes = use_processes
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self.in_flight = 0
+
+    def _slots(self) -> asyncio.Semaphore:
+        # Semaphore يرتبط بالـ loop – runner مشترك قد يُستخدم من أكثر من asyncio.run
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def executor(self) -> Optional[Executor]:
+        if self._executor is None and self.use_processes:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor          # None → thread pool الافتراضي للـ loop
+
+    async def run(self, fn: Callable, *args, timeout: float = None, **kwargs):
+        """fn(*args, **kwargs) في الـ executor – fn والمعاملات لازم تكون picklable مع processes"""
+        semaphore = self._slots()
+        await semaphore.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor(), functools.partial(fn, *args, **kwargs)
+            )
+        except BaseException:
+            semaphore.release()
+            raise
+        self.in_flight += 1
+
+        def release(done: Future):
+            self.in_flight -= 1
+            semaphore.release()
+            if not done.cancelled():
+                done.exception()       # نتيجة عمل أُلغي انتظاره – لا تحذير "never retrieved"
+
+        future.add_done_callback(release)
+        # shield: إلغاء المنتظر لا يلغي الـ future فيحرر المقعد قبل انتهاء العمل فعليًا
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def __repr__(self) -> str:
+        return (
+            f"AsyncRunner(max_concurrency={self.max_concurrency}, in_flight={self.in_flight}, "
+            f"executor={type(self._executor).__name__ if self._executor else None})"
+        )
+
+
+_default_runner: Optional[AsyncRunner] = None
+
+
+def default_runner() -> AsyncRunner:
+    """الـ runner المشترك في الـ process (حد تزامن واحد لكل الـ workflows)"""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = AsyncRunner()
+    return _default_runner
+
+
+# ────────────────────────────────────────────────
+# واجهات async
+# ────────────────────────────────────────────────
+async def render_workflow(workflow, show_animation_log: bool = True, time_scale: float = 0.2,
+                          timeout: float = None) -> float:
+    """
+    render_sequentially بـ asyncio.sleep بين الخطوات – مئات الـ workflows على loop واحد
+    (حساب الخطوة نفسه خفيف ويعمل على الـ loop مباشرة)
+    """
+    async def steps() -> float:
+        total_time = 0.0
+        with workflow.metrics.stage(STAGE_RENDERING, mode="async"):
+            for step_time in workflow._render_steps():
+                # sleep(0) حتى مع time_scale=0 – الـ loop يأخذ دوره بين كل خطوتين
+                await asyncio.sleep(step_time * time_scale if time_scale > 0 else 0)
+                total_time += step_time
+        return workflow._finish_render(total_time, show_animation_log)
+
+    return await asyncio.wait_for(steps(), timeout)
+
+
+async def create_pressure_animation_async(*args, timeout: float = None, runner: AsyncRunner = None, **kwargs) -> str:
+    """create_pressure_animation في الـ executor – نفس المعاملات (metrics لا تعبر للـ processes)"""
+    from AI_Smart_Work_flow import create_pressure_animation
+    return await (runner or default_runner()).run(create_pressure_animation, *args, timeout=timeout, **kwargs)
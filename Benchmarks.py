@@ -0,0 +1,305 @@
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import tempfile
+from contextlib import contextmanager, redirect_stdout
+from typing import Callable, Dict, List
+
+import numpy as np
+import matplotlib
+
+from Plane_Layers import PlaneLayer, PlaneLayerSet
+
+
+# ────────────────────────────────────────────────
+# إعدادات القياس
+# ────────────────────────────────────────────────
+TASK_SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5]
+CHAIN_LENGTHS = [10 ** 2, 10 ** 3, 10 ** 4]
+PAIR_COUNT = 20_000
+ANIMATION_DPIS = [60, 120]
+ANIMATION_FRAMES = [24, 72]
+CHAIN_ANIMATION_LENGTHS = [5, 20]
+DEFAULT_TOLERANCE = 0.15       # تراجع أكبر من 15% يُعتبر regression
+
+QUICK_TASK_SIZES = [10 ** 2, 10 ** 3]
+QUICK_CHAIN_LENGTHS = [10 ** 2, 10 ** 3]
+QUICK_PAIR_COUNT = 2_000
+QUICK_ANIMATION_DPIS = [60]
+QUICK_ANIMATION_FRAMES = [12]
+QUICK_CHAIN_ANIMATION_LENGTHS = [5]
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    """أفضل زمن من repeat محاولات (الأقل تأثرًا بضوضاء الجهاز)"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+@contextmanager
+def _quiet_output():
+    """
+    الـ log يبقى يُنشأ (تكلفته جزء من المسار الحقيقي) لكن لا يُكتب للـ terminal،
+    و print الخاص بالأنيميشن يذهب لـ stderr حتى لا يختلط بـ JSON على stdout
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    root.handlers = [logging.NullHandler()]
+    try:
+        with redirect_stdout(sys.stderr):
+            yield
+    finally:
+        root.handlers = handlers
+
+
+def _metric(value: float, unit: str, higher_is_better: bool, **params) -> Dict:
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better, "params": params}
+
+
+def _random_planes(count: int, rng: np.random.Generator) -> List[PlaneLayer]:
+    positions = rng.uniform(-3.0, 3.0, size=(count, 3))
+    return [
+        PlaneLayer(f"p{i}", positions[i], force=float(rng.uniform(1, 20)),
+                   depth=float(rng.uniform(0.2, 2.0)), radius=float(rng.uniform(0.5, 2.0)))
+        for i in range(count)
+    ]
+
+
+def build_workflow(size: int, seed: int = 0):
+    """
+    workflow صناعي بحجم size: 10% planes، والباقي objects تعتمد على مهام سابقة،
+    + قواعد دمج على أزواج متجاورة
+    """
+    from AI_Smart_Work_flow import AISmartWorkflow
+
+    rng = np.random.default_rng(seed)
+    workflow = AISmartWorkflow()
+    planes = max(1, size // 10)
+    for i in range(planes):
+        workflow.add_task(
+            f"plane_{i}", complexity=float(rng.uniform(1, 5)), is_plane=True,
+            plane_position=rng.uniform(-50, 50, size=3).tolist(), plane_force=float(rng.uniform(1, 20)),
+        )
+    for i in range(size - planes):
+        deps = [f"object_{j}" for j in rng.integers(0, i, size=min(i, 2))] if i else []
+        workflow.add_task(f"object_{i}", complexity=float(rng.uniform(1, 8)), dependencies=deps)
+    for i in range(0, size - planes - 1, 50):
+        workflow.set_integration_rule([f"object_{i}", f"object_{i + 1}"], priority=1)
+    return workflow
+
+
+# ────────────────────────────────────────────────
+# الفيزياء
+# ────────────────────────────────────────────────
+def bench_physics(pair_count: int, repeat: int) -> Dict[str, Dict]:
+    rng = np.random.default_rng(1)
+    planes = _random_planes(pair_count + 1, rng)
+    pairs = list(zip(planes[:-1], planes[1:]))
+
+    interact = _best_of(lambda: [a.interact(b) for a, b in pairs], repeat)
+    x2 = _best_of(lambda: [a.x2_effected(b) for a, b in pairs], repeat)
+
+    plane_set = PlaneLayerSet.from_layers(planes)
+    first = np.arange(pair_count)
+    vector = _best_of(lambda: plane_set.pair_x2_effected(first, first + 1), repeat)
+
+    return {
+        "physics.interact": _metric(pair_count / interact, "pairs/s", True, pairs=pair_count),
+        "physics.x2_effected": _metric(pair_count / x2, "pairs/s", True, pairs=pair_count),
+        "physics.x2_effected_vectorized": _metric(pair_count / vector, "pairs/s", True, pairs=pair_count),
+    }
+
+
+def bench_chains(lengths: List[int], repeat: int) -> Dict[str, Dict]:
+    from AI_Smart_Work_flow import AISmartWorkflow
+
+    results = {}
+    rng = np.random.default_rng(2)
+    for length in lengths:
+        workflow = AISmartWorkflow()
+        for plane in _random_planes(length, rng):
+            workflow.planes[plane.name] = plane
+        chain = [f"p{i}" for i in range(length)]
+
+        def cold():
+            # كل محاولة من غير كاش القوى بين الأزواج (وإلا تقيس الكاش فقط)
+            workflow._pair_forces.clear()
+            workflow.simulate_chain(chain)
+
+        seconds = _best_of(cold, repeat)
+        cached = _best_of(lambda: workflow.simulate_chain(chain), repeat)
+        results[f"simulate_chain.{length}"] = _metric(seconds, "s", False, length=length)
+        results[f"simulate_chain.cached.{length}"] = _metric(cached, "s", False, length=length)
+    return results
+
+
+# ────────────────────────────────────────────────
+# الجدولة
+# ────────────────────────────────────────────────
+def bench_scheduling(sizes: List[int], repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for size in sizes:
+        started = time.perf_counter()
+        workflow = build_workflow(size)
+        build = time.perf_counter() - started
+
+        # أول استدعاء يبني الخطة، وما بعده يرجع الخطة المخزنة
+        started = time.perf_counter()
+        workflow.optimize_sequence()
+        cold = time.perf_counter() - started
+        warm = _best_of(workflow.optimize_sequence, repeat)
+        render = _best_of(lambda: workflow.render_sequentially(show_animation_log=False, time_scale=0), repeat)
+        estimate = _best_of(lambda: workflow.estimate_render(workers=[1, 4, 16]), repeat)
+
+        results[f"workflow.build.{size}"] = _metric(build, "s", False, tasks=size)
+        results[f"optimize_sequence.cold.{size}"] = _metric(cold, "s", False, tasks=size)
+        results[f"optimize_sequence.cached.{size}"] = _metric(warm, "s", False, tasks=size)
+        results[f"render_sequentially.{size}"] = _metric(render, "s", False, tasks=size)
+        results[f"estimate_render.{size}"] = _metric(estimate, "s", False, tasks=size, workers=[1, 4, 16])
+    return results
+
+
+# ────────────────────────────────────────────────
+# الأنيميشن
+# ────────────────────────────────────────────────
+def bench_animations(dpis: List[int], frame_counts: List[int], chain_lengths: List[int]) -> Dict[str, Dict]:
+    from Animations import create_pressure_animation
+    from AI_Smart_Work_flow import AISmartWorkflow
+
+    results = {}
+    layers = [
+        PlaneLayer("nest_plane", [0.0, 1.75, 0.0], force=4.5),
+        PlaneLayer("eagle_plane", [0.0, 2.25, 0.0], force=18.0),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        for dpi in dpis:
+            for frames in frame_counts:
+                output = os.path.join(directory, f"pressure_{dpi}_{frames}.gif")
+                started = time.perf_counter()
+                create_pressure_animation(
+                    layers, output_file=output, frames=frames,
+                    max_pressure_frame=max(1, frames * 7 // 12), dpi=dpi, use_cache=False,
+                )
+                seconds = time.perf_counter() - started
+                results[f"pressure_animation.dpi{dpi}.frames{frames}"] = _metric(
+                    frames / seconds, "frames/s", True, dpi=dpi, frames=frames)
+
+        rng = np.random.default_rng(3)
+        for length in chain_lengths:
+            workflow = AISmartWorkflow()
+            for i in range(length):
+                workflow.add_plane_task(f"p{i}", [i * 0.6, 1.0, 0.0], float(rng.uniform(1, 10)))
+            chain = [f"p{i}" for i in range(length)]
+            frames = length + 5
+            for dpi in dpis:
+                output = os.path.join(directory, f"chain_{dpi}_{length}.gif")
+                started = time.perf_counter()
+                workflow.animate_interaction(chain, output_file=output, dpi=dpi, use_cache=False)
+                seconds = time.perf_counter() - started
+                results[f"chain_animation.dpi{dpi}.length{length}"] = _metric(
+                    frames / seconds, "frames/s", True, dpi=dpi, frames=frames)
+    return results
+
+
+# ────────────────────────────────────────────────
+# التشغيل والمقارنة
+# ────────────────────────────────────────────────
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run_benchmarks(quick: bool = False, repeat: int = 3, suites: List[str] = None) -> Dict:
+    """
+    تشغيل كل المجموعات (أو المحددة في suites) – يرجع dict قابل للحفظ كـ JSON
+    quick=True: أحجام صغيرة للتجربة السريعة / CI
+    """
+    suites = suites or ["physics", "chains", "scheduling", "animations"]
+    results: Dict[str, Dict] = {}
+    with _quiet_output():
+        if "physics" in suites:
+            results.update(bench_physics(QUICK_PAIR_COUNT if quick else PAIR_COUNT, repeat))
+        if "chains" in suites:
+            results.update(bench_chains(QUICK_CHAIN_LENGTHS if quick else CHAIN_LENGTHS, repeat))
+        if "scheduling" in suites:
+            results.update(bench_scheduling(QUICK_TASK_SIZES if quick else TASK_SIZES, repeat))
+        if "animations" in suites:
+            results.update(bench_animations(
+                QUICK_ANIMATION_DPIS if quick else ANIMATION_DPIS,
+                QUICK_ANIMATION_FRAMES if quick else ANIMATION_FRAMES,
+                QUICK_CHAIN_ANIMATION_LENGTHS if quick else CHAIN_ANIMATION_LENGTHS,
+            ))
+    return {"environment": environment(), "quick": quick, "results": results}
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """
+    مقارنة مع baseline محفوظ – يرجع قائمة بكل مقياس مشترك:
+    change = نسبة التحسن (موجبة = أفضل)، regression لو التراجع أكبر من tolerance
+    """
+    report = []
+    for name, metric in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None or not reference["value"] or not metric["value"]:
+            continue
+        if metric["higher_is_better"]:
+            change = metric["value"] / reference["value"] - 1.0
+        else:
+            change = reference["value"] / metric["value"] - 1.0
+        report.append({
+            "name": name,
+            "baseline": reference["value"],
+            "current": metric["value"],
+            "unit": metric["unit"],
+            "change": change,
+            "regression": change < -tolerance,
+        })
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="قياس أداء الفيزياء والجدولة والأنيميشن")
+    parser.add_argument("--output", "-o", help="ملف JSON للنتائج (الافتراضي: stdout)")
+    parser.add_argument("--baseline", "-b", help="ملف JSON سابق للمقارنة")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--quick", action="store_true", help="أحجام صغيرة")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--suite", action="append", choices=["physics", "chains", "scheduling", "animations"])
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(quick=args.quick, repeat=args.repeat, suites=args.suite)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            current["comparison"] = compare(current, json.load(f), args.tolerance)
+
+    encoded = json.dumps(current, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(encoded + "\n")
+    else:
+        print(encoded)
+
+    regressions = [r for r in current.get("comparison", []) if r["regression"]]
+    for r in regressions:
+        print(f"تراجع: {r['name']} {r['change'] * 100:+.1f}% ({r['baseline']:.4g} → {r['current']:.4g} {r['unit']})",
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    matplotlib.use("Agg")
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import numpy as np
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
+
+from Plane_Layers import PlaneLayer
+
+
+# ────────────────────────────────────────────────
+# نموذج التشوه (نفس معاملات create_pressure_animation)
+# ────────────────────────────────────────────────
+PRESSURE_FORCE_SCALE = 0.018            # عمق التشوه لكل وحدة قوة قبل max_depth_multiplier
+DEFAULT_FOOTPRINT_SCALE = 1.8           # نصف عرض البصمة = radius × 1.8 (= DEFAULT_HALF_WIDTH لطبقة radius=1)
+DEFAULT_POWER_EXPONENT = 3.0
+DEFAULT_MAX_DEPTH_MULTIPLIER = 14.0
+
+_AXIS_INDEX = {"x": 0, "y": 1, "z": 2}
+
+
+def pressure_curve(frames: int, max_pressure_frame: int) -> np.ndarray:
+    """نسبة الضغط لكل إطار (smoothstep حتى max_pressure_frame ثم 1.0)"""
+    frame = np.arange(frames)
+    progress = frame / max_pressure_frame if max_pressure_frame else np.ones(frames)
+    progress = progress * progress * (3 - 2 * progress)
+    return np.where(frame < max_pressure_frame, progress, 1.0)
+
+
+class SurfaceGrid:
+    """
+    شبكة منتظمة 1D / 2D / 3D على محاور الطبقة (مثلًا ("x", "z") سطح أفقي تحت الطبقات)
+    lower / upper / shape لكل محور – نفس np.linspace(lower, upper, shape)
+    """
+
+    def __init__(
+        self,
+        axes: Sequence[str] = ("x", "z"),
+        lower: Sequence[float] = (-6.0, -6.0),
+        upper: Sequence[float] = (6.0, 6.0),
+        shape: Sequence[int] = (400, 400),
+    ):
+        if not (len(axes) == len(lower) == len(upper) == len(shape)):
+            raise ValueError("axes و lower و upper و shape لازم نفس الطول")
+        self.axes = tuple(axes)
+        self.axis_index = [_AXIS_INDEX[a] for a in self.axes]
+        self.shape = tuple(int(n) for n in shape)
+        self.coords = [np.linspace(lo, hi, n) for lo, hi, n in zip(lower, upper, self.shape)]
+        self.lower = np.array([c[0] for c in self.coords])
+        self.step = np.array([(c[-1] - c[0]) / (len(c) - 1) if len(c) > 1 else 1.0 for c in self.coords])
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    def window(self, center: Sequence[float], half_width: float) -> Tuple[slice, ...]:
+        """نطاق المؤشرات الذي يغطي [center - half_width, center + half_width] (مع هامش خلية)"""
+        lo = np.floor((np.asarray(center) - half_width - self.lower) / self.step).astype(int) - 1
+        hi = np.ceil((np.asarray(center) + half_width - self.lower) / self.step).astype(int) + 2
+        return tuple(
+            slice(max(l, 0), min(h, n)) for l, h, n in zip(lo, hi, self.shape)
+        )
+
+    def __repr__(self) -> str:
+        return f"SurfaceGrid(axes={self.axes}, shape={self.shape})"
+
+
+class DeformationField:
+    """
+    تشوه السطح من كل الطبقات معًا: كل طبقة تضغط عند موقعها هي وداخل بصمتها فقط
+      depth = Σ force × 0.018 × max_depth_multiplier × (1 - (r / half_width) ** power_exponent)
+    - الحساب على نافذة كل طبقة فقط (لا يمر على الشبكة كاملة لكل طبقة)
+    - طبقات ثابتة: مجال العمق يُحسب مرة واحدة، وكل إطار = base - pressure[frame] × depth
+    - طبقات متحركة (PlaneDynamics.run): النوافذ فقط تُعاد لكل إطار
+    - مستقل عن create_pressure_animation: الأنيميشن يبقى على نموذجه 1D (مجموع القوى عند
+      مركز آخر طبقة – deformation_frames) حتى لا تتغير صورته؛ هذا المجال لأسطح متعددة الطبقات
+    """
+
+    def __init__(
+        self,
+        grid: SurfaceGrid,
+        footprint_scale: float = DEFAULT_FOOTPRINT_SCALE,
+        power_exponent: float = DEFAULT_POWER_EXPONENT,
+        max_depth_multiplier: float = DEFAULT_MAX_DEPTH_MULTIPLIER,
+        base: np.ndarray = None,
+    ):
+        self.grid = grid
+        self.footprint_scale = float(footprint_scale)
+        self.power_exponent = float(power_exponent)
+        self.max_depth_multiplier = float(max_depth_multiplier)
+        # السطح قبل التشوه (ارتفاع لكل نقطة) – صفر افتراضيًا
+        self.base = np.zeros(grid.shape) if base is None else np.broadcast_to(np.asarray(base, dtype=float), grid.shape)
+
+    # ─── مجال العمق ───
+    def depth(self, positions, forces, radii, out: np.ndarray = None) -> np.ndarray:
+        """مجموع عمق التشوه من كل الطبقات (positions (N,3)، forces و radii (N,))"""
+        grid = self.grid
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)[:, grid.axis_index]
+        amplitudes = np.asarray(forces, dtype=float).reshape(-1) * PRESSURE_FORCE_SCALE * self.max_depth_multiplier
+        half_widths = np.asarray(radii, dtype=float).reshape(-1) * self.footprint_scale
+
+        field = np.zeros(grid.shape) if out is None else out
+        if out is not None:
+            field.fill(0.0)
+        for center, amplitude, half_width in zip(positions, amplitudes, half_widths):
+            if amplitude == 0.0 or half_width <= 0.0:
+                continue
+            window = grid.window(center, half_width)
+            if any(s.start >= s.stop for s in window):
+                continue        # البصمة خارج الشبكة
+            # مسافة كل نقطة في النافذة عن مركز الطبقة (broadcasting على المحاور)
+            offsets = [
+                (grid.coords[k][window[k]] - center[k]).reshape([-1 if j == k else 1 for j in range(grid.ndim)])
+                for k in range(grid.ndim)
+            ]
+            if grid.ndim == 1:
+                distance = np.abs(offsets[0])
+            else:
+                distance = np.sqrt(sum(o * o for o in offsets))
+            inside = distance <= half_width
+            falloff = 1 - (distance / half_width) ** self.power_exponent
+            field[window] += np.where(inside, amplitude * falloff, 0.0)
+        return field
+
+    def layer_depth(self, layers: Iterable[PlaneLayer], out: np.ndarray = None) -> np.ndarray:
+        layers = list(layers)
+        return self.depth(
+            [layer.coords for layer in layers] if layers else np.empty((0, 3)),
+            [layer.force for layer in layers],
+            [layer.radius for layer in layers],
+            out=out,
+        )
+
+    # ─── الإطارات ───
+    def frames(
+        self,
+        layers: Iterable[PlaneLayer],
+        frames: int = 120,
+        max_pressure_frame: int = 70,
+        pressure: np.ndarray = None,
+        out: np.ndarray = None,
+    ) -> Iterator[np.ndarray]:
+        """
+        ارتفاع السطح لكل إطار لطبقات ثابتة تضغط تدريجيًا (pressure_curve أو pressure جاهز)
+        out → كل إطار يُكتب في نفس المصفوفة (بدون تخصيص ذاكرة لكل إطار)
+        """
+        depth = self.layer_depth(layers)
+        if pressure is None:
+            pressure = pressure_curve(frames, max_pressure_frame)
+        for p in pressure:
+            if out is None:
+                yield self.base - p * depth
+            else:
+                np.multiply(depth, -p, out=out)
+                out += self.base
+                yield out
+
+    def dynamic_frames(self, states: Iterable[Dict], radii, out: np.ndarray = None) -> Iterator[np.ndarray]:
+        """
+        ارتفاع السطح لكل حالة من PlaneDynamics.run (positions و forces تتغير كل خطوة)
+        radii: أنصاف الأقطار بنفس ترتيب الطبقات (sim.radii)
+        """
+        scratch = np.empty(self.grid.shape)
+        for state in states:
+            depth = self.depth(state["positions"], state["forces"], radii, out=scratch)
+            if out is None:
+                yield self.base - depth
+            else:
+                np.subtract(self.base, depth, out=out)
+                yield out
+
+    def __repr__(self) -> str:
+        return f"DeformationField({self.grid!r}, footprint_scale={self.footprint_scale})"
@@ -0,0 +1,190 @@
+import time
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# ────────────────────────────────────────────────
+# أنواع الأحداث – الحقول: (name, other, a, b, c)
+# ────────────────────────────────────────────────
+EVENT_TASK_ADDED = 0            # name=المهمة، a=complexity
+EVENT_PROXY_APPLIED = 1         # name=المهمة، a=الوزن، b=bonus، c=pressure_factor
+EVENT_PLANE_CREATED = 2         # name=الطبقة، a=القوة
+EVENT_INTERACTION = 3           # name=task1، other=task2، a=النوع، b=القوى
+EVENT_INTERACTION_SKIPPED = 4   # name=task1، other=task2، a=النوع
+EVENT_ANIMATION = 5             # name=الملف، a=True لو في الطابور
+EVENT_PAIR_FORCE = 6            # name=الطبقة الأولى، other=الثانية، a=x2_effected
+EVENT_STEP = 7                  # name=الخطوة (list)، a=الزمن
+EVENT_RENDER_TOTAL = 8          # a=الزمن الكلي
+
+EVENT_NAMES = (
+    "task_added", "proxy_applied", "plane_created", "interaction", "interaction_skipped",
+    "animation", "pair_force", "step", "render_total",
+)
+
+DEFAULT_CAPACITY = 4096
+
+# جداول (قناة كاملة بجانب الأحداث)
+TABLE_ANIMATION = "animation"   # صف لكل خطوة plane / physics proxy في آخر رندر
+
+# (النوع، الزمن، name، other، a، b، c)
+Event = Tuple[int, float, object, object, object, object, object]
+
+
+def _format_step(e: Event) -> str:
+    step = e[2]
+    if len(step) > 1:
+        return f"دمج مجموعة: {', '.join(step)} → {e[4]:.1f}s"
+    return f"معالجة: {step[0]} → {e[4]:.1f}s"
+
+
+# النص يُبنى عند القراءة فقط (نفس رسائل logging السابقة)
+_FORMATTERS: Dict[int, Callable[[Event], str]] = {
+    EVENT_TASK_ADDED: lambda e: f"مهمة مضافة: {e[2]} (complexity={e[4]})",
+    EVENT_PROXY_APPLIED: lambda e: (
+        f"Physics proxy added to '{e[2]}': weight={e[4]}kg → +{e[5]:.2f} complexity (factor={e[6]})"
+    ),
+    EVENT_PLANE_CREATED: lambda e: f"أُنشئت طبقة تلقائية: {e[2]} (force={e[4]:.1f})",
+    EVENT_INTERACTION: lambda e: f"تفاعل '{e[4]}' أُنشئ تلقائيًا: {e[2]} ↔ {e[3]} → قوى: {e[5]}",
+    EVENT_INTERACTION_SKIPPED: lambda e: f"التفاعل '{e[4]}' بين {e[2]} و {e[3]} موجود بالفعل – تجاهل",
+    EVENT_ANIMATION: lambda e: (
+        f"أنيميشن تلقائي في الطابور: {e[2]}" if e[4] else f"تم إنشاء أنيميشن تلقائي: {e[2]}"
+    ),
+    EVENT_PAIR_FORCE: lambda e: f"{e[2]} → {e[3]} : {e[4]:.3f}",
+    EVENT_STEP: _format_step,
+    EVENT_RENDER_TOTAL: lambda e: f"إجمالي وقت التوليد: {e[4]:.1f} ثانية",
+}
+
+
+def format_event(event: Event) -> str:
+    return _FORMATTERS[event[0]](event)
+
+
+class EventLog:
+    """
+    سجل أحداث مُهيكل في ring buffer ثابت الحجم بدل logging.info لكل مهمة / زوج
+    - record يخزن tuple فقط (بدون تنسيق نصوص)، والأقدم يُستبدل عند امتلاء السعة
+    - sample_every: {نوع: N} → حدث واحد من كل N من هذا النوع
+    - max_per_second: حد أقصى للأحداث المسجلة في الثانية (token bucket بسعة burst)
+    - echo=True: كل حدث مسجل يُكتب فورًا في logging أيضًا (السلوك القديم، للتشغيل التفاعلي)
+    - lines / dump: الرسائل النصية عند الطلب فقط
+    - الأحداث telemetry فقط: قد تُفقد (sampling / rate limit / السعة)
+    - الجداول (begin_table / add_row / table): قناة منفصلة كاملة – بدون sampling ولا rate limit
+      ولا سعة، وتعمل حتى مع enabled=False (جدول الأنيميشن للعرض وليس للقياس)
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        sample_every: Dict[int, int] = None,
+        max_per_second: float = None,
+        burst: int = None,
+        echo: bool = False,
+        logger: logging.Logger = None,
+        enabled: bool = True,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity لازم 1 على الأقل")
+        self.capacity = int(capacity)
+        self._buffer: List[Optional[Event]] = [None] * self.capacity
+        self._every = [1] * len(EVENT_NAMES)
+        for kind, every in (sample_every or {}).items():
+            if every < 1:
+                raise ValueError(f"sample_every لازم 1 على الأقل: {EVENT_NAMES[kind]}")
+            self._every[kind] = int(every)
+        self._seen = [0] * len(EVENT_NAMES)
+        self.max_per_second = max_per_second
+        self.burst = float(burst if burst is not None else (max_per_second or 0))
+        self._tokens = self.burst
+        self._last = time.perf_counter()
+        self.echo = echo
+        self.logger = logger or logging.getLogger()
+        self.enabled = enabled
+        self.total = 0              # رقم الحدث التالي (يزيد دائمًا – يصلح كعلامة since)
+        self.sampled_out = 0
+        self.rate_limited = 0
+        self._tables: Dict[str, List[Dict]] = {}
+
+    def record(self, kind: int, name=None, other=None, a=None, b=None, c=None) -> None:
+        if not self.enabled:
+            return
+        seen = self._seen[kind]
+        self._seen[kind] = seen + 1
+        if seen % self._every[kind]:
+            self.sampled_out += 1
+            return
+        now = time.perf_counter()
+        if self.max_per_second is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.max_per_second)
+            self._last = now
+            if self._tokens < 1.0:
+                self.rate_limited += 1
+                return
+            self._tokens -= 1.0
+        event = (kind, now, name, other, a, b, c)
+        self._buffer[self.total % self.capacity] = event
+        self.total += 1
+        if self.echo:
+            self.logger.info(format_event(event))
+
+    # ─── الجداول ───
+    def begin_table(self, table: str) -> None:
+        """بداية جدول جديد (يستبدل الصفوف السابقة بنفس الاسم)"""
+        self._tables[table] = []
+
+    def add_row(self, table: str, row: Dict) -> None:
+        self._tables.setdefault(table, []).append(row)
+
+    def table(self, table: str) -> List[Dict]:
+        return list(self._tables.get(table, ()))
+
+    # ─── القراءة ───
+    @property
+    def first(self) -> int:
+        """رقم أقدم حدث ما زال في الـ buffer"""
+        return max(0, self.total - self.capacity)
+
+    def __len__(self) -> int:
+        return self.total - self.first
+
+    def events(self, kinds: Iterable[int] = None, since: int = 0) -> Iterator[Event]:
+        """الأحداث من الأقدم للأحدث (رقمها ≥ since، ومن الأنواع kinds لو محددة)"""
+        wanted = None if kinds is None else set(kinds)
+        for index in range(max(since, self.first), self.total):
+            event = self._buffer[index % self.capacity]
+            if wanted is None or event[0] in wanted:
+                yield event
+
+    def lines(self, kinds: Iterable[int] = None, since: int = 0) -> List[str]:
+        return [format_event(event) for event in self.events(kinds, since)]
+
+    def dump(self, kinds: Iterable[int] = None, since: int = 0, level: int = logging.INFO,
+             logger: logging.Logger = None) -> int:
+        """كتابة الأحداث المخزنة في logging بنفس الرسائل القديمة – يرجع عددها"""
+        logger = logger or self.logger
+        count = 0
+        for event in self.events(kinds, since):
+            logger.log(level, format_event(event))
+            count += 1
+        return count
+
+    def stats(self) -> Dict:
+        return {
+            "recorded": self.total,
+            "buffered": len(self),
+            "overwritten": self.first,
+            "sampled_out": self.sampled_out,
+            "rate_limited": self.rate_limited,
+            "by_kind": {name: seen for name, seen in zip(EVENT_NAMES, self._seen) if seen},
+            "table_rows": {table: len(rows) for table, rows in self._tables.items()},
+        }
+
+    def clear(self) -> None:
+        self._buffer = [None] * self.capacity
+        self._seen = [0] * len(EVENT_NAMES)
+        self.total = 0
+        self.sampled_out = 0
+        self.rate_limited = 0
+        self._tables = {}
+
+    def __repr__(self) -> str:
+        return f"EventLog(capacity={self.capacity}, buffered={len(self)}, recorded={self.total})"
@@ -0,0 +1,203 @@
+import json
+import functools
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# ────────────────────────────────────────────────
+# أسماء المراحل المقاسة في الـ workflow والأنيميشن
+# ────────────────────────────────────────────────
+STAGE_SEQUENCING = "sequencing"
+STAGE_RENDERING = "rendering"
+STAGE_CHAIN_SIMULATION = "chain_simulation"
+STAGE_PLANE_CREATION = "plane_creation"
+STAGE_ANIMATION_ENCODING = "animation_encoding"
+STAGE_DYNAMICS = "dynamics"
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _prometheus_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metrics:
+    """
+    قياس حقيقي لكل مرحلة: زمن الساعة، زمن CPU، وأعلى ذاكرة (tracemalloc)
+    - with metrics.stage("sequencing"): ...
+    - hooks تُستدعى بعد كل مرحلة بسجل القياس (للإرسال لأي نظام خارجي)
+    - تصدير JSON أو صيغة Prometheus النصية
+
+    track_memory=True يشغّل tracemalloc (يبطئ تخصيص الذاكرة – للتشخيص وليس للإنتاج دائمًا)
+    زمن CPU هو زمن الـ process كله (يشمل threads العمال)، والذاكرة المقاسة هي
+    ذاكرة Python + NumPy في الـ process الحالي فقط – القمة مشتركة بين الـ threads
+    """
+
+    def __init__(self, enabled: bool = True, track_memory: bool = False):
+        self.enabled = enabled
+        self.track_memory = track_memory
+        self.hooks: List[Callable[[Dict], None]] = []
+        self._stats: Dict[Tuple[str, tuple], Dict] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ─── hooks ───
+    def add_hook(self, hook: Callable[[Dict], None]) -> None:
+        """hook(record) بعد كل مرحلة – record: stage, labels, wall_time, cpu_time, peak_memory"""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[Dict], None]) -> None:
+        self.hooks.remove(hook)
+
+    # ─── القياس ───
+    def _stack(self) -> List[Dict]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def stage(self, name: str, **labels):
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._stack()
+        frame = {"memory_start": 0, "memory_peak": 0}
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            # القمة حتى الآن تخص المرحلة الأب – تُحفظ قبل إعادة الضبط
+            if stack:
+                stack[-1]["memory_peak"] = max(stack[-1]["memory_peak"], peak)
+            tracemalloc.reset_peak()
+            frame["memory_start"] = frame["memory_peak"] = current
+        stack.append(frame)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            # مراحل coroutines متداخلة على نفس الـ thread قد لا تنتهي بترتيب LIFO
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i] is frame:
+                    del stack[i]
+                    break
+
+            peak_memory = None
+            if self.track_memory and tracemalloc.is_tracing():
+                peak = max(frame["memory_peak"], tracemalloc.get_traced_memory()[1])
+                peak_memory = peak - frame["memory_start"]
+                if stack:
+                    stack[-1]["memory_peak"] = max(stack[-1]["memory_peak"], peak)
+
+            self._record(name, labels, wall_time, cpu_time, peak_memory)
+
+    def _record(self, name: str, labels: Dict, wall_time: float, cpu_time: float, peak_memory: Optional[int]):
+        record = {
+            "stage": name,
+            "labels": {k: str(v) for k, v in labels.items()},
+            "wall_time": wall_time,
+            "cpu_time": cpu_time,
+            "peak_memory": peak_memory,
+        }
+        with self._lock:
+            stats = self._stats.get((name, _label_key(labels)))
+            if stats is None:
+                stats = self._stats[(name, _label_key(labels))] = {
+                    "stage": name,
+                    "labels": record["labels"],
+                    "count": 0,
+                    "wall_time": 0.0,
+                    "cpu_time": 0.0,
+                    "max_wall_time": 0.0,
+                    "peak_memory": None,
+                }
+            stats["count"] += 1
+            stats["wall_time"] += wall_time
+            stats["cpu_time"] += cpu_time
+            stats["max_wall_time"] = max(stats["max_wall_time"], wall_time)
+            if peak_memory is not None:
+                stats["peak_memory"] = max(stats["peak_memory"] or 0, peak_memory)
+
+        for hook in self.hooks:
+            hook(record)
+
+    # ─── التصدير ───
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [dict(stats, labels=dict(stats["labels"])) for stats in self._stats.values()]
+
+    def stage_totals(self) -> Dict[str, Dict]:
+        """مجموع كل مرحلة بغض النظر عن الـ labels"""
+        totals: Dict[str, Dict] = {}
+        for stats in self.snapshot():
+            total = totals.setdefault(stats["stage"], {"count": 0, "wall_time": 0.0, "cpu_time": 0.0})
+            total["count"] += stats["count"]
+            total["wall_time"] += stats["wall_time"]
+            total["cpu_time"] += stats["cpu_time"]
+        return totals
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps({"stages": self.snapshot()}, ensure_ascii=False, **kwargs)
+
+    def to_prometheus(self, prefix: str = "ai_swp") -> str:
+        series = [
+            ("stage_calls_total", "counter", "عدد مرات تنفيذ المرحلة", "count"),
+            ("stage_wall_seconds_total", "counter", "زمن الساعة الفعلي للمرحلة", "wall_time"),
+            ("stage_cpu_seconds_total", "counter", "زمن CPU للـ process أثناء المرحلة", "cpu_time"),
+            ("stage_wall_seconds_max", "gauge", "أطول تنفيذ واحد للمرحلة", "max_wall_time"),
+            ("stage_peak_memory_bytes", "gauge", "أعلى ذاكرة إضافية أثناء المرحلة (tracemalloc)", "peak_memory"),
+        ]
+        snapshot = self.snapshot()
+        lines = []
+        for suffix, kind, help_text, field in series:
+            name = f"{prefix}_{suffix}"
+            samples = [s for s in snapshot if s[field] is not None]
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stats in samples:
+                labels = {"stage": stats["stage"], **stats["labels"]}
+                rendered = ",".join(f'{k}="{_prometheus_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{rendered}}} {stats[field]}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def __repr__(self) -> str:
+        return f"Metrics(stages={len(self._stats)}, enabled={self.enabled}, track_memory={self.track_memory})"
+
+
+def instrumented(stage: str, **labels):
+    """decorator لدوال كائن عنده self.metrics – الدالة كلها مرحلة واحدة"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.stage(stage, **labels):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_default_metrics: Optional[Metrics] = None
+
+
+def default_metrics() -> Metrics:
+    """القياسات المشتركة (يستخدمها AISmartWorkflow والأنيميشن لو ما اتمررش Metrics)"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = Metrics()
+    return _default_metrics
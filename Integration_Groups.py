@@ -0,0 +1,144 @@
+import heapq
+from typing import Dict, Iterable, List, Tuple
+
+from Parallel_Render import step_time
+
+
+# ────────────────────────────────────────────────
+# استراتيجيات اختيار مجموعات الدمج في optimize_sequence
+# ────────────────────────────────────────────────
+GROUPING_STRATEGIES = ("priority", "cost")
+EXACT_COMPONENT_RULES = 12      # مكون فيه قواعد أقل → بحث كامل عن أفضل اختيار، وأكثر → اختيار جشع
+
+# (الربح، الأولوية، ترتيب القاعدة، المجموعة، العمق)
+Candidate = Tuple[float, int, int, tuple, int]
+
+
+def task_depths(task_index: Dict[str, Dict], dependencies: Dict[str, List[str]]) -> Dict[str, int]:
+    """
+    عمق كل مهمة في DAG الاعتماديات (أطول مسار من مهمة بلا اعتماديات)
+    - الاعتماديات على مهام غير موجودة تُتجاهل، ومهام الدورات بدون عمق
+    """
+    indegree: Dict[str, int] = {}
+    downstream: Dict[str, List[str]] = {}
+    for name in task_index:
+        deps = [d for d in dependencies.get(name, ()) if d in task_index]
+        indegree[name] = len(deps)
+        for dep in deps:
+            downstream.setdefault(dep, []).append(name)
+
+    level = {name: 0 for name in task_index}
+    depths: Dict[str, int] = {}
+    ready = [name for name, d in indegree.items() if d == 0]
+    while ready:
+        name = ready.pop()
+        depths[name] = level[name]
+        for child in downstream.get(name, ()):
+            level[child] = max(level[child], depths[name] + 1)
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    return depths
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def find(self, name: str) -> str:
+        parent = self.parent
+        parent.setdefault(name, name)
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    def union(self, a: str, b: str) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def _greedy_packing(candidates: List[Candidate]) -> List[Candidate]:
+    """أعلى ربح أولًا (heap) – كل مهمة في مجموعة واحدة فقط"""
+    heap = [(-c[0], c[1], c[2], k) for k, c in enumerate(candidates)]
+    heapq.heapify(heap)
+    taken = set()
+    chosen = []
+    while heap:
+        candidate = candidates[heapq.heappop(heap)[3]]
+        if taken.isdisjoint(candidate[3]):
+            taken.update(candidate[3])
+            chosen.append(candidate)
+    return chosen
+
+
+def _best_packing(candidates: List[Candidate]) -> List[Candidate]:
+    """أفضل مجموعات غير متداخلة بالبحث الكامل (branch and bound) – للمكونات الصغيرة فقط"""
+    candidates = sorted(candidates, key=lambda c: (-c[0], c[1], c[2]))
+    remaining = [0.0] * (len(candidates) + 1)
+    for k in range(len(candidates) - 1, -1, -1):
+        remaining[k] = remaining[k + 1] + candidates[k][0]
+    best = [0.0, []]
+
+    def search(k: int, used: frozenset, total: float, picked: List[Candidate]):
+        if total > best[0]:
+            best[0], best[1] = total, picked
+        if k == len(candidates) or total + remaining[k] <= best[0]:
+            return
+        candidate = candidates[k]
+        if used.isdisjoint(candidate[3]):
+            search(k + 1, used.union(candidate[3]), total + candidate[0], picked + [candidate])
+        search(k + 1, used, total, picked)
+
+    search(0, frozenset(), 0.0, [])
+    return best[1]
+
+
+def select_groups(
+    rules: Dict[tuple, int],
+    task_index: Dict[str, Dict],
+    dependencies: Dict[str, List[str]],
+    exclude: Iterable[str] = (),
+) -> List[List[str]]:
+    """
+    مجموعات الدمج بأقل زمن رندر تقديري (استراتيجية "cost")
+    - المجموعة صالحة لو كل أعضائها مهام موجودة خارج exclude (الـ planes) وفي نفس عمق الـ DAG
+      → لا مسار بين أعضائها، ودمج أي عدد من المجموعات لا يصنع دورة
+    - الربح = زمن الأعضاء فرديًا − زمن المجموعة مدمجة (نموذج step_time)
+    - القواعد المتشابكة (عضو مشترك) تُجمع بـ union-find في مكونات مستقلة:
+      مكون صغير → البحث الكامل، ومكون كبير → heap حسب الربح
+    يرجع المجموعات مرتبة حسب العمق ثم الأولوية
+    """
+    exclude = set(exclude)
+    depths = task_depths(task_index, dependencies)
+    candidates: List[Candidate] = []
+    for order, (group, priority) in enumerate(rules.items()):
+        if any(name not in task_index or name in exclude for name in group):
+            continue
+        levels = {depths.get(name) for name in group}
+        if len(levels) != 1 or None in levels:
+            continue
+        saving = sum(step_time([name], task_index) for name in group) - step_time(list(group), task_index)
+        if saving > 0:
+            candidates.append((saving, priority, order, group, levels.pop()))
+
+    components = _UnionFind()
+    for candidate in candidates:
+        first = candidate[3][0]
+        for name in candidate[3][1:]:
+            components.union(first, name)
+    buckets: Dict[str, List[Candidate]] = {}
+    for candidate in candidates:
+        buckets.setdefault(components.find(candidate[3][0]), []).append(candidate)
+
+    chosen: List[Candidate] = []
+    for bucket in buckets.values():
+        if len(bucket) == 1:
+            chosen.extend(bucket)
+        elif len(bucket) <= EXACT_COMPONENT_RULES:
+            chosen.extend(_best_packing(bucket))
+        else:
+            chosen.extend(_greedy_packing(bucket))
+    chosen.sort(key=lambda c: (c[4], c[1], c[2]))
+    return [list(c[3]) for c in chosen]
@@ -0,0 +1,354 @@
+import os
+import time
+import heapq
+import numbers
+import operator
+import threading
+import logging
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+
+# ────────────────────────────────────────────────
+# نموذج زمن الخطوة (نفس معاملات render_sequentially)
+# ────────────────────────────────────────────────
+PLANE_TIME_FACTOR = 0.75
+MERGED_TIME_FACTOR = 0.88
+OBJECT_TIME_FACTOR = 1.1
+
+
+def step_time(step: List[str], tasks_by_name: Dict[str, Dict]) -> float:
+    """الزمن لخطوة واحدة من optimize_sequence (نفس الدالة في render_sequentially والتقدير والتنفيذ المتوازي)"""
+    if len(step) > 1:
+        return sum(tasks_by_name[n]["complexity"] for n in step) * MERGED_TIME_FACTOR
+    task = tasks_by_name[step[0]]
+    factor = PLANE_TIME_FACTOR if task.get("is_plane", False) else OBJECT_TIME_FACTOR
+    return task["complexity"] * factor
+
+
+def build_step_graph(
+    sequence: List[List[str]],
+    dependencies: Dict[str, List[str]],
+) -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    تحويل الخطوات + dependencies إلى DAG على مستوى الخطوات
+    - يرجع (upstream, downstream) لكل خطوة
+    - الاعتماديات على مهام غير موجودة في الخطة تُتجاهل
+    """
+    step_of = {}
+    for i, step in enumerate(sequence):
+        for name in step:
+            step_of[name] = i
+
+    upstream: List[List[int]] = []
+    downstream: List[List[int]] = [[] for _ in sequence]
+    for i, step in enumerate(sequence):
+        deps = set()
+        for name in step:
+            for dep in dependencies.get(name, ()):
+                j = step_of.get(dep)
+                if j is not None and j != i:
+                    deps.add(j)
+        upstream.append(sorted(deps))
+        for j in deps:
+            downstream[j].append(i)
+    return upstream, downstream
+
+
+def topological_order(upstream: List[List[int]], downstream: List[List[int]]) -> List[int]:
+    """ترتيب Kahn – يرفع ValueError لو في دورة اعتماديات"""
+    indegree = [len(u) for u in upstream]
+    ready = [i for i, d in enumerate(indegree) if d == 0]
+    order = []
+    while ready:
+        i = ready.pop()
+        order.append(i)
+        for j in downstream[i]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                ready.append(j)
+    if len(order) != len(upstream):
+        raise ValueError("الاعتماديات تحتوي على دورة – لا يمكن الجدولة")
+    return order
+
+
+def strongly_connected_components(downstream: List[List[int]]) -> List[List[int]]:
+    """مكونات Tarjan قوية الترابط (بدون recursion – تصلح لآلاف الخطوات)"""
+    n = len(downstream)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work.pop()
+            if edge == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            children = downstream[node]
+            while edge < len(children):
+                child = children[edge]
+                edge += 1
+                if index[child] == -1:
+                    work.append((node, edge))
+                    work.append((child, 0))
+                    break
+                if on_stack[child]:
+                    low[node] = min(low[node], index[child])
+            else:
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+    return components
+
+
+def split_conflicting_groups(
+    sequence: List[List[str]],
+    dependencies: Dict[str, List[str]],
+) -> List[List[str]]:
+    """
+    مجموعة دمج قد تعكس ترتيب الاعتماديات (عضو يعتمد على مهمة تعتمد على عضو آخر)
+    – تُفك هذه المجموعات إلى مهام فردية حتى يصبح الـ DAG قابلًا للجدولة
+    """
+    while True:
+        upstream, downstream = build_step_graph(sequence, dependencies)
+        try:
+            topological_order(upstream, downstream)
+            return sequence
+        except ValueError:
+            pass
+
+        # فقط الخطوات داخل دورة (مكون قوي الترابط بأكثر من خطوة) – ما بعد الدورة يبقى كما هو
+        stuck = [
+            i for component in strongly_connected_components(downstream) if len(component) > 1
+            for i in sorted(component) if len(sequence[i]) > 1
+        ]
+        if not stuck:
+            raise ValueError("الاعتماديات تحتوي على دورة – لا يمكن الجدولة")
+
+        split = set(stuck)
+        logging.warning(
+            "فك مجموعات دمج تتعارض مع ترتيب الاعتماديات: "
+            + ", ".join(" + ".join(sequence[i]) for i in stuck)
+        )
+        new_sequence = []
+        for i, step in enumerate(sequence):
+            if i in split:
+                new_sequence.extend([name] for name in step)
+            else:
+                new_sequence.append(step)
+        sequence = new_sequence
+
+
+def critical_path_length(
+    durations: List[float],
+    upstream: List[List[int]],
+    order: List[int],
+) -> float:
+    """أطول مسار في الـ DAG (زمن المسار الحرج)"""
+    finish = [0.0] * len(durations)
+    for i in order:
+        start = max((finish[j] for j in upstream[i]), default=0.0)
+        finish[i] = start + durations[i]
+    return max(finish, default=0.0)
+
+
+def estimate_makespan(
+    durations: List[float],
+    upstream: List[List[int]],
+    downstream: List[List[int]],
+    workers: int,
+) -> float:
+    """
+    زمن الانتهاء المتوقع على workers عامل – محاكاة أحداث بدون نوم لنفس سياسة DependencyExecutor
+    (الخطوة تدخل طابور الـ pool لحظة جاهزيتها، وأول عامل يفرغ يأخذ الأقدم في الطابور)
+    """
+    indegree = [len(u) for u in upstream]
+    queue = deque(i for i, d in enumerate(indegree) if d == 0)
+    running: List[Tuple[float, int]] = []
+    free = max(operator.index(workers), 1)     # numpy ints مقبولة، الكسور لا
+    now = 0.0
+    finished = 0
+    while queue or running:
+        while queue and free:
+            i = queue.popleft()
+            heapq.heappush(running, (now + durations[i], i))
+            free -= 1
+        now, i = heapq.heappop(running)
+        free += 1
+        finished += 1
+        for j in downstream[i]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                queue.append(j)
+    if finished != len(durations):
+        raise ValueError("الاعتماديات تحتوي على دورة – لا يمكن الجدولة")
+    return now
+
+
+def dry_run(workflow, workers: Union[int, Sequence[int]] = None) -> Dict:
+    """
+    تقدير تكلفة الرندر بدون نوم ولا تنفيذ (نموذج step_time + DAG الاعتماديات)
+    - sequential_time: نفس ناتج render_sequentially (= workflow.render_time بعد أي رندر)
+    - total_work / critical_path: على خطوات DependencyExecutor (بعد فك المجموعات المتعارضة)
+      → total_work قد يزيد عن sequential_time لو فُكّت مجموعة دمج
+    - makespan: للعدد workers، أو dict لكل عدد لو workers قائمة (الـ DAG يُبنى مرة واحدة)
+    """
+    sequence = workflow.optimize_sequence()
+    tasks_by_name = workflow.task_index
+    durations = [step_time(step, tasks_by_name) for step in sequence]
+    sequential_time = sum(durations)
+
+    upstream, downstream = build_step_graph(sequence, workflow.dependencies)
+    try:
+        order = topological_order(upstream, downstream)
+    except ValueError:
+        sequence = split_conflicting_groups(sequence, workflow.dependencies)
+        durations = [step_time(step, tasks_by_name) for step in sequence]
+        upstream, downstream = build_step_graph(sequence, workflow.dependencies)
+        order = topological_order(upstream, downstream)
+
+    total_work = sum(durations)
+    critical_path = critical_path_length(durations, upstream, order)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    single = isinstance(workers, numbers.Integral)      # int أو numpy int
+    workers = operator.index(workers) if single else [operator.index(k) for k in workers]
+    counts = [workers] if single else workers
+    makespans = {k: estimate_makespan(durations, upstream, downstream, k) for k in counts}
+
+    return {
+        "steps": len(sequence),
+        "sequential_time": sequential_time,
+        "total_work": total_work,
+        "critical_path": critical_path,
+        "max_speedup": total_work / critical_path if critical_path > 0 else 1.0,
+        "workers": workers,
+        "makespan": makespans[workers] if single else makespans,
+    }
+
+
+def simulate_step(step: List[str], seconds: float) -> Tuple[str, float]:
+    """عامل افتراضي: ينام بدل الرندر الحقيقي ويرجع (العامل، الزمن الفعلي)"""
+    started = time.perf_counter()
+    if seconds > 0:
+        time.sleep(seconds)
+    worker = f"{os.getpid()}:{threading.current_thread().name}"
+    return worker, time.perf_counter() - started
+
+
+# ────────────────────────────────────────────────
+# المنفذ المتوازي
+# ────────────────────────────────────────────────
+class DependencyExecutor:
+    """
+    جدولة خطوات optimize_sequence على pool (threads أو processes) حسب self.dependencies
+    - الخطوات المستقلة ومجموعات الدمج تعمل بالتوازي
+    - يرجع زمن الساعة الفعلي واستغلال كل عامل
+    """
+
+    def __init__(
+        self,
+        workflow,
+        max_workers: int = None,
+        use_processes: bool = False,
+        time_scale: float = 0.2,
+        work_fn: Callable[[List[str], float], Tuple[str, float]] = simulate_step,
+    ):
+        self.workflow = workflow
+        self.max_workers = operator.index(max_workers) if max_workers else os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.time_scale = time_scale
+        self.work_fn = work_fn
+
+    def run(self) -> Dict:
+        planned = self.workflow.optimize_sequence()
+        tasks_by_name = self.workflow.task_index
+        sequential_time = sum(step_time(step, tasks_by_name) for step in planned)
+        sequence = split_conflicting_groups(planned, self.workflow.dependencies)
+        durations = [step_time(step, tasks_by_name) for step in sequence]
+        upstream, downstream = build_step_graph(sequence, self.workflow.dependencies)
+        order = topological_order(upstream, downstream)
+
+        pool_cls = ThreadPoolExecutor
+        if self.use_processes:
+            # استيراد عند الحاجة فقط – multiprocessing مكلف في زمن الاستيراد
+            from concurrent.futures import ProcessPoolExecutor as pool_cls
+        indegree = [len(u) for u in upstream]
+        steps_report = [None] * len(sequence)
+        workers: Dict[str, Dict] = {}
+
+        started = time.perf_counter()
+        with pool_cls(max_workers=self.max_workers) as pool:
+            pending = {}
+
+            def submit(i):
+                future = pool.submit(self.work_fn, sequence[i], durations[i] * self.time_scale)
+                pending[future] = i
+
+            for i, d in enumerate(indegree):
+                if d == 0:
+                    submit(i)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    worker, busy = future.result()
+                    stats = workers.setdefault(worker, {"busy": 0.0, "steps": 0})
+                    stats["busy"] += busy
+                    stats["steps"] += 1
+                    steps_report[i] = {
+                        "step": " + ".join(sequence[i]),
+                        "time": round(durations[i], 3),
+                        "duration": busy,
+                        "worker": worker,
+                    }
+                    for j in downstream[i]:
+                        indegree[j] -= 1
+                        if indegree[j] == 0:
+                            submit(j)
+
+        wall_time = time.perf_counter() - started
+        for stats in workers.values():
+            stats["utilization"] = stats["busy"] / wall_time if wall_time > 0 else 0.0
+
+        report = {
+            "max_workers": self.max_workers,
+            "pool": "process" if self.use_processes else "thread",
+            "wall_time": wall_time,
+            "sequential_time": sequential_time,
+            "total_work": sum(durations),
+            "critical_path": critical_path_length(durations, upstream, order),
+            "makespan": estimate_makespan(durations, upstream, downstream, self.max_workers),
+            "time_scale": self.time_scale,
+            "workers": workers,
+            "steps": steps_report,
+        }
+        logging.info(
+            f"تنفيذ متوازي: {len(sequence)} خطوة على {self.max_workers} عامل → "
+            f"{wall_time:.2f}s فعليًا (مسار حرج {report['critical_path']:.1f}s، "
+            f"إجمالي عمل {report['total_work']:.1f}s)"
+        )
+        return report
@@ -0,0 +1,164 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+from Plane_Layers import x2_effected_arrays
+from AI_Smart_Work_flow import (
+    AISmartWorkflow,
+    DEFAULT_INTERACTION_FORCE,
+    DEFAULT_INTERACTION_POSITION,
+    DEFORMATION_BONUS_FACTOR,
+    INTERACTION_FORCE_MAP,
+    INTERACTION_PLANE_DEPTH,
+    INTERACTION_PLANE_GAP,
+    INTERACTION_SECOND_FORCE_RATIO,
+)
+
+
+# ────────────────────────────────────────────────
+# شبكة المعاملات
+# ────────────────────────────────────────────────
+def _axis(name: str, values) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    # plane_position محور من مواقع: كل عنصر [x, y, z]
+    return values.reshape(-1, 3) if name == "plane_position" else values.reshape(-1)
+
+
+def parameter_grid(**axes) -> Dict[str, np.ndarray]:
+    """
+    كل التركيبات (حاصل ضرب ديكارتي) كأعمدة بطول واحد – جاهزة لـ sweep_task(**grid)
+    parameter_grid(proxy_weight=[10, 18], plane_position=[[0, 2, 0], [0, 2.5, 0]]) → 4 variants
+    """
+    values = {name: _axis(name, axis) for name, axis in axes.items()}
+    shape = tuple(len(v) for v in values.values())
+    index = np.indices(shape).reshape(len(shape), -1)
+    return {name: v[i] for (name, v), i in zip(values.items(), index)}
+
+
+def _variant_count(columns: Dict[str, Optional[np.ndarray]]) -> int:
+    lengths = {len(c) for c in columns.values() if c is not None and len(c) != 1}
+    if len(lengths) > 1:
+        raise ValueError(f"أطوال المعاملات غير متوافقة: {sorted(lengths)}")
+    return lengths.pop() if lengths else 1
+
+
+def _broadcast(column: Optional[np.ndarray], n: int) -> Optional[np.ndarray]:
+    if column is None:
+        return None
+    return np.broadcast_to(column, (n,) + column.shape[1:])
+
+
+# ────────────────────────────────────────────────
+# التقييم الدفعي
+# ────────────────────────────────────────────────
+def sweep_task(
+    workflow: AISmartWorkflow,
+    name: str,
+    complexity,
+    is_plane: bool = False,
+    chain: List[str] = None,
+    proxy_weight=None,
+    proxy_pressure_factor=1.0,
+    plane_position=None,
+    plane_force=None,
+    interacts_with: str = None,
+    interaction_type: str = None,
+    interaction_force_multiplier=1.0,
+) -> Dict[str, np.ndarray]:
+    """
+    نتيجة workflow.add_task(name, ...) لكل variant دفعة واحدة بدون إنشاء workflow لكل variant
+    - أي معامل رقمي: قيمة واحدة أو عمود بطول n (plane_position: (n, 3))
+    - workflow لا يتغير – طبقاته الحالية هي سياق السلسلة
+    يرجع أعمدة بطول n:
+      complexity, deformation_bonus (قبل التقريب المخزن في physics_proxy)، المدخلات نفسها
+      plane_force + chain_forces (n, len(chain)-1) لو is_plane و chain يحتوي الطبقة
+      interaction_force لو interacts_with و interaction_type (قوة plane_<name> → plane_<other>)
+    """
+    columns = {
+        "complexity": _axis("complexity", complexity),
+        "proxy_weight": None if proxy_weight is None else _axis("proxy_weight", proxy_weight),
+        "proxy_pressure_factor": _axis("proxy_pressure_factor", proxy_pressure_factor),
+        "plane_position": None if plane_position is None else _axis("plane_position", plane_position),
+        "plane_force": None if plane_force is None else _axis("plane_force", plane_force),
+        "interaction_force_multiplier": _axis("interaction_force_multiplier", interaction_force_multiplier),
+    }
+    n = _variant_count(columns)
+    columns = {key: _broadcast(column, n) for key, column in columns.items()}
+    weight, factor = columns["proxy_weight"], columns["proxy_pressure_factor"]
+
+    result = {key: column for key, column in columns.items() if column is not None}
+    # نفس ترتيب العمليات في add_task – النتائج تطابق workflow لكل variant بت-بت
+    bonus = np.zeros(n) if weight is None else weight * factor * DEFORMATION_BONUS_FACTOR
+    result["deformation_bonus"] = bonus
+    result["complexity"] = columns["complexity"] + bonus
+
+    position = columns["plane_position"]
+    if is_plane:
+        if columns["plane_force"] is not None:
+            force = columns["plane_force"]
+        else:
+            force = np.zeros(n) if weight is None else weight
+        result["plane_force"] = force
+        if chain:
+            plane_position = np.zeros((n, 3)) if position is None else position
+            result["chain_forces"] = _chain_forces(workflow, name, chain, plane_position, force)
+
+    if interacts_with and interaction_type:
+        if interacts_with not in workflow.task_index:
+            raise ValueError(f"المهمة '{interacts_with}' غير موجودة في الـ workflow")
+        result["interaction_force"] = _interaction_forces(
+            interaction_type, position, columns["plane_force"], columns["interaction_force_multiplier"], n, is_plane,
+        )
+    return result
+
+
+def _chain_forces(workflow: AISmartWorkflow, name: str, chain: List[str],
+                  position: np.ndarray, force: np.ndarray) -> np.ndarray:
+    """chain_x2_effected لكل variant: الطبقة name متغيرة، وباقي السلسلة من workflow.planes"""
+    missing = [p for p in chain if p != name and p not in workflow.planes]
+    if missing:
+        raise ValueError(f"عناصر في السلسلة ليست planes: {missing}")
+
+    n, length = len(force), len(chain)
+    positions = np.empty((n, length, 3))
+    forces = np.empty((n, length))
+    depths = np.empty((n, length))
+    radii = np.empty((n, length))
+    for k, plane_name in enumerate(chain):
+        if plane_name == name:
+            # طبقة add_task: depth و radius الافتراضيين في PlaneLayer
+            positions[:, k] = position
+            forces[:, k] = force
+            depths[:, k] = 1.0
+            radii[:, k] = 1.0
+        else:
+            plane = workflow.planes[plane_name]
+            positions[:, k] = plane.coords
+            forces[:, k] = plane.force
+            depths[:, k] = plane.depth
+            radii[:, k] = plane.radius
+
+    return x2_effected_arrays(
+        positions[:, :-1], positions[:, 1:],
+        forces[:, :-1], forces[:, 1:],
+        radii[:, :-1], radii[:, 1:],
+        depths[:, :-1], depths[:, 1:],
+    )
+
+
+def _interaction_forces(interaction_type: str, position: Optional[np.ndarray], plane_force: Optional[np.ndarray],
+                        multiplier: np.ndarray, n: int, is_plane: bool = False) -> np.ndarray:
+    """قوة أول زوج في طبقات _auto_create_interaction_planes لكل variant"""
+    default_force = INTERACTION_FORCE_MAP.get(interaction_type, DEFAULT_INTERACTION_FORCE)
+    # plane_force or default: صفر يرجع للقيمة الافتراضية كما في الـ workflow
+    base_force = np.full(n, default_force) if plane_force is None else np.where(plane_force != 0, plane_force, default_force)
+    force1 = base_force * multiplier
+    force2 = force1 * INTERACTION_SECOND_FORCE_RATIO
+
+    if position is None:
+        # نفس add_task: مهمة plane بدون موقع تأخذ [0, 0, 0] قبل التفاعل، وغيرها الموقع الافتراضي
+        position = np.zeros((n, 3)) if is_plane else np.asarray(DEFAULT_INTERACTION_POSITION, dtype=float)
+    pos1 = np.broadcast_to(position, (n, 3))
+    pos2 = pos1.copy()
+    pos2[:, 1] = pos1[:, 1] - INTERACTION_PLANE_GAP
+
+    return x2_effected_arrays(pos1, pos2, force1, force2, 1.0, 1.0, INTERACTION_PLANE_DEPTH, INTERACTION_PLANE_DEPTH)
@@ -0,0 +1,172 @@
+import numpy as np
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from Plane_Layers import PlaneLayerSet, _distances, interact_arrays
+from Plane_Index import overlapping_pairs
+from Instrumentation import Metrics, STAGE_DYNAMICS, default_metrics
+
+
+# ────────────────────────────────────────────────
+# إعدادات افتراضية للمحاكاة الزمنية
+# ────────────────────────────────────────────────
+DEFAULT_DT = 1.0 / 30.0          # خطوة زمنية = إطار واحد عند 30fps
+DEFAULT_DAMPING = 0.1            # نسبة السرعة المفقودة في كل خطوة
+# أقل مسافة في قوة التلامس كنسبة من مجموع نصفي القطرين – interact يقسم على المسافة،
+# فطبقتان شبه متطابقتين تعطيان دفعًا غير محدود بدون هذا الحد
+DEFAULT_CONTACT_FLOOR = 0.05
+
+
+class PlaneDynamics:
+    """
+    محاكاة زمنية لكل الطبقات معًا بمصفوفات حالة (positions / velocities / forces)
+    - كل خطوة: أزواج التلامس فقط (overlapping_pairs) → قوة التلامس interact لكل زوج
+      → دفع الطبقتين بعيدًا عن بعض + حمل كل طبقة (توزيع الوزن على نقاط التلامس)
+    - الطبقات الثابتة (fixed) لا تتحرك لكنها تستقبل الحمل (مثل سطح السمكة)
+    - controller(step, time, sim) يُستدعى قبل كل خطوة لتحريك الطبقات أو تغيير قواها
+      (مثل نقل النسر لمخالبه: sim.velocities[i] = ... أو sim.forces[i] = ...)
+      – أي تعديل للحالة أثناء المحاكاة يمر عبره (أو reset_contacts بعد تعديل مباشر)
+    - run(steps) generator – النتائج تتدفق خطوة بخطوة بدون بناء workflow لكل إطار
+    """
+
+    def __init__(
+        self,
+        layers: PlaneLayerSet,
+        velocities=None,
+        masses=None,
+        fixed: Iterable[str] = (),
+        dt: float = DEFAULT_DT,
+        damping: float = DEFAULT_DAMPING,
+        controller: Callable[[int, float, 'PlaneDynamics'], None] = None,
+        metrics: Metrics = None,
+        contact_floor: float = DEFAULT_CONTACT_FLOOR,
+    ):
+        if contact_floor <= 0:
+            raise ValueError("contact_floor لازم أكبر من صفر")
+        self.names = list(layers.names)
+        n = len(self.names)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        # نسخ – المحاكاة لا تغيّر المجموعة الأصلية
+        self.positions = layers.positions.astype(float, copy=True)
+        self.forces = layers.forces.astype(float, copy=True)
+        self.depths = layers.depths.astype(float, copy=True)
+        self.radii = layers.radii.astype(float, copy=True)
+        self.velocities = np.zeros((n, 3)) if velocities is None else np.array(velocities, dtype=float).reshape(n, 3)
+        self.masses = np.ones(n) if masses is None else np.array(masses, dtype=float).reshape(n)
+        self.fixed = np.zeros(n, dtype=bool)
+        for name in fixed:
+            self.fixed[self._index[name]] = True
+        self.dt = float(dt)
+        self.damping = float(damping)
+        self.contact_floor = float(contact_floor)
+        self.controller = controller
+        self.metrics = metrics or default_metrics()
+        self.step_count = 0
+        self._contacts = None      # تلامس آخر حالة – يُعاد استخدامه لو ما فيش controller يغيّرها
+
+    @classmethod
+    def from_workflow(cls, workflow, names: List[str] = None, **kwargs) -> 'PlaneDynamics':
+        """المحاكاة على طبقات workflow.planes (أو جزء منها) – بدون تغيير الـ workflow"""
+        return cls(workflow.plane_set(names), **kwargs)
+
+    def index(self, name: str) -> int:
+        return self._index[name]
+
+    @property
+    def time(self) -> float:
+        return self.step_count * self.dt
+
+    # ─── التلامس ───
+    def reset_contacts(self) -> None:
+        """بعد تعديل positions / forces / radii مباشرة بين خطوتين"""
+        self._contacts = None
+
+    def contacts(self):
+        """
+        (a, b, قوة التلامس، اتجاه من b إلى a) لأزواج التلامس الحالية فقط
+        قوة التلامس = PlaneLayer.interact لنفس الزوج بت-بت، إلا لو المسافة أقل من
+        contact_floor × (نصف قطر a + نصف قطر b): القسمة تكون على هذا الحد بدل المسافة
+        """
+        a, b = overlapping_pairs(self.positions, self.radii)
+        diff = self.positions[a] - self.positions[b]
+        force = interact_arrays(
+            self.positions[a], self.positions[b],
+            self.forces[a], self.forces[b],
+            self.radii[a], self.radii[b],
+        )
+        distance = _distances(diff)
+        floor = self.contact_floor * (self.radii[a] + self.radii[b])
+        close = distance < floor
+        if close.any():
+            # interact قسم على max(distance, 1e-6) – نعيد القسمة على الحد
+            force = np.where(close, force * np.maximum(distance, 1e-6) / floor, force)
+        direction = diff / np.maximum(distance, 1e-6)[:, None]
+        return a, b, force, direction
+
+    def _loads(self, a: np.ndarray, b: np.ndarray, force: np.ndarray) -> np.ndarray:
+        """الحمل الكلي على كل طبقة = مجموع قوى تلامسها"""
+        n = len(self.names)
+        return np.bincount(a, force, n) + np.bincount(b, force, n)
+
+    def _net_forces(self, a: np.ndarray, b: np.ndarray, force: np.ndarray, direction: np.ndarray) -> np.ndarray:
+        n = len(self.names)
+        push = direction * force[:, None]
+        net = np.empty((n, 3))
+        for k in range(3):
+            net[:, k] = np.bincount(a, push[:, k], n) - np.bincount(b, push[:, k], n)
+        return net
+
+    # ─── الخطوات ───
+    def run(self, steps: int, copy: bool = True) -> Iterator[Dict]:
+        """
+        يتقدم steps خطوة ويرجع حالة كل خطوة بعد التحديث:
+        step, time, positions (N,3), forces (N,), load (N,), pairs (a, b), contact_forces
+        copy=False → positions / forces مشاهدات على الحالة الحية (أسرع، صالحة حتى الخطوة التالية)
+        """
+        for _ in range(steps):
+            with self.metrics.stage(STAGE_DYNAMICS):
+                if self.controller is not None:
+                    self.controller(self.step_count, self.time, self)
+                    self._contacts = None
+                if self._contacts is None:
+                    self._contacts = self.contacts()
+
+                a, b, force, direction = self._contacts
+                moving = ~self.fixed
+                acceleration = self._net_forces(a, b, force, direction) / self.masses[:, None]
+                self.velocities[moving] += acceleration[moving] * self.dt
+                self.velocities[moving] *= 1.0 - self.damping
+                self.velocities[self.fixed] = 0.0
+                self.positions[moving] += self.velocities[moving] * self.dt
+                self.step_count += 1
+
+                # التلامس من جديد في المواقع الجديدة – كل سجل متسق مع مواقعه
+                self._contacts = self.contacts()
+                a, b, force, _ = self._contacts
+                record = {
+                    "step": self.step_count,
+                    "time": self.time,
+                    "positions": self.positions.copy() if copy else self.positions,
+                    "forces": self.forces.copy() if copy else self.forces,
+                    "load": self._loads(a, b, force),
+                    "pairs": (a, b),
+                    "contact_forces": force,
+                }
+            yield record
+
+    # ─── الكتابة للطبقات ───
+    def apply_to(self, planes) -> None:
+        """
+        كتابة المواقع والقوى الحالية في PlaneLayer الأصلية (dict أو AISmartWorkflow)
+        – version يتغير فيسقط كاش قوى الأزواج، والفهرس المكاني يُحدَّث مع الـ workflow
+        """
+        workflow = None if isinstance(planes, dict) else planes
+        layers = planes if workflow is None else workflow.planes
+        for i, name in enumerate(self.names):
+            plane = layers[name]
+            plane.position = self.positions[i]
+            plane.force = float(self.forces[i])
+            if workflow is not None:
+                workflow.plane_index.update(plane)
+
+    def __repr__(self) -> str:
+        return f"PlaneDynamics(n={len(self.names)}, step={self.step_count}, dt={self.dt})"
@@ -0,0 +1,255 @@
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from Plane_Layers import PlaneLayer, _distances
+
+
+# ────────────────────────────────────────────────
+# كل أزواج التداخل دفعة واحدة (spatial hashing بـ NumPy)
+# ────────────────────────────────────────────────
+# الخلية نفسها + 13 خلية مجاورة "للأمام" – كل زوج خلايا يُزار مرة واحدة
+_FORWARD_OFFSETS = [
+    (dx, dy, dz)
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+
+def _expand_ranges(starts: np.ndarray, stops: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """تحويل نطاقات [start, stop) لكل صف إلى أزواج (صف، عنصر)"""
+    counts = np.maximum(stops - starts, 0)
+    total = int(counts.sum())
+    rows = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return rows, np.repeat(starts, counts) + offsets
+
+
+def overlapping_pairs(positions, radii) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    كل الأزواج (i < j) التي تتحقق فيها PlaneLayer.overlaps_with
+    - كل طبقة في خلية واحدة بحجم 2 × أكبر نصف قطر
+    - المقارنة فقط مع نفس الخلية والخلايا المجاورة
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    radii = np.asarray(radii, dtype=float).reshape(len(positions))
+    empty = np.empty(0, dtype=np.intp)
+    if len(positions) < 2:
+        return empty, empty
+
+    cell_size = max(2.0 * float(radii.max()), 1e-6)
+    cells = np.floor(positions / cell_size).astype(np.int64)
+    cells -= cells.min(axis=0) - 1          # هامش خلية لكل اتجاه
+    dims = cells.max(axis=0) + 2
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    n = len(order)
+
+    # نفس الخلية: كل عنصر مع العناصر التي بعده في الترتيب
+    same_stop = np.searchsorted(sorted_keys, sorted_keys, side="right")
+    rows, cols = _expand_ranges(np.arange(1, n + 1), same_stop)
+    firsts, seconds = [rows], [cols]
+
+    for dx, dy, dz in _FORWARD_OFFSETS:
+        neighbour = sorted_keys + (dx * dims[1] + dy) * dims[2] + dz
+        lo = np.searchsorted(sorted_keys, neighbour, side="left")
+        hi = np.searchsorted(sorted_keys, neighbour, side="right")
+        rows, cols = _expand_ranges(lo, hi)
+        firsts.append(rows)
+        seconds.append(cols)
+
+    a = order[np.concatenate(firsts)]
+    b = order[np.concatenate(seconds)]
+    if len(a) == 0:
+        return empty, empty
+    distance = _distances(positions[a] - positions[b])
+    keep = distance <= radii[a] + radii[b]
+    a, b = a[keep], b[keep]
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+# ────────────────────────────────────────────────
+# فهرس شبكة منتظمة (uniform grid) يُحدَّث تدريجيًا
+# ────────────────────────────────────────────────
+class PlaneGridIndex:
+    """
+    فهرس مكاني لطبقات Plane مبني على شبكة منتظمة مفتاحها position و radius
+    - إضافة / تحريك / حذف طبقة بتكلفة عدد الخلايا التي تغطيها فقط
+    - استعلام "من يتداخل مع هذه الطبقة" و "كل الأزواج المتداخلة" بزمن شبه خطي
+    - add_many: فهرسة دفعة كاملة مؤجلة لأول استخدام (حساب الخلايا vectorized)
+    """
+
+    def __init__(self, cell_size: float = None):
+        self.cell_size = float(cell_size) if cell_size else None
+        self._planes: Dict[str, PlaneLayer] = {}
+        self._bounds: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        self._cells: Dict[Tuple[int, int, int], Set[str]] = {}
+        self._pending: List[PlaneLayer] = []
+
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._planes)
+
+    def __contains__(self, name: str) -> bool:
+        self._flush()
+        return name in self._planes
+
+    # ─── حساب الخلايا ───
+    def _cell_range(self, position, radius: float):
+        size = self.cell_size
+        lo = tuple(math.floor((position[k] - radius) / size) for k in range(3))
+        hi = tuple(math.floor((position[k] + radius) / size) for k in range(3))
+        return lo, hi
+
+    @staticmethod
+    def _iter_cells(lo, hi):
+        for cx in range(lo[0], hi[0] + 1):
+            for cy in range(lo[1], hi[1] + 1):
+                for cz in range(lo[2], hi[2] + 1):
+                    yield cx, cy, cz
+
+    # ─── التحديث التدريجي ───
+    def add_many(self, planes: Iterable[PlaneLayer]) -> None:
+        """إضافة دفعة طبقات بنفس نتيجة add لكل واحدة – الفهرسة عند أول استعلام"""
+        self._pending.extend(planes)
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        if self.cell_size is None:
+            self.cell_size = max(pending[0].radius * 2.0, 1e-6)
+
+        # نفس عمليات _cell_range لكن على كل الطبقات مرة واحدة
+        coords = np.array([plane.coords for plane in pending], dtype=float)
+        radii = np.array([plane.radius for plane in pending], dtype=float)[:, None]
+        lows = np.floor((coords - radii) / self.cell_size).astype(np.int64).tolist()
+        highs = np.floor((coords + radii) / self.cell_size).astype(np.int64).tolist()
+        cells = self._cells
+        for plane, lo, hi in zip(pending, lows, highs):
+            name = plane.name
+            if name in self._planes:
+                self.remove(name)
+            lo, hi = tuple(lo), tuple(hi)
+            for key in self._iter_cells(lo, hi):
+                cell = cells.get(key)
+                if cell is None:
+                    cells[key] = {name}
+                else:
+                    cell.add(name)
+            self._planes[name] = plane
+            self._bounds[name] = (lo, hi)
+
+    def add(self, plane: PlaneLayer) -> None:
+        """إضافة طبقة (أو إعادة فهرستها لو كانت موجودة)"""
+        self._flush()
+        if plane.name in self._planes:
+            self.remove(plane.name)
+        if self.cell_size is None:
+            self.cell_size = max(plane.radius * 2.0, 1e-6)
+
+        lo, hi = self._cell_range(plane.coords, plane.radius)
+        for key in self._iter_cells(lo, hi):
+            self._cells.setdefault(key, set()).add(plane.name)
+        self._planes[plane.name] = plane
+        self._bounds[plane.name] = (lo, hi)
+
+    def remove(self, name: str) -> None:
+        self._flush()
+        plane = self._planes.pop(name, None)
+        if plane is None:
+            return
+        lo, hi = self._bounds.pop(name)
+        for key in self._iter_cells(lo, hi):
+            cell = self._cells.get(key)
+            if cell is not None:
+                cell.discard(name)
+                if not cell:
+                    del self._cells[key]
+
+    def update(self, plane: PlaneLayer) -> None:
+        """إعادة فهرسة طبقة بعد تغيير position أو radius من الخارج"""
+        self._flush()
+        lo, hi = self._cell_range(plane.coords, plane.radius)
+        if self._bounds.get(plane.name) == (lo, hi) and self._planes.get(plane.name) is plane:
+            return
+        self.add(plane)
+
+    def move(self, name: str, position: List[float]) -> PlaneLayer:
+        """تحريك طبقة إلى موقع جديد وتحديث الفهرس"""
+        self._flush()
+        plane = self._planes[name]
+        plane.position = position
+        self.update(plane)
+        return plane
+
+    # ─── الاستعلامات ───
+    def query(self, plane: Union[str, PlaneLayer]) -> List[PlaneLayer]:
+        """كل الطبقات المفهرسة التي تتداخل مع هذه الطبقة (بدونها)"""
+        self._flush()
+        if isinstance(plane, str):
+            plane = self._planes[plane]
+        if self.cell_size is None:
+            return []
+
+        lo, hi = self._cell_range(plane.coords, plane.radius)
+        seen: Set[str] = set()
+        result = []
+        for key in self._iter_cells(lo, hi):
+            for name in self._cells.get(key, ()):
+                if name in seen or name == plane.name:
+                    continue
+                seen.add(name)
+                other = self._planes[name]
+                if plane.overlaps_with(other):
+                    result.append(other)
+        return result
+
+    def query_radius(self, position: List[float], radius: float) -> List[PlaneLayer]:
+        """الطبقات التي يتداخل نطاقها مع كرة (position, radius)"""
+        probe = PlaneLayer("__probe__", position, radius=radius)
+        return self.query(probe)
+
+    def pairs(self) -> List[Tuple[str, str]]:
+        """
+        كل الأزواج المتداخلة – كل زوج يُفحص مرة واحدة فقط
+        (في الخلية التي تحتوي بداية تقاطع نطاقي الطبقتين)
+        """
+        self._flush()
+        result = []
+        for key, names in self._cells.items():
+            if len(names) < 2:
+                continue
+            members = sorted(names)
+            for i, name1 in enumerate(members):
+                lo1 = self._bounds[name1][0]
+                for name2 in members[i + 1:]:
+                    lo2 = self._bounds[name2][0]
+                    owner = (max(lo1[0], lo2[0]), max(lo1[1], lo2[1]), max(lo1[2], lo2[2]))
+                    if owner != key:
+                        continue
+                    if self._planes[name1].overlaps_with(self._planes[name2]):
+                        result.append((name1, name2))
+        return result
+
+    @classmethod
+    def from_planes(
+        cls,
+        planes: Union[Dict[str, PlaneLayer], Iterable[PlaneLayer]],
+        cell_size: Optional[float] = None,
+    ) -> 'PlaneGridIndex':
+        if isinstance(planes, dict):
+            planes = planes.values()
+        planes = list(planes)
+        if cell_size is None and planes:
+            # متوسط القطر يعطي خلايا بحجم الطبقة النموذجية
+            cell_size = max(2.0 * float(np.mean([p.radius for p in planes])), 1e-6)
+        index = cls(cell_size)
+        index.add_many(planes)
+        return index
+
+    def __repr__(self) -> str:
+        return f"PlaneGridIndex(n={len(self)}, cells={len(self._cells)}, cell_size={self.cell_size})"
@@ -1,12 +1,32 @@
+import math
+import itertools
 import numpy as np
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+
+# ختم تعديل عام لكل الطبقات – طبقة جديدة بنفس الاسم لا تأخذ أبدًا ختم طبقة قديمة
+_versions = itertools.count(1)
+# الحقول التي تغيّر نتيجة interact / x2_effected
+_PHYSICAL_FIELDS = frozenset(("x", "y", "z", "force", "depth", "radius"))
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    # نسخة مشتقة – الكتابة فيها لن تصل للطبقة، فالأفضل أن تفشل بصوت عالٍ
+    array.flags.writeable = False
+    return array
 
 
 class PlaneLayer:
     """
     كائن طبقة مرجعية فيزيائية ديناميكية – تدعم التفاعل السطحي والنطاق
+    التخزين مضغوط: __slots__ و floats بدل __dict__ ومصفوفتي NumPy لكل طبقة
+    (position و extent تُشتق عند الطلب كمصفوفات للقراءة فقط – plane.position[1] -= d يرفع ValueError،
+     والتعديل بـ plane.position = ... الذي يغيّر version)
+    version يتغير مع أي تعديل في الموقع أو force أو depth أو radius (مفتاح صلاحية للكاش)
     """
 
+    __slots__ = ("name", "x", "y", "z", "force", "depth", "radius", "_extent", "shape_type", "version")
+
     def __init__(
         self,
         name: str,
@@ -17,24 +37,75 @@ class PlaneLayer:
         extent: List[float] = None,
         shape_type: str = "plane",
     ):
-        self.name = name
-        self.position = np.array(position, dtype=float)
-        self.force = float(force)
-        self.depth = float(depth)
-        self.radius = float(radius)
-        self.extent = np.array(extent or [radius*2, radius*2, depth], dtype=float)
-        self.shape_type = shape_type  # "plane", "sphere", "cylinder", ...
+        # object.__setattr__ مباشرة: الإنشاء لا يمر على تتبع التعديل (ختم واحد في النهاية)
+        init = object.__setattr__
+        init(self, "name", name)
+        init(self, "x", float(position[0]))
+        init(self, "y", float(position[1]))
+        init(self, "z", float(position[2]))
+        init(self, "force", float(force))
+        init(self, "depth", float(depth))
+        init(self, "radius", float(radius))
+        # None → يُشتق من radius و depth عند الطلب
+        init(self, "_extent", (float(extent[0]), float(extent[1]), float(extent[2])) if extent is not None and len(extent) else None)
+        init(self, "shape_type", shape_type)  # "plane", "sphere", "cylinder", ...
+        init(self, "version", next(_versions))
+
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        if name in _PHYSICAL_FIELDS:
+            object.__setattr__(self, "version", next(_versions))
+
+    @property
+    def position(self) -> np.ndarray:
+        return _read_only(np.array((self.x, self.y, self.z)))
+
+    @position.setter
+    def position(self, value: List[float]) -> None:
+        init = object.__setattr__
+        init(self, "x", float(value[0]))
+        init(self, "y", float(value[1]))
+        init(self, "z", float(value[2]))
+        init(self, "version", next(_versions))
+
+    @property
+    def coords(self) -> Tuple[float, float, float]:
+        """الموقع كـ tuple بدون إنشاء مصفوفة"""
+        return (self.x, self.y, self.z)
+
+    @property
+    def extent(self) -> np.ndarray:
+        if self._extent is None:
+            return _read_only(np.array((self.radius * 2, self.radius * 2, self.depth)))
+        return _read_only(np.array(self._extent))
+
+    @extent.setter
+    def extent(self, value: List[float]) -> None:
+        self._extent = None if value is None else (float(value[0]), float(value[1]), float(value[2]))
+
+    @property
+    def explicit_extent(self) -> Optional[Tuple[float, float, float]]:
+        """الـ extent الممرر صراحةً، أو None لو يُشتق من radius و depth"""
+        return self._extent
+
+    def distance_to(self, other: 'PlaneLayer') -> float:
+        # نفس ترتيب العمليات في _distances حتى تتطابق النتائج مع PlaneLayerSet بت-بت
+        dx = self.x - other.x
+        dy = self.y - other.y
+        dz = self.z - other.z
+        return math.sqrt(dx * dx + dy * dy + dz * dz)
 
     def interact(self, other: 'PlaneLayer') -> float:
         if other is None:
             return 0.0
 
-        distance = np.linalg.norm(self.position - other.position)
+        distance = self.distance_to(other)
         if distance > self.radius + other.radius:
             return 0.0
 
         overlap = 1 - (distance / (self.radius + other.radius))
-        combined_force = (self.force + other.force) * overlap ** 1.5
+        # overlap ** 1.5 مكتوبة كـ overlap * sqrt(overlap) لتطابق PlaneLayerSet بت-بت
+        combined_force = (self.force + other.force) * (overlap * math.sqrt(overlap))
         effective_distance = max(distance, 1e-6)
 
         return combined_force / effective_distance
@@ -47,15 +118,167 @@ class PlaneLayer:
         return base * 2.0 * (1 + 0.3 * (self.depth / other.depth))
 
     def overlaps_with(self, other: 'PlaneLayer') -> bool:
-        distance = np.linalg.norm(self.position - other.position)
-        return distance <= self.radius + other.radius
+        return self.distance_to(other) <= self.radius + other.radius
 
     def __repr__(self) -> str:
-        pos = self.position.tolist()
+        pos = [self.x, self.y, self.z]
         return f"PlaneLayer({self.name!r}, pos={pos}, force={self.force:.2f}, r={self.radius:.2f})"
 
     def __str__(self) -> str:
-        return f"{self.name} @ {self.position.tolist()} | f={self.force:.2f} | r={self.radius:.2f}"
+        return f"{self.name} @ {[self.x, self.y, self.z]} | f={self.force:.2f} | r={self.radius:.2f}"
+
+
+# ────────────────────────────────────────────────
+# حساب التفاعلات دفعة واحدة (struct-of-arrays)
+# ────────────────────────────────────────────────
+def _distances(diff: np.ndarray) -> np.ndarray:
+    # نفس ترتيب العمليات في PlaneLayer.distance_to حتى تتطابق النتائج بت-بت
+    # (بدون dot/matmul: BLAS قد يستخدم FMA فيختلف آخر bit حسب الجهاز)
+    squared = diff * diff
+    return np.sqrt(squared[..., 0] + squared[..., 1] + squared[..., 2])
+
+
+def interact_arrays(
+    pos_a: np.ndarray,
+    pos_b: np.ndarray,
+    force_a: np.ndarray,
+    force_b: np.ndarray,
+    radius_a: np.ndarray,
+    radius_b: np.ndarray,
+) -> np.ndarray:
+    """نسخة vectorized من PlaneLayer.interact – كل المدخلات قابلة للـ broadcasting"""
+    distance = _distances(np.asarray(pos_a, dtype=float) - np.asarray(pos_b, dtype=float))
+    reach = np.asarray(radius_a, dtype=float) + np.asarray(radius_b, dtype=float)
+    overlap = np.maximum(1 - (distance / reach), 0.0)
+    combined_force = (np.asarray(force_a, dtype=float) + np.asarray(force_b, dtype=float)) * (overlap * np.sqrt(overlap))
+    effective_distance = np.maximum(distance, 1e-6)
+    return np.where(distance > reach, 0.0, combined_force / effective_distance)
+
+
+def x2_effected_arrays(
+    pos_a: np.ndarray,
+    pos_b: np.ndarray,
+    force_a: np.ndarray,
+    force_b: np.ndarray,
+    radius_a: np.ndarray,
+    radius_b: np.ndarray,
+    depth_a: np.ndarray,
+    depth_b: np.ndarray,
+) -> np.ndarray:
+    """نسخة vectorized من PlaneLayer.x2_effected(other)"""
+    base = interact_arrays(pos_a, pos_b, force_a, force_b, radius_a, radius_b)
+    return base * 2.0 * (1 + 0.3 * (np.asarray(depth_a, dtype=float) / np.asarray(depth_b, dtype=float)))
+
+
+class PlaneLayerSet:
+    """
+    مجموعة طبقات مخزنة كمصفوفات (positions (N,3) + forces/depths/radii (N,))
+    لحساب interact و x2_effected لكل الأزواج أو لسلسلة كاملة في تمريرة واحدة
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        positions,
+        forces,
+        depths=None,
+        radii=None,
+    ):
+        self.names = list(names)
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        n = len(self.positions)
+        self.forces = np.asarray(forces, dtype=float).reshape(n)
+        self.depths = np.ones(n) if depths is None else np.asarray(depths, dtype=float).reshape(n)
+        self.radii = np.ones(n) if radii is None else np.asarray(radii, dtype=float).reshape(n)
+        if len(self.names) != n:
+            raise ValueError("عدد الأسماء لا يطابق عدد الطبقات")
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_layers(cls, layers: Union[Dict[str, PlaneLayer], Iterable[PlaneLayer]]) -> 'PlaneLayerSet':
+        """بناء المجموعة من قائمة طبقات أو من dict مثل AISmartWorkflow.planes"""
+        if isinstance(layers, dict):
+            layers = layers.values()
+        layers = list(layers)
+        return cls(
+            names=[layer.name for layer in layers],
+            positions=[layer.coords for layer in layers] if layers else np.empty((0, 3)),
+            forces=[layer.force for layer in layers],
+            depths=[layer.depth for layer in layers],
+            radii=[layer.radius for layer in layers],
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def index(self, names: Union[str, Sequence]) -> Union[int, np.ndarray]:
+        """تحويل اسم (أو قائمة أسماء/أرقام) إلى أرقام صفوف"""
+        if isinstance(names, str):
+            return self._index[names]
+        if isinstance(names, np.ndarray) and names.dtype.kind in "iu":
+            return names.astype(np.intp, copy=False)
+        return np.array([self._index[n] if isinstance(n, str) else int(n) for n in names], dtype=np.intp)
+
+    def layer(self, name: Union[str, int]) -> PlaneLayer:
+        i = self._index[name] if isinstance(name, str) else int(name)
+        return PlaneLayer(
+            self.names[i], self.positions[i].tolist(),
+            force=self.forces[i], depth=self.depths[i], radius=self.radii[i],
+        )
+
+    # ─── أزواج محددة ───
+    def pair_interact(self, a: Sequence, b: Sequence) -> np.ndarray:
+        i, j = self.index(a), self.index(b)
+        return interact_arrays(
+            self.positions[i], self.positions[j],
+            self.forces[i], self.forces[j],
+            self.radii[i], self.radii[j],
+        )
+
+    def pair_x2_effected(self, a: Sequence, b: Sequence) -> np.ndarray:
+        i, j = self.index(a), self.index(b)
+        return x2_effected_arrays(
+            self.positions[i], self.positions[j],
+            self.forces[i], self.forces[j],
+            self.radii[i], self.radii[j],
+            self.depths[i], self.depths[j],
+        )
+
+    # ─── كل الأزواج (N×N) ───
+    def interact_matrix(self) -> np.ndarray:
+        """المصفوفة [i, j] = layer_i.interact(layer_j)"""
+        return interact_arrays(
+            self.positions[:, None, :], self.positions[None, :, :],
+            self.forces[:, None], self.forces[None, :],
+            self.radii[:, None], self.radii[None, :],
+        )
+
+    def x2_effected_matrix(self) -> np.ndarray:
+        """المصفوفة [i, j] = layer_i.x2_effected(layer_j)"""
+        return x2_effected_arrays(
+            self.positions[:, None, :], self.positions[None, :, :],
+            self.forces[:, None], self.forces[None, :],
+            self.radii[:, None], self.radii[None, :],
+            self.depths[:, None], self.depths[None, :],
+        )
+
+    # ─── سلسلة (أزواج متتالية) ───
+    def chain_interact(self, chain: Sequence = None) -> np.ndarray:
+        """interact لكل زوج متتالي في السلسلة (افتراضيًا ترتيب المجموعة نفسها)"""
+        idx = np.arange(len(self)) if chain is None else self.index(chain)
+        return self.pair_interact(idx[:-1], idx[1:])
+
+    def chain_x2_effected(self, chain: Sequence = None) -> np.ndarray:
+        """x2_effected لكل زوج متتالي في السلسلة – نفس نتائج AISmartWorkflow.simulate_chain"""
+        idx = np.arange(len(self)) if chain is None else self.index(chain)
+        return self.pair_x2_effected(idx[:-1], idx[1:])
+
+    def __repr__(self) -> str:
+        return f"PlaneLayerSet(n={len(self)})"
+
 
 # اختبار بسيط عند تشغيل الملف مباشرة
 if __name__ == "__main__":
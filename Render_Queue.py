@@ -0,0 +1,163 @@
+import os
+import time
+import threading
+import functools
+import multiprocessing
+from concurrent.futures import CancelledError, Executor, Future, wait
+from typing import Callable, Dict
+
+
+# ────────────────────────────────────────────────
+# عدد عمال الرندر في الخلفية
+# ────────────────────────────────────────────────
+DEFAULT_MAX_WORKERS = os.cpu_count() or 1
+
+
+def _freeze(value):
+    """تحويل المعاملات (lists / dicts / arrays) لمفتاح قابل للـ hash – لكشف المهام المتطابقة"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if hasattr(value, "tolist"):
+        return _freeze(value.tolist())
+    return value
+
+
+def _copy_outcome(source: Future, target: Future) -> None:
+    if source.cancelled():
+        target.set_exception(CancelledError())
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class RenderQueue:
+    """
+    طابور رندر في الخلفية (worker pool) – add_task لا ينتظر ترميز GIF
+    - submit(fn, *args, output_file=..., **kwargs) يرجع Future فورًا
+    - مهمة مطابقة لمهمة معلقة (نفس الدالة والملف والمعاملات) ترجع نفس الـ Future
+    - مهمتان مختلفتان على نفس الملف تعملان بالترتيب (الثانية بعد انتهاء الأولى)
+    - flush(timeout) ينتظر كل المعلق (بما فيه ما أُضيف أثناء الانتظار)
+    - executor افتراضي: processes بـ spawn (pyplot ليس thread-safe) – fn والمعاملات picklable
+    """
+
+    def __init__(self, max_workers: int = None, use_processes: bool = True, executor: Executor = None):
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self.use_processes = use_processes
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, Future] = {}     # مفتاح المهمة → Future
+        self._latest: Dict[str, Future] = {}        # output_file → آخر مهمة عليه
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    # ─── الإضافة ───
+    def submit(self, fn: Callable, *args, output_file: str, **kwargs) -> Future:
+        """fn(*args, output_file=output_file, **kwargs) في الخلفية"""
+        key = (
+            getattr(fn, "__module__", None), getattr(fn, "__qualname__", repr(fn)),
+            output_file, _freeze(args), _freeze(kwargs),
+        )
+        with self._lock:
+            existing = self._pending.get(key)
+            if existing is not None:
+                self.deduplicated += 1
+                return existing
+            previous = self._latest.get(output_file)
+            future = Future()
+            self._pending[key] = future
+            self._latest[output_file] = future
+            self.submitted += 1
+
+        future.add_done_callback(functools.partial(self._finished, key, output_file))
+        job = functools.partial(fn, *args, output_file=output_file, **kwargs)
+        if previous is None:
+            self._start(job, future)
+        else:
+            previous.add_done_callback(lambda _: self._start(job, future))
+        return future
+
+    def _start(self, job: Callable, future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            inner = self.executor().submit(job)
+        except BaseException as error:      # executor مغلق مثلًا
+            future.set_exception(error)
+            return
+        inner.add_done_callback(lambda done: _copy_outcome(done, future))
+
+    def _finished(self, key: tuple, output_file: str, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+            if self._latest.get(output_file) is future:
+                del self._latest[output_file]
+            if not future.cancelled() and future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    # ─── الانتظار ───
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, timeout: float = None) -> Dict:
+        """انتظار كل المهام المعلقة (أو حتى timeout) – يرجع stats"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                futures = [f for f in self._pending.values() if not f.done()]
+            if not futures:
+                break
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            _, not_done = wait(futures, remaining)
+            if not_done:
+                break
+        return self.stats()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "completed": self.completed,
+                "failed": self.failed,
+                "pending": len(self._pending),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if wait:
+            self.flush()
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+    def __enter__(self) -> 'RenderQueue':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def __repr__(self) -> str:
+        return f"RenderQueue(max_workers={self.max_workers}, pending={self.pending})"
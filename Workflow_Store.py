@@ -0,0 +1,404 @@
+import os
+import json
+import struct
+import tempfile
+import numpy as np
+from typing import Dict, List, Tuple
+
+from Plane_Layers import PlaneLayer, PlaneLayerSet
+from Plane_Index import PlaneGridIndex
+from AI_Smart_Work_flow import AISmartWorkflow
+from Instrumentation import Metrics
+
+
+# ────────────────────────────────────────────────
+# الصيغة: MAGIC + طول الـ header + header JSON + مصفوفات خام محاذاة على 64 byte
+# (npz ملف zip ولا يدعم memory mapping – لذلك صيغة بسيطة خاصة)
+# ────────────────────────────────────────────────
+MAGIC = b"AISWPSTO"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# أنواع المهام في جدول المهام
+TASK_ADD = 0            # add_task
+TASK_PLANE = 1          # add_plane_task
+TASK_OBJECT = 2         # add_object_task
+TASK_GENERIC = 3        # أي شكل آخر – الحقول كلها في الـ header
+
+# flags لكل مهمة (الأعداد الصحيحة ترجع int كما كانت)
+FLAG_IS_PLANE = 1
+FLAG_COMPLEXITY_INT = 2
+FLAG_WEIGHT_INT = 4
+FLAG_FACTOR_INT = 8
+
+_ADD_KEYS = {"name", "complexity", "is_plane", "dependencies", "interacts_with", "interaction_type"}
+_PLANE_KEYS = {"name", "type", "complexity", "is_plane"}
+_PROXY_KEYS = {"weight_kg", "pressure_factor", "deformation_bonus"}
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class _Strings:
+    """جدول نصوص واحد: كل اسم يُخزن مرة ويُشار له برقمه"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def id(self, value) -> int:
+        if value is None:
+            return -1
+        if "\0" in value:
+            raise ValueError(f"اسم يحتوي على NUL لا يمكن تخزينه: {value!r}")
+        return self.ids.setdefault(value, len(self.ids))
+
+    def blob(self) -> np.ndarray:
+        return np.frombuffer("\0".join(self.ids).encode("utf-8"), dtype=np.uint8)
+
+
+def _decode_strings(blob: np.ndarray, count: int) -> List[str]:
+    return bytes(blob).decode("utf-8").split("\0") if count else []
+
+
+def _csr(groups: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(g) for g in groups])
+    values = np.fromiter((v for g in groups for v in g), dtype=np.int32, count=int(offsets[-1]))
+    return offsets, values
+
+
+def _split(offsets: np.ndarray, values: np.ndarray) -> List[List[int]]:
+    values = values.tolist()
+    bounds = offsets.tolist()
+    return [values[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+
+# ────────────────────────────────────────────────
+# قراءة / كتابة الملف
+# ────────────────────────────────────────────────
+def _write(path: str, header: Dict, arrays: Dict[str, np.ndarray]) -> None:
+    layout = {}
+    offset = 0
+    contiguous = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        contiguous[name] = array
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+    header = dict(header, format_version=FORMAT_VERSION, arrays=layout)
+    encoded = json.dumps(header, ensure_ascii=False, default=_plain).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(encoded))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(encoded)))
+            f.write(encoded)
+            f.write(b"\0" * (data_start - f.tell()))
+            for name, array in contiguous.items():
+                f.write(b"\0" * (data_start + layout[name]["offset"] - f.tell()))
+                f.write(array.data)
+        # replace ذري – عملية تقرأ الملف القديم لا ترى ملفًا نصف مكتوب
+        os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def _read(path: str) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """header + كل المصفوفات كـ views على memmap واحد للقراءة فقط (بدون نسخ)"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} ليس ملف workflow / plane set")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length).decode("utf-8"))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"إصدار صيغة غير مدعوم: {header.get('format_version')}")
+
+    data_start = _align(len(MAGIC) + 8 + length)
+    mapped = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = data_start + spec["offset"]
+        arrays[name] = mapped[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+    return header, arrays
+
+
+# ────────────────────────────────────────────────
+# الطبقات
+# ────────────────────────────────────────────────
+def _plane_arrays(planes: List[PlaneLayer], strings: _Strings) -> Dict[str, np.ndarray]:
+    extents = np.full((len(planes), 3), np.nan)
+    for i, plane in enumerate(planes):
+        if plane.explicit_extent is not None:
+            extents[i] = plane.explicit_extent
+    return {
+        "plane_names": np.array([strings.id(p.name) for p in planes], dtype=np.int32),
+        "plane_positions": np.array([p.coords for p in planes], dtype=float).reshape(-1, 3),
+        "plane_forces": np.array([p.force for p in planes], dtype=float),
+        "plane_depths": np.array([p.depth for p in planes], dtype=float),
+        "plane_radii": np.array([p.radius for p in planes], dtype=float),
+        "plane_extents": extents,
+        "plane_shape_types": np.array([strings.id(p.shape_type) for p in planes], dtype=np.int32),
+    }
+
+
+def save_plane_set(plane_set: PlaneLayerSet, path: str) -> None:
+    """حفظ PlaneLayerSet (مصفوفات فقط) – يُحمّل بـ load_plane_set بدون نسخ"""
+    strings = _Strings()
+    n = len(plane_set)
+    arrays = {
+        "plane_names": np.array([strings.id(name) for name in plane_set.names], dtype=np.int32),
+        "plane_positions": plane_set.positions,
+        "plane_forces": plane_set.forces,
+        "plane_depths": plane_set.depths,
+        "plane_radii": plane_set.radii,
+        "plane_extents": np.full((n, 3), np.nan),
+        "plane_shape_types": np.full(n, strings.id("plane"), dtype=np.int32),
+    }
+    arrays["strings"] = strings.blob()
+    _write(path, {"kind": "plane_set", "strings": len(strings.ids), "planes_in_dict": n}, arrays)
+
+
+def load_plane_set(path: str) -> PlaneLayerSet:
+    """
+    PlaneLayerSet مصفوفاته memmap للقراءة فقط (من ملف plane set أو workflow)
+    – بدون نسخ، وعدة processes تقرأ نفس صفحات الملف من الـ page cache
+    """
+    header, arrays = _read(path)
+    strings = _decode_strings(arrays["strings"], header["strings"])
+    n = header["planes_in_dict"]
+    return PlaneLayerSet(
+        names=[strings[i] for i in arrays["plane_names"][:n].tolist()],
+        positions=arrays["plane_positions"][:n],
+        forces=arrays["plane_forces"][:n],
+        depths=arrays["plane_depths"][:n],
+        radii=arrays["plane_radii"][:n],
+    )
+
+
+# ────────────────────────────────────────────────
+# الـ workflow كاملًا
+# ────────────────────────────────────────────────
+def save_workflow(workflow: AISmartWorkflow, path: str) -> None:
+    """
+    حفظ المهام والاعتماديات وقواعد الدمج والطبقات والسلاسل التلقائية في ملف واحد
+    المهام بالشكل المعروف (add_task / add_plane_task / add_object_task) أعمدة في جداول،
+    وأي مهمة بشكل آخر تُحفظ حقولها في الـ header (لازم تكون JSON)
+    """
+    strings = _Strings()
+
+    # الطبقات: planes بترتيبها ثم أي طبقة تشير لها مهمة وليست في planes
+    planes = list(workflow.planes.values())
+    plane_keys = [strings.id(key) for key in workflow.planes]
+    plane_ids = {id(plane): i for i, plane in enumerate(planes)}
+    for task in workflow.tasks:
+        plane = task.get("plane")
+        if plane is not None and id(plane) not in plane_ids:
+            plane_ids[id(plane)] = len(planes)
+            planes.append(plane)
+            plane_keys.append(-1)
+
+    count = len(workflow.tasks)
+    names = np.empty(count, dtype=np.int32)
+    kinds = np.empty(count, dtype=np.int8)
+    flags = np.zeros(count, dtype=np.int8)
+    complexity = np.full(count, np.nan)
+    plane_refs = np.full(count, -1, dtype=np.int32)
+    interacts_with = np.full(count, -1, dtype=np.int32)
+    interaction_type = np.full(count, -1, dtype=np.int32)
+    proxy = np.full((count, 3), np.nan)
+    dependencies = []
+    generic = {}
+
+    for i, task in enumerate(workflow.tasks):
+        task = _plain(task)
+        names[i] = strings.id(task["name"])
+        if task.get("plane") is not None:
+            plane_refs[i] = plane_ids[id(task["plane"])]
+        dependencies.append([strings.id(dep) for dep in _task_dependencies(workflow, task)])
+        keys = set(task) - {"plane"}
+        physics = task.get("physics_proxy")
+
+        if (keys == _PLANE_KEYS and task["type"] == "plane" and task["is_plane"] is True
+                and task.get("plane") is not None and _is_number(task["complexity"])):
+            kinds[i] = TASK_PLANE
+            complexity[i] = task["complexity"]
+            flags[i] |= FLAG_COMPLEXITY_INT if isinstance(task["complexity"], int) else 0
+        elif keys == {"name", "type", "complexity"} and task["type"] == "object" and _is_number(task["complexity"]):
+            kinds[i] = TASK_OBJECT
+            complexity[i] = task["complexity"]
+            flags[i] |= FLAG_COMPLEXITY_INT if isinstance(task["complexity"], int) else 0
+        elif (keys - {"physics_proxy"} == _ADD_KEYS and _is_number(task["complexity"])
+              and (physics is None or (set(physics) == _PROXY_KEYS and all(_is_number(v) for v in physics.values())))):
+            kinds[i] = TASK_ADD
+            complexity[i] = task["complexity"]
+            flags[i] |= FLAG_IS_PLANE if task["is_plane"] else 0
+            flags[i] |= FLAG_COMPLEXITY_INT if isinstance(task["complexity"], int) else 0
+            interacts_with[i] = strings.id(task["interacts_with"])
+            interaction_type[i] = strings.id(task["interaction_type"])
+            if physics is not None:
+                proxy[i] = (physics["weight_kg"], physics["pressure_factor"], physics["deformation_bonus"])
+                flags[i] |= FLAG_WEIGHT_INT if isinstance(physics["weight_kg"], int) else 0
+                flags[i] |= FLAG_FACTOR_INT if isinstance(physics["pressure_factor"], int) else 0
+        else:
+            kinds[i] = TASK_GENERIC
+            generic[str(i)] = {k: v for k, v in task.items() if k not in ("plane", "dependencies")}
+            generic[str(i)]["__has_dependencies__"] = "dependencies" in task
+
+    rules = list(workflow.integration_rules.items())
+    rule_offsets, rule_members = _csr([[strings.id(n) for n in group] for group, _ in rules])
+    chain_offsets, chain_members = _csr([[strings.id(n) for n in chain] for chain in workflow.auto_chains])
+    dep_offsets, dep_members = _csr(dependencies)
+
+    arrays = _plane_arrays(planes, strings)
+    arrays.update({
+        "plane_keys": np.array(plane_keys, dtype=np.int32),
+        "task_names": names,
+        "task_kinds": kinds,
+        "task_flags": flags,
+        "task_complexity": complexity,
+        "task_planes": plane_refs,
+        "task_interacts_with": interacts_with,
+        "task_interaction_type": interaction_type,
+        "task_proxy": proxy,
+        "dependency_offsets": dep_offsets,
+        "dependency_names": dep_members,
+        "rule_offsets": rule_offsets,
+        "rule_names": rule_members,
+        "rule_priorities": np.array([priority for _, priority in rules], dtype=np.int64),
+        "chain_offsets": chain_offsets,
+        "chain_names": chain_members,
+    })
+    arrays["strings"] = strings.blob()
+    header = {
+        "kind": "workflow",
+        "strings": len(strings.ids),
+        "planes_in_dict": len(workflow.planes),
+        "plane_index_cell_size": workflow.plane_index.cell_size,
+        "render_time": workflow.render_time,
+        "grouping_strategy": workflow.grouping_strategy,
+        "generic_tasks": generic,
+    }
+    _write(path, header, arrays)
+
+
+def _task_dependencies(workflow: AISmartWorkflow, task: Dict) -> List[str]:
+    """اعتماديات المهمة كما سُجلت (task["dependencies"] لو موجودة، وإلا من workflow.dependencies)"""
+    if "dependencies" in task:
+        return task["dependencies"]
+    return workflow.dependencies.get(task["name"], [])
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _plain(value):
+    """أرقام NumPy (np.int64 / np.float64 / np.bool_) ومصفوفاته → أنواع Python عادية (dicts و lists بالداخل أيضًا)"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def rebuild_workflow(path: str, metrics: Metrics = None) -> AISmartWorkflow:
+    """
+    إعادة بناء الـ workflow من الملف بدون add_task (لا logging ولا إعادة حساب)
+    نسخة كاملة وليست zero-copy: كل الطبقات والمهام تُبنى ككائنات Python عادية
+    (الزمن يتناسب مع عدد المهام)، والـ memmap يوفر فقط قراءة الملف دفعة واحدة
+    – للطبقات بدون نسخ (views على الملف) استخدم load_plane_set
+    """
+    header, arrays = _read(path)
+    if header.get("kind") != "workflow":
+        raise ValueError(f"{path} ليس ملف workflow")
+    return _build_workflow(header, arrays, metrics)
+
+
+def _build_workflow(header: Dict, arrays: Dict[str, np.ndarray], metrics: Metrics) -> AISmartWorkflow:
+    strings = _decode_strings(arrays["strings"], header["strings"])
+    workflow = AISmartWorkflow(metrics=metrics)
+
+    # ─── الطبقات ───
+    extents = arrays["plane_extents"]
+    has_extent = ~np.isnan(extents).any(axis=1)
+    planes = [
+        PlaneLayer(strings[name], position, force, depth, radius,
+                   extent if flag else None, strings[shape_type])
+        for name, position, force, depth, radius, extent, flag, shape_type in zip(
+            arrays["plane_names"].tolist(), arrays["plane_positions"].tolist(),
+            arrays["plane_forces"].tolist(), arrays["plane_depths"].tolist(),
+            arrays["plane_radii"].tolist(), extents.tolist(), has_extent.tolist(),
+            arrays["plane_shape_types"].tolist(),
+        )
+    ]
+    for plane, key in zip(planes, arrays["plane_keys"].tolist()):
+        if key >= 0:
+            workflow.planes[strings[key]] = plane
+    # الفهرس المكاني يُبنى دفعة واحدة عند أول استعلام
+    workflow.plane_index = PlaneGridIndex(header["plane_index_cell_size"])
+    workflow.plane_index.add_many(workflow.planes.values())
+
+    # ─── المهام ───
+    dependencies = _split(arrays["dependency_offsets"], arrays["dependency_names"])
+    generic = header["generic_tasks"]
+    for i, (name, kind, flag, complexity, plane_ref, other, kind_name, proxy) in enumerate(zip(
+        arrays["task_names"].tolist(), arrays["task_kinds"].tolist(), arrays["task_flags"].tolist(),
+        arrays["task_complexity"].tolist(), arrays["task_planes"].tolist(),
+        arrays["task_interacts_with"].tolist(), arrays["task_interaction_type"].tolist(),
+        arrays["task_proxy"].tolist(),
+    )):
+        deps = [strings[d] for d in dependencies[i]]
+        if flag & FLAG_COMPLEXITY_INT:
+            complexity = int(complexity)
+
+        if kind == TASK_ADD:
+            task = {
+                "name": strings[name],
+                "complexity": complexity,
+                "is_plane": bool(flag & FLAG_IS_PLANE),
+                "dependencies": deps,
+                "interacts_with": strings[other] if other >= 0 else None,
+                "interaction_type": strings[kind_name] if kind_name >= 0 else None,
+            }
+            if plane_ref >= 0:
+                task["plane"] = planes[plane_ref]
+            if not np.isnan(proxy[0]):
+                weight, factor, bonus = proxy
+                task["physics_proxy"] = {
+                    "weight_kg": int(weight) if flag & FLAG_WEIGHT_INT else weight,
+                    "pressure_factor": int(factor) if flag & FLAG_FACTOR_INT else factor,
+                    "deformation_bonus": bonus,
+                }
+        elif kind == TASK_PLANE:
+            task = {"name": strings[name], "type": "plane", "complexity": complexity,
+                    "is_plane": True, "plane": planes[plane_ref]}
+        elif kind == TASK_OBJECT:
+            task = {"name": strings[name], "type": "object", "complexity": complexity}
+        else:
+            task = dict(generic[str(i)])
+            if task.pop("__has_dependencies__"):
+                task["dependencies"] = deps
+            if plane_ref >= 0:
+                task["plane"] = planes[plane_ref]
+        workflow.register_task(task, deps)
+
+    # ─── قواعد الدمج والسلاسل ───
+    for group, priority in zip(_split(arrays["rule_offsets"], arrays["rule_names"]),
+                               arrays["rule_priorities"].tolist()):
+        workflow.set_integration_rule([strings[n] for n in group], priority)
+    workflow.auto_chains = [[strings[n] for n in chain]
+                            for chain in _split(arrays["chain_offsets"], arrays["chain_names"])]
+    workflow.render_time = header["render_time"]
+    workflow.set_grouping_strategy(header.get("grouping_strategy", "priority"))
+    return workflow
@@ -0,0 +1,16 @@
+import os
+import sys
+
+# الموديولات في جذر المستودع (بدون package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_animation_cache(tmp_path, monkeypatch):
+    """كاش الأنيميشن وملفات الإخراج في مجلد مؤقت لكل اختبار (لا ~/.cache ولا جذر المستودع)"""
+    import Animation_Cache
+    monkeypatch.setenv(Animation_Cache.CACHE_DIR_ENV, str(tmp_path / "cache"))
+    monkeypatch.setattr(Animation_Cache, "_default_cache", None)
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,83 @@
+import os
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import Animation_Cache
+import Animations
+from Animation_Cache import AnimationCache, animation_key, default_cache
+from Plane_Layers import PlaneLayer
+
+
+def _file(path, size: int) -> str:
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return str(path)
+
+
+def test_miss_then_hit(tmp_path):
+    cache = AnimationCache(str(tmp_path / "cache"))
+    key = animation_key("chain", chain=["a", "b"], dpi=60)
+    assert not cache.fetch(key, str(tmp_path / "out.gif"))
+
+    cache.store(key, _file(tmp_path / "rendered.gif", 100))
+    assert cache.fetch(key, str(tmp_path / "out.gif"))
+    assert os.path.getsize(tmp_path / "out.gif") == 100
+    # نفس المفتاح بصيغة أخرى → miss
+    assert not cache.fetch(key, str(tmp_path / "out.npy"))
+
+
+def test_key_covers_inputs_and_version(monkeypatch):
+    layers = [PlaneLayer("a", [0.0, 1.0, 0.0], force=2.0)]
+    key = animation_key("pressure", layers, dpi=60)
+    assert animation_key("pressure", layers, dpi=60) == key
+    assert animation_key("pressure", layers, dpi=61) != key
+    assert animation_key("pressure", [PlaneLayer("a", [0.0, 1.0, 0.0], force=2.5)], dpi=60) != key
+    monkeypatch.setattr(Animation_Cache, "CACHE_VERSION", Animation_Cache.CACHE_VERSION + 1)
+    assert animation_key("pressure", layers, dpi=60) != key
+
+
+def test_encoder_settings_change_the_key(monkeypatch):
+    gif = Animations._encoder_settings("a.gif")
+    monkeypatch.setattr(Animations, "GIF_DELTA_FRAMES", not Animations.GIF_DELTA_FRAMES)
+    assert Animations._encoder_settings("a.gif") != gif
+    assert Animations._encoder_settings("a.npy") == {"format": ".npy"}
+
+
+def test_lru_eviction(tmp_path):
+    cache = AnimationCache(str(tmp_path / "cache"), max_bytes=250)
+    for i, name in enumerate("abc"):
+        cache.store(name, _file(tmp_path / f"{name}.gif", 100))
+        path = os.path.join(cache.directory, f"{name}.gif")
+        os.utime(path, (1000 + i, 1000 + i))
+        if name == "b":
+            # "a" استُخدم بعد "b" → "b" هو الأقدم استخدامًا
+            assert cache.fetch("a", str(tmp_path / "hit.gif"))
+            os.utime(os.path.join(cache.directory, "a.gif"), (2000, 2000))
+    assert sorted(os.listdir(cache.directory)) == ["a.gif", "c.gif"]
+    assert cache.size() <= 250
+
+
+def test_store_scans_only_when_over_budget(tmp_path, monkeypatch):
+    cache = AnimationCache(str(tmp_path / "cache"), max_bytes=1000)
+    scans = []
+    original = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or original())
+    for i in range(8):
+        cache.store(f"k{i}", _file(tmp_path / f"k{i}.gif", 100))
+    assert len(scans) == 1          # المسح الأول فقط (800 ≤ 1000)
+    for i in range(8, 12):
+        cache.store(f"k{i}", _file(tmp_path / f"k{i}.gif", 100))
+    assert len(scans) > 1
+    assert cache.size() <= 1000
+
+
+def test_create_chain_animation_uses_cache(tmp_path):
+    assert default_cache().directory == str(tmp_path / "cache")
+    Animations.create_chain_animation(["a", "b"], [0.0, 1.0], [2.0], output_file="first.gif", dpi=30)
+    assert len(os.listdir(default_cache().directory)) == 1
+    Animations.create_chain_animation(["a", "b"], [0.0, 1.0], [2.0], output_file="second.gif", dpi=30)
+    with open("first.gif", "rb") as a, open("second.gif", "rb") as b:
+        assert a.read() == b.read()
+    assert len(os.listdir(default_cache().directory)) == 1
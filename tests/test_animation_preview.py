@@ -0,0 +1,73 @@
+import pytest
+
+import Animation_Preview
+from Animation_Preview import (
+    CHAIN_PREVIEW_LEVELS, _choose, _learn, _report, default_speed, preview_chain_animation,
+)
+
+
+def _fake_plan(costs):
+    return lambda level: {"frames": 10, "predicted_seconds": costs[level["index"]]}
+
+
+LEVELS = [{"index": k} for k in range(4)]
+COSTS = [8.0, 4.0, 2.0, 1.0]
+
+
+@pytest.mark.parametrize("budget, expected", [(100, 0), (8, 0), (5, 1), (2, 2), (1.5, 3), (0.5, 3)])
+def test_choose_picks_the_best_level_within_the_time_budget(budget, expected):
+    index, settings = _choose(LEVELS, _fake_plan(COSTS), budget, None)
+    assert index == expected
+    assert settings["predicted_seconds"] == COSTS[expected]
+
+
+def test_choose_respects_frame_rate():
+    # 10 إطارات بـ 5 إطار/ثانية → لازم تقدير ≤ 2 ثانية
+    index, _ = _choose(LEVELS, _fake_plan(COSTS), None, 5)
+    assert index == 2
+    assert _choose(LEVELS, _fake_plan(COSTS), None, None)[0] == 0
+    with pytest.raises(ValueError):
+        _choose(LEVELS, _fake_plan(COSTS), 0, None)
+    with pytest.raises(ValueError):
+        _choose(LEVELS, _fake_plan(COSTS), None, -1)
+
+
+def test_report_within_budget():
+    settings = {"frames": 10, "predicted_seconds": 1.0}
+    assert _report(0, settings, 1.5, 2.0, None)["within_budget"]
+    assert not _report(0, settings, 2.5, 2.0, None)["within_budget"]
+    assert not _report(0, settings, 1.5, None, 10)["within_budget"]
+    assert _report(0, settings, 1.5, 3.0, 5)["within_budget"]
+    assert _report(0, settings, 99.0, None, None)["within_budget"]
+
+
+def test_speed_is_owned_by_the_caller():
+    assert not hasattr(Animation_Preview, "_speed")
+    first, second = default_speed(), default_speed()
+    _learn(first, "chain", 1.0, 2.0)
+    assert first["chain"] > 1.0 and second["chain"] == 1.0
+    _learn(first, "pressure", 1.0, 0.01)     # نسخة من الكاش – لا تعلم
+    assert first["pressure"] == 1.0
+
+
+def test_preview_chain_animation_uses_the_budget(monkeypatch):
+    rendered = []
+    monkeypatch.setattr(Animation_Preview, "create_chain_animation",
+                        lambda chain, positions, forces, output_file, **options: rendered.append(options))
+    chain, positions, forces = ["p1", "p2"], [0.0, 1.0], [0.5]
+
+    full = preview_chain_animation(chain, positions, forces, time_budget=1e6)
+    assert full["level"] == 0 and full["within_budget"]
+    assert rendered[-1]["dpi"] == CHAIN_PREVIEW_LEVELS[0]["dpi"]
+
+    # ميزانية مستحيلة → أرخص مستوى
+    cheap = preview_chain_animation(chain, positions, forces, time_budget=1e-9)
+    assert cheap["level"] == len(CHAIN_PREVIEW_LEVELS) - 1
+    assert not cheap["within_budget"]
+    assert rendered[-1]["padding_frames"] == CHAIN_PREVIEW_LEVELS[-1]["padding_frames"]
+
+    # معامل سرعة أبطأ يرفع التقدير → مستوى أرخص لنفس الميزانية
+    budget = full["predicted_seconds"] * 1.01
+    assert preview_chain_animation(chain, positions, forces, time_budget=budget)["level"] == 0
+    slow = {"pressure": 1.0, "chain": 2.0}
+    assert preview_chain_animation(chain, positions, forces, time_budget=budget, speed=slow)["level"] > 0
@@ -0,0 +1,31 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pytest
+
+from Plane_Layers import PlaneLayer
+from Animations import create_pressure_animation
+
+
+LAYERS = [
+    PlaneLayer("nest_plane", [0.0, 1.75, 0.0], force=4.5),
+    PlaneLayer("eagle_plane", [0.0, 2.25, 0.0], force=18.0),
+]
+
+
+# المسار الكلاسيكي يستدعي legend بدون labels بعد الإطار 0
+@pytest.mark.filterwarnings("ignore:No artists with labels")
+@pytest.mark.parametrize("dpi", [120, 60, 48])
+def test_fast_path_matches_classic(tmp_path, dpi):
+    frames = {}
+    for fast in (True, False):
+        output = str(tmp_path / f"pressure_{fast}.npy")
+        create_pressure_animation(
+            LAYERS, output_file=output, frames=5, max_pressure_frame=3,
+            dpi=dpi, fast=fast, use_cache=False, profile_samples=120,
+        )
+        frames[fast] = np.load(output)
+    assert frames[True].shape == frames[False].shape
+    assert np.array_equal(frames[True], frames[False])
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from Deformation_Field import PRESSURE_FORCE_SCALE, DeformationField, SurfaceGrid
+from Plane_Layers import PlaneLayer
+
+
+def _brute_force(field: DeformationField, positions, forces, radii) -> np.ndarray:
+    """كل طبقة على الشبكة كاملة (بدون نوافذ)"""
+    grid = field.grid
+    mesh = np.meshgrid(*grid.coords, indexing="ij")
+    total = np.zeros(grid.shape)
+    for position, force, radius in zip(positions, forces, radii):
+        center = np.asarray(position)[grid.axis_index]
+        distance = np.sqrt(sum((m - c) ** 2 for m, c in zip(mesh, center)))
+        half_width = radius * field.footprint_scale
+        falloff = 1 - (distance / half_width) ** field.power_exponent
+        amplitude = force * PRESSURE_FORCE_SCALE * field.max_depth_multiplier
+        total += np.where(distance <= half_width, amplitude * falloff, 0.0)
+    return total
+
+
+@pytest.mark.parametrize("axes,shape", [(("x",), (301,)), (("x", "z"), (121, 97)), (("x", "y", "z"), (31, 27, 23))])
+def test_windowed_depth_equals_full_grid_sum(axes, shape):
+    rng = np.random.default_rng(len(axes))
+    grid = SurfaceGrid(axes, [-6.0] * len(axes), [6.0] * len(axes), shape)
+    field = DeformationField(grid, power_exponent=2.5)
+    # بعض الطبقات على حافة الشبكة أو خارجها جزئيًا / كليًا
+    positions = rng.uniform(-8, 8, (25, 3))
+    forces = rng.uniform(0, 20, 25)
+    radii = rng.uniform(0.2, 1.5, 25)
+
+    expected = _brute_force(field, positions, forces, radii)
+    assert np.count_nonzero(expected) > 0
+    assert np.allclose(field.depth(positions, forces, radii), expected, rtol=1e-12, atol=1e-12)
+
+    out = np.full(grid.shape, 7.0)
+    assert field.depth(positions, forces, radii, out=out) is out
+    assert np.allclose(out, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_frames_scale_the_depth_by_pressure():
+    grid = SurfaceGrid(("x", "z"), (-3.0, -3.0), (3.0, 3.0), (61, 61))
+    field = DeformationField(grid, base=1.0)
+    layers = [PlaneLayer("a", [0.5, 2.0, -0.5], force=8.0), PlaneLayer("b", [-1.0, 2.0, 1.0], force=3.0)]
+    depth = field.layer_depth(layers)
+    pressure = np.array([0.0, 0.25, 1.0])
+    for p, frame in zip(pressure, field.frames(layers, pressure=pressure)):
+        assert np.allclose(frame, 1.0 - p * depth)
@@ -0,0 +1,70 @@
+import asyncio
+
+from AI_Smart_Work_flow import AISmartWorkflow
+from Event_Log import EVENT_STEP, TABLE_ANIMATION, EventLog
+
+
+def _plane_workflow(events: EventLog, count: int) -> AISmartWorkflow:
+    workflow = AISmartWorkflow(events=events)
+    for i in range(count):
+        workflow.add_task(f"p{i}", complexity=1.0, is_plane=True, plane_position=[i * 3.0, 0.0, 0.0],
+                          proxy_weight=2.0 if i % 2 else None)
+    return workflow
+
+
+def test_render_table_survives_capacity_and_rate_limit():
+    events = EventLog(capacity=64, max_per_second=100, sample_every={EVENT_STEP: 7})
+    workflow = _plane_workflow(events, 500)
+
+    workflow.render_sequentially(show_animation_log=False, time_scale=0)
+    rows = workflow.animation_log()
+
+    assert len(rows) == 500
+    assert [row["step"] for row in rows] == [f"p{i}" for i in range(500)]
+    assert rows[1]["weight"] == 2.0 and rows[0]["weight"] is None
+    assert len(events) <= 64
+    assert events.stats()["rate_limited"] > 0
+
+
+def test_render_table_with_disabled_events_and_async():
+    workflow = _plane_workflow(EventLog(enabled=False), 20)
+    expected = workflow.render_sequentially(show_animation_log=False, time_scale=0)
+    assert len(workflow.animation_log()) == 20
+
+    total = asyncio.run(workflow.render_async(show_animation_log=False, time_scale=0))
+    assert total == expected
+    assert len(workflow.animation_log()) == 20
+
+
+def test_event_lines_are_formatted_on_demand():
+    events = EventLog()
+    workflow = _plane_workflow(events, 2)
+    workflow.simulate_chain(["p0", "p1"])
+    lines = events.lines()
+    assert lines[0] == "مهمة مضافة: p0 (complexity=1.0)"
+    assert lines[-1].startswith("p0 → p1 : ")
+
+
+def test_tables_bypass_sampling_rate_limit_and_capacity():
+    events = EventLog(capacity=2, max_per_second=1, burst=1, sample_every={EVENT_STEP: 3}, enabled=False)
+    events.begin_table(TABLE_ANIMATION)
+    for i in range(50):
+        events.record(EVENT_STEP, [f"p{i}"], a=1.0)
+        events.add_row(TABLE_ANIMATION, {"step": f"p{i}"})
+    assert [row["step"] for row in events.table(TABLE_ANIMATION)] == [f"p{i}" for i in range(50)]
+    assert events.stats()["table_rows"] == {TABLE_ANIMATION: 50}
+
+    # begin_table يبدأ من جديد، والنسخة المرجعة لا تغير الجدول
+    events.table(TABLE_ANIMATION).clear()
+    assert len(events.table(TABLE_ANIMATION)) == 50
+    events.begin_table(TABLE_ANIMATION)
+    assert events.table(TABLE_ANIMATION) == []
+    assert events.table("missing") == []
+
+
+def test_workflow_animation_log_reads_the_event_table():
+    events = EventLog(max_per_second=1, burst=1)
+    workflow = _plane_workflow(events, 30)
+    workflow.render_sequentially(show_animation_log=False, time_scale=0)
+    assert workflow.animation_log() == events.table(TABLE_ANIMATION)
+    assert len(workflow.animation_log()) == 30
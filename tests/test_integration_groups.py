@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+import AI_Smart_Work_flow
+from AI_Smart_Work_flow import AISmartWorkflow
+from Integration_Groups import select_groups, task_depths
+from Parallel_Render import build_step_graph, step_time, topological_order
+
+
+def _sequential_time(workflow: AISmartWorkflow) -> float:
+    return sum(step_time(step, workflow.task_index) for step in workflow.optimize_sequence())
+
+
+def _layered(rng: random.Random, layers: int = 4, width: int = 5) -> AISmartWorkflow:
+    workflow = AISmartWorkflow()
+    previous = []
+    for level in range(layers):
+        current = [f"t{level}_{k}" for k in range(width)]
+        for name in current:
+            deps = rng.sample(previous, min(len(previous), rng.randint(1, 2))) if previous else []
+            workflow.add_task(name, complexity=rng.uniform(0.5, 5), dependencies=deps)
+        previous = current
+    return workflow
+
+
+def test_cost_is_never_worse_than_priority():
+    rng = random.Random(11)
+    for _ in range(40):
+        workflow = _layered(rng)
+        depths = task_depths(workflow.task_index, workflow.dependencies)
+        by_depth = {}
+        for name, depth in depths.items():
+            by_depth.setdefault(depth, []).append(name)
+        # قواعد صالحة فقط (نفس العمق) ومتشابكة – priority يأخذ الأولوية لا الربح
+        for _ in range(8):
+            members = rng.sample(by_depth[rng.randrange(len(by_depth))], rng.randint(2, 3))
+            workflow.set_integration_rule(members, priority=rng.randint(1, 4))
+
+        workflow.set_grouping_strategy("priority")
+        priority = _sequential_time(workflow)
+        workflow.set_grouping_strategy("cost")
+        cost = _sequential_time(workflow)
+        assert cost <= priority + 1e-9
+
+
+def test_cost_groups_keep_the_step_graph_acyclic():
+    rng = random.Random(12)
+    for _ in range(40):
+        workflow = _layered(rng)
+        names = list(workflow.task_index)
+        for _ in range(10):
+            workflow.set_integration_rule(rng.sample(names, rng.randint(2, 4)), priority=rng.randint(1, 5))
+        workflow.set_grouping_strategy("cost")
+        sequence = workflow.optimize_sequence()
+        upstream, downstream = build_step_graph(sequence, workflow.dependencies)
+        assert len(topological_order(upstream, downstream)) == len(sequence)
+
+        depths = task_depths(workflow.task_index, workflow.dependencies)
+        for step in sequence:
+            assert len({depths[name] for name in step}) == 1
+        assert sorted(n for step in sequence for n in step) == sorted(names)
+
+
+def test_cost_plan_stays_incremental(monkeypatch):
+    calls = []
+    original = AI_Smart_Work_flow.select_groups
+    monkeypatch.setattr(AI_Smart_Work_flow, "select_groups", lambda *a, **k: calls.append(1) or original(*a, **k))
+
+    workflow = AISmartWorkflow()
+    workflow.set_grouping_strategy("cost")
+    workflow.add_task("a", complexity=2)
+    workflow.add_task("b", complexity=3)
+    workflow.set_integration_rule(["a", "b"], priority=1)
+    assert workflow.optimize_sequence() == [["a", "b"]]
+    assert len(calls) == 1
+
+    # مهمة لا تمس أي قاعدة ولا يعتمد عليها أحد → الخطة المخزنة تُمد فقط
+    workflow.add_task("c", complexity=1, dependencies=["a"])
+    assert workflow.optimize_sequence() == [["a", "b"], ["c"]]
+    assert len(calls) == 1
+
+    # "x" مطلوبة من "b" قبل وجودها → عمق "b" يتغير والمجموعة لم تعد صالحة
+    workflow.add_task("b", complexity=3, dependencies=["x"])
+    workflow.optimize_sequence()
+    workflow.add_task("x", complexity=1)
+    assert workflow.optimize_sequence() == [["a"], ["b"], ["c"], ["x"]]
+    assert len(calls) == 3
+
+
+def test_select_groups_matches_brute_force_on_small_components():
+    rng = random.Random(13)
+    for _ in range(30):
+        workflow = _layered(rng, layers=1, width=7)
+        rules = {}
+        for _ in range(6):
+            rules[tuple(sorted(rng.sample(list(workflow.task_index), rng.randint(2, 3))))] = rng.randint(1, 3)
+        chosen = select_groups(rules, workflow.task_index, workflow.dependencies)
+
+        def saving(groups):
+            return sum(sum(step_time([n], workflow.task_index) for n in g) - step_time(list(g), workflow.task_index)
+                       for g in groups)
+
+        best = 0.0
+        keys = list(rules)
+        for mask in range(1 << len(keys)):
+            picked = [keys[k] for k in range(len(keys)) if mask >> k & 1]
+            members = [n for g in picked for n in g]
+            if len(members) == len(set(members)):
+                best = max(best, saving(picked))
+        assert saving(chosen) == pytest.approx(best)
@@ -0,0 +1,115 @@
+import random
+
+import numpy as np
+import pytest
+
+from AI_Smart_Work_flow import AISmartWorkflow
+from Parallel_Render import (
+    DependencyExecutor,
+    build_step_graph,
+    dry_run,
+    split_conflicting_groups,
+    step_time,
+    strongly_connected_components,
+    topological_order,
+)
+
+
+def _nest_workflow() -> AISmartWorkflow:
+    workflow = AISmartWorkflow()
+    workflow.add_task("nest_base", complexity=3)
+    workflow.add_task("nest_plane", complexity=2, is_plane=True, dependencies=["nest_base"])
+    workflow.add_task("eagle_plane", complexity=4, is_plane=True, dependencies=["nest_plane"])
+    workflow.add_task("fish_body", complexity=5, dependencies=["nest_base", "eagle_plane"])
+    workflow.add_task("x", complexity=1.5, dependencies=["fish_body"])
+    workflow.add_task("y", complexity=2.5, dependencies=["fish_body"])
+    # nest_base + fish_body يحيط بالـ planes (دورة)، و x + y بعدها فقط
+    workflow.set_integration_rule(["nest_base", "fish_body"], priority=1)
+    workflow.set_integration_rule(["x", "y"], priority=2)
+    return workflow
+
+
+def test_split_only_groups_inside_a_cycle():
+    workflow = _nest_workflow()
+    sequence = split_conflicting_groups(workflow.optimize_sequence(), workflow.dependencies)
+
+    assert ["x", "y"] in sequence
+    assert ["nest_base"] in sequence and ["fish_body"] in sequence
+
+    report = dry_run(workflow, workers=1)
+    # فك nest_base + fish_body فقط: (1.1 - 0.88) × (3 + 5) فوق الزمن المتسلسل
+    assert report["total_work"] == pytest.approx(report["sequential_time"] + 0.22 * 8)
+
+
+def test_render_parallel_total_work_matches_split_plan():
+    workflow = _nest_workflow()
+    report = workflow.render_parallel(max_workers=2, time_scale=0)
+    sequence = split_conflicting_groups(workflow.optimize_sequence(), workflow.dependencies)
+    assert report["total_work"] == pytest.approx(sum(step_time(s, workflow.task_index) for s in sequence))
+
+
+def test_task_cycle_raises():
+    with pytest.raises(ValueError):
+        split_conflicting_groups([["a"], ["b"]], {"a": ["b"], "b": ["a"]})
+
+
+def test_strongly_connected_components_matches_reachability():
+    rng = random.Random(7)
+    for _ in range(50):
+        n = rng.randint(1, 25)
+        downstream = [sorted({rng.randrange(n) for _ in range(rng.randint(0, 3))} - {i}) for i in range(n)]
+        reach = []
+        for start in range(n):
+            seen, todo = {start}, [start]
+            while todo:
+                for j in downstream[todo.pop()]:
+                    if j not in seen:
+                        seen.add(j)
+                        todo.append(j)
+            reach.append(seen)
+        expected = {frozenset(j for j in range(n) if j in reach[i] and i in reach[j]) for i in range(n)}
+        assert {frozenset(c) for c in strongly_connected_components(downstream)} == expected
+
+
+def test_split_plan_is_schedulable():
+    workflow = _nest_workflow()
+    sequence = split_conflicting_groups(workflow.optimize_sequence(), workflow.dependencies)
+    upstream, downstream = build_step_graph(sequence, workflow.dependencies)
+    assert len(topological_order(upstream, downstream)) == len(sequence)
+
+
+def test_dry_run_matches_sequential_and_executor():
+    workflow = _nest_workflow()
+    workflow.add_plane_task("extra_plane", [1.0, 0.0, 0.0], 3.0, dependencies=["x"])
+    estimate = dry_run(workflow, workers=2)
+
+    sequential = workflow.render_sequentially(show_animation_log=False, time_scale=0)
+    assert estimate["sequential_time"] == pytest.approx(sequential)
+
+    report = DependencyExecutor(workflow, max_workers=2, time_scale=0).run()
+    assert report["sequential_time"] == pytest.approx(sequential)
+    assert report["total_work"] == pytest.approx(estimate["total_work"])
+    assert report["critical_path"] == pytest.approx(estimate["critical_path"])
+    assert report["makespan"] == pytest.approx(estimate["makespan"])
+    assert report["total_work"] > report["sequential_time"]     # nest_base + fish_body فُكّت
+
+    workflow.render_parallel(max_workers=2, time_scale=0)
+    assert workflow.render_time == pytest.approx(sequential)
+
+
+def test_worker_counts_accept_numpy_integers():
+    workflow = _nest_workflow()
+    plain = dry_run(workflow, workers=2)
+    numpy_count = dry_run(workflow, workers=np.int64(2))
+    assert numpy_count["makespan"] == pytest.approx(plain["makespan"])
+    assert type(numpy_count["workers"]) is int
+
+    many = dry_run(workflow, workers=np.arange(1, 4))
+    assert set(many["makespan"]) == {1, 2, 3}
+    assert many["makespan"][2] == pytest.approx(plain["makespan"])
+
+    report = DependencyExecutor(workflow, max_workers=np.int32(2), time_scale=0).run()
+    assert report["max_workers"] == 2 and report["makespan"] == pytest.approx(plain["makespan"])
+
+    with pytest.raises(TypeError):
+        dry_run(workflow, workers=[2.5])
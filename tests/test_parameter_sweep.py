@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from AI_Smart_Work_flow import AISmartWorkflow
+from Parameter_Sweep import parameter_grid, sweep_task
+
+
+@pytest.fixture(autouse=True)
+def _no_gif(monkeypatch):
+    # الأنيميشن التلقائي للتفاعل ليس جزءًا من المقارنة
+    monkeypatch.setattr(AISmartWorkflow, "animate_interaction", lambda self, *args, **kwargs: None)
+
+
+def _base() -> AISmartWorkflow:
+    workflow = AISmartWorkflow()
+    workflow.add_task("hand", complexity=2)
+    return workflow
+
+
+@pytest.mark.parametrize("is_plane", [True, False])
+@pytest.mark.parametrize("with_position", [True, False])
+def test_sweep_matches_add_task(is_plane, with_position):
+    axes = {
+        "proxy_weight": [4.0, 18.5],
+        "plane_force": [0.0, 7.25],
+        "interaction_force_multiplier": [1.0, 1.7],
+    }
+    if with_position:
+        axes["plane_position"] = [[0.3, 2.1, -0.4], [1.0, 0.0, 0.0]]
+    grid = parameter_grid(**axes)
+    swept = sweep_task(_base(), "cup", 1.5, is_plane=is_plane,
+                       interacts_with="hand", interaction_type="press", **grid)
+
+    for k in range(len(grid["proxy_weight"])):
+        workflow = _base()
+        kwargs = {key: (column[k].tolist() if key == "plane_position" else float(column[k]))
+                  for key, column in grid.items()}
+        workflow.add_task("cup", 1.5, is_plane=is_plane,
+                          interacts_with="hand", interaction_type="press", **kwargs)
+        chain = workflow.auto_chains[-1]
+        assert swept["interaction_force"][k] == workflow.pair_forces([tuple(chain)])[0]
+        assert swept["complexity"][k] == workflow.task_index["cup"]["complexity"]
+        if is_plane:
+            assert swept["plane_force"][k] == workflow.planes["cup"].force
@@ -0,0 +1,58 @@
+import numpy as np
+
+from Plane_Dynamics import PlaneDynamics
+from Plane_Layers import PlaneLayer, PlaneLayerSet
+
+
+def _pair(gap: float, **kwargs) -> PlaneDynamics:
+    layers = PlaneLayerSet.from_layers([
+        PlaneLayer("a", [0.0, 0.0, 0.0], force=6.0),
+        PlaneLayer("b", [gap, 0.0, 0.0], force=4.0),
+    ])
+    return PlaneDynamics(layers, **kwargs)
+
+
+def test_two_plane_contact_pushes_apart():
+    sim = _pair(1.2)
+    a, b, force, _ = sim.contacts()
+    assert (a.tolist(), b.tolist()) == ([0], [1])
+    plane_a, plane_b = PlaneLayer("a", [0.0, 0.0, 0.0], force=6.0), PlaneLayer("b", [1.2, 0.0, 0.0], force=4.0)
+    assert force[0] == plane_a.interact(plane_b)
+
+    records = list(sim.run(40))
+    first, last = records[0], records[-1]
+    assert first["positions"][0, 0] < 0.0 < 1.2 < first["positions"][1, 0]
+    assert last["positions"][1, 0] - last["positions"][0, 0] > 1.2
+    assert np.allclose(last["positions"][:, 1:], 0.0)
+    assert first["load"][0] == first["load"][1] == first["contact_forces"][0]
+
+
+def test_contact_forces_conserve_momentum():
+    rng = np.random.default_rng(5)
+    layers = PlaneLayerSet(
+        names=[f"p{i}" for i in range(30)],
+        positions=rng.uniform(-1.5, 1.5, (30, 3)),
+        forces=rng.uniform(1, 10, 30),
+        radii=rng.uniform(0.3, 0.9, 30),
+    )
+    masses = rng.uniform(0.5, 3.0, 30)
+    sim = PlaneDynamics(layers, masses=masses, damping=0.0)
+    a, b, force, direction = sim.contacts()
+    assert len(a) > 10
+    net = sim._net_forces(a, b, force, direction)
+    assert np.allclose(net.sum(axis=0), 0.0, atol=1e-9 * np.abs(net).sum())
+
+    for _ in sim.run(20):
+        pass
+    momentum = (sim.velocities * masses[:, None]).sum(axis=0)
+    assert np.allclose(momentum, 0.0, atol=1e-9 * np.abs(sim.velocities * masses[:, None]).sum())
+
+
+def test_nearly_coincident_planes_have_bounded_force():
+    sim = _pair(1e-9)
+    _, _, force, _ = sim.contacts()
+    # (6 + 4) × overlap^1.5 ≤ 10، مقسومًا على الحد 0.05 × 2
+    assert force[0] <= 10.0 / (sim.contact_floor * 2.0)
+    record = next(sim.run(1))
+    assert np.all(np.isfinite(record["positions"]))
+    assert np.abs(sim.velocities).max() < 10.0
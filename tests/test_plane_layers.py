@@ -0,0 +1,66 @@
+import math
+
+import numpy as np
+import pytest
+
+from Plane_Layers import PlaneLayer, PlaneLayerSet
+
+
+def _layers(count: int = 40, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    return [
+        PlaneLayer(f"p{i}", rng.uniform(-2, 2, 3).tolist(), force=float(rng.uniform(0, 20)),
+                   depth=float(rng.uniform(0.05, 2)), radius=float(rng.uniform(0.3, 1.5)))
+        for i in range(count)
+    ]
+
+
+def test_batch_results_equal_scalar_methods():
+    layers = _layers()
+    plane_set = PlaneLayerSet.from_layers(layers)
+
+    interact = np.array([[a.interact(b) for b in layers] for a in layers])
+    x2 = np.array([[a.x2_effected(b) for b in layers] for a in layers])
+    assert np.count_nonzero(interact) > len(layers)       # أزواج متداخلة فعلًا
+    assert np.array_equal(plane_set.interact_matrix(), interact)
+    assert np.array_equal(plane_set.x2_effected_matrix(), x2)
+
+    first = [f"p{i}" for i in range(0, 39, 3)]
+    second = [f"p{i}" for i in range(1, 40, 3)]
+    by_name = {layer.name: layer for layer in layers}
+    assert plane_set.pair_interact(first, second).tolist() == \
+        [by_name[a].interact(by_name[b]) for a, b in zip(first, second)]
+    assert plane_set.pair_x2_effected(first, second).tolist() == \
+        [by_name[a].x2_effected(by_name[b]) for a, b in zip(first, second)]
+
+    chain = ["p5", "p2", "p9", "p2", "p30"]
+    assert plane_set.chain_interact(chain).tolist() == \
+        [by_name[a].interact(by_name[b]) for a, b in zip(chain, chain[1:])]
+    assert plane_set.chain_x2_effected(chain).tolist() == \
+        [by_name[a].x2_effected(by_name[b]) for a, b in zip(chain, chain[1:])]
+
+
+def test_scalar_interact_stays_within_rounding_of_power_form():
+    # overlap * sqrt(overlap) بدل overlap ** 1.5: الفرق آخر bits فقط
+    for a in _layers(20, seed=2):
+        for b in _layers(20, seed=3):
+            distance = a.distance_to(b)
+            if distance > a.radius + b.radius:
+                continue
+            overlap = 1 - (distance / (a.radius + b.radius))
+            legacy = (a.force + b.force) * overlap ** 1.5 / max(distance, 1e-6)
+            assert a.interact(b) == pytest.approx(legacy, rel=1e-13, abs=0)
+            assert math.isfinite(a.interact(b))
+
+
+def test_position_is_read_only():
+    plane = PlaneLayer("a", [0.0, 1.0, 0.0], force=2.0)
+    version = plane.version
+    with pytest.raises(ValueError):
+        plane.position[1] -= 0.5
+    with pytest.raises(ValueError):
+        plane.extent[0] = 3.0
+    assert plane.coords == (0.0, 1.0, 0.0) and plane.version == version
+
+    plane.position = [0.0, 0.5, 0.0]
+    assert plane.coords == (0.0, 0.5, 0.0) and plane.version != version
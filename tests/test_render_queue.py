@@ -0,0 +1,88 @@
+import threading
+import time
+
+import numpy as np
+
+import AI_Smart_Work_flow
+from AI_Smart_Work_flow import AISmartWorkflow
+from Render_Queue import RenderQueue
+
+
+def _record(log, tag, gate=None, output_file=None):
+    if gate is not None:
+        gate.wait(5)
+    log.append((tag, output_file))
+    return output_file
+
+
+def test_identical_jobs_share_one_future():
+    log = []
+    gate = threading.Event()
+    with RenderQueue(max_workers=2, use_processes=False) as queue:
+        first = queue.submit(_record, log, [1, np.arange(3)], gate, output_file="a.gif")
+        same = queue.submit(_record, log, [1, np.arange(3)], gate, output_file="a.gif")
+        other_args = queue.submit(_record, log, [2], gate, output_file="a.gif")
+        other_file = queue.submit(_record, log, [1, np.arange(3)], gate, output_file="b.gif")
+        assert same is first
+        assert other_args is not first and other_file is not first
+        gate.set()
+        stats = queue.flush(5)
+    assert stats["submitted"] == 3 and stats["deduplicated"] == 1
+    assert stats["completed"] == 3 and stats["pending"] == 0
+    assert len(log) == 3
+
+
+def test_jobs_on_the_same_file_run_in_order():
+    log = []
+    gate = threading.Event()
+    with RenderQueue(max_workers=4, use_processes=False) as queue:
+        slow = queue.submit(_record, log, "first", gate, output_file="same.gif")
+        fast = queue.submit(_record, log, "second", output_file="same.gif")
+        elsewhere = queue.submit(_record, log, "other", output_file="other.gif")
+        elsewhere.result(5)
+        time.sleep(0.05)
+        # الثانية على نفس الملف لا تبدأ قبل انتهاء الأولى
+        assert not fast.done() and not slow.done()
+        gate.set()
+        queue.flush(5)
+    same = [tag for tag, output in log if output == "same.gif"]
+    assert same == ["first", "second"]
+
+
+def test_flush_waits_for_everything_and_respects_timeout():
+    log = []
+    gate = threading.Event()
+    queue = RenderQueue(max_workers=2, use_processes=False)
+    futures = [queue.submit(_record, log, k, output_file=f"{k}.gif") for k in range(5)]
+    blocked = queue.submit(_record, log, "blocked", gate, output_file="blocked.gif")
+
+    stats = queue.flush(0.05)
+    assert stats["pending"] == 1 and not blocked.done()
+    gate.set()
+    stats = queue.flush()
+    assert stats["pending"] == 0 and stats["completed"] == 6
+    assert all(f.done() for f in futures)
+    queue.shutdown()
+
+
+def test_workflow_routes_interaction_animations_through_the_queue(monkeypatch):
+    calls = []
+
+    def fake_animation(chain, positions, pair_forces, output_file=None, **options):
+        calls.append((tuple(chain), output_file))
+        return output_file
+
+    monkeypatch.setattr(AI_Smart_Work_flow, "create_chain_animation", fake_animation)
+    queue = RenderQueue(max_workers=1, use_processes=False)
+    workflow = AISmartWorkflow(render_queue=queue)
+    monkeypatch.setattr(workflow, "animate_interaction",
+                        lambda *a, **k: (_ for _ in ()).throw(AssertionError("rendered inline")))
+
+    workflow.add_task("a", complexity=1)
+    workflow.add_task("b", complexity=2, interacts_with="a", interaction_type="touch")
+    stats = workflow.wait_for_animations(5)
+
+    assert stats["submitted"] == 1 and stats["completed"] == 1
+    assert len(calls) == 1 and calls[0][1].endswith(".gif")
+    assert all(name in workflow.planes for name in calls[0][0])
+    queue.shutdown()
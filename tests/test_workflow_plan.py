@@ -0,0 +1,71 @@
+import random
+
+from AI_Smart_Work_flow import AISmartWorkflow
+
+
+def _full_plan(workflow: AISmartWorkflow, order, planes):
+    """الخطة من الصفر: planes ثم القواعد بالأولوية ثم الباقي (آخر تعريف لكل اسم هو المعتمد)"""
+    sequence = [[name] for name in order if name in planes]
+    processed = set(planes)
+    for group, _ in sorted(workflow.integration_rules.items(), key=lambda item: item[1]):
+        if all(t in workflow.task_index for t in group) and not any(t in processed for t in group):
+            sequence.append(list(group))
+            processed.update(group)
+    sequence += [[name] for name in order if name not in processed]
+    return sequence
+
+
+def test_incremental_plan_matches_full_recompute():
+    rng = random.Random(4)
+    for _ in range(20):
+        workflow = AISmartWorkflow()
+        order, planes = [], set()
+        for _ in range(60):
+            if rng.random() < 0.2:
+                group = rng.sample([f"t{i}" for i in range(12)], rng.randint(2, 3))
+                workflow.set_integration_rule(group, priority=rng.randint(1, 5))
+            else:
+                name = f"t{rng.randrange(12)}"
+                is_plane = rng.random() < 0.3
+                workflow.add_task(name, complexity=rng.uniform(1, 5), is_plane=is_plane)
+                if name in order and (name in planes) != is_plane:
+                    order.remove(name)          # التحويل ينقل الاسم لنهاية قسمه الجديد
+                if name not in order:
+                    order.append(name)
+                (planes.add if is_plane else planes.discard)(name)
+            if rng.random() < 0.5:
+                assert workflow.optimize_sequence() == _full_plan(workflow, order, planes)
+        assert workflow.optimize_sequence() == _full_plan(workflow, order, planes)
+
+
+def test_switching_plane_flag_moves_the_task():
+    workflow = AISmartWorkflow()
+    workflow.add_task("a", complexity=1)
+    workflow.add_task("b", complexity=1, is_plane=True)
+    workflow.optimize_sequence()
+
+    workflow.add_task("a", complexity=1, is_plane=True)
+    workflow.add_task("b", complexity=1)
+    assert workflow.optimize_sequence() == [["a"], ["b"]]
+    assert workflow._plan_plane_names == {"a"}
+    assert list(workflow._plan_rest) == ["b"]
+
+    workflow.set_integration_rule(["a", "b"], priority=1)
+    workflow.add_task("a", complexity=1)
+    assert workflow.optimize_sequence() == [["a", "b"]]
+
+
+def test_caller_mutation_does_not_touch_the_cache():
+    workflow = AISmartWorkflow()
+    workflow.add_task("p", complexity=1, is_plane=True)
+    workflow.add_task("x", complexity=1)
+    workflow.add_task("y", complexity=1)
+    workflow.set_integration_rule(["x", "y"], priority=1)
+
+    sequence = workflow.optimize_sequence()
+    for step in sequence:
+        step.append("junk")
+    sequence.append(["more"])
+    assert workflow.optimize_sequence() == [["p"], ["x", "y"]]
+    assert workflow._plan_planes == [["p"]]
+    assert workflow._plan_groups == [["x", "y"]]
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from AI_Smart_Work_flow import PLANE_TASK_COMPLEXITY, AISmartWorkflow
+from Parallel_Render import step_time
+
+
+def _expected_total(workflow: AISmartWorkflow) -> float:
+    return sum(step_time(step, workflow.task_index) for step in workflow.optimize_sequence())
+
+
+def test_render_after_interaction_planes():
+    workflow = AISmartWorkflow()
+    workflow.add_task("hand", complexity=2, is_plane=True)
+    workflow.add_task("cup", complexity=1.5, interacts_with="hand", interaction_type="hold")
+    generated = workflow.auto_chains[0]
+    for name in generated:
+        assert workflow.task_index[name]["is_plane"] is True
+        assert workflow.task_index[name]["complexity"] == PLANE_TASK_COMPLEXITY
+
+    total = workflow.render_sequentially(show_animation_log=False, time_scale=0)
+    assert total == pytest.approx(_expected_total(workflow))
+    assert asyncio.run(workflow.render_async(show_animation_log=False, time_scale=0)) == pytest.approx(total)
+    assert [row["step"] for row in workflow.animation_log()][:3] == ["hand", *generated]
+
+
+def test_render_after_add_interactions():
+    workflow = AISmartWorkflow()
+    for i in range(6):
+        workflow.add_task(f"obj{i}", complexity=1 + i, is_plane=True, plane_position=[i * 1.5, 0.0, 0.0])
+    workflow.add_task("rest", complexity=3)
+    result = workflow.add_interactions("touch")
+    assert len(result["chains"]) == 3 and result["skipped"] == 2
+
+    total = workflow.render_sequentially(show_animation_log=False, time_scale=0)
+    assert total == pytest.approx(_expected_total(workflow))
+    assert asyncio.run(workflow.render_async(show_animation_log=False, time_scale=0)) == pytest.approx(total)
+    assert workflow.estimate_render(workers=1)["sequential_time"] == pytest.approx(total)
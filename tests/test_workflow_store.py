@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from AI_Smart_Work_flow import AISmartWorkflow
+from Plane_Index import PlaneGridIndex
+from Plane_Layers import PlaneLayer
+from Workflow_Store import load_plane_set, rebuild_workflow, save_plane_set, save_workflow
+
+
+def _workflow() -> AISmartWorkflow:
+    workflow = AISmartWorkflow()
+    workflow.add_task("nest_base", complexity=3)
+    workflow.add_plane_task("nest_plane", [0.0, 1.75, 0.0], 4.5)
+    workflow.add_plane_task("eagle_plane", [0.0, 2.25, 0.0], 18.0)
+    workflow.add_task("fish_body", complexity=5.5, dependencies=["nest_base"], proxy_weight=12)
+    workflow.add_object_task("rock", complexity=2)
+    workflow.add_task("x", complexity=1.5, dependencies=["fish_body"])
+    workflow.add_task("y", complexity=2, dependencies=["fish_body"])
+    workflow.set_integration_rule(["x", "y"], priority=2)
+    return workflow
+
+
+def _strip_planes(tasks):
+    return [{k: v for k, v in task.items() if k != "plane"} for task in tasks]
+
+
+def test_workflow_round_trip(tmp_path):
+    workflow = _workflow()
+    path = str(tmp_path / "workflow.bin")
+    save_workflow(workflow, path)
+    loaded = rebuild_workflow(path)
+
+    assert _strip_planes(loaded.tasks) == _strip_planes(workflow.tasks)
+    assert [type(t["complexity"]) for t in loaded.tasks if "complexity" in t] == \
+        [type(t["complexity"]) for t in workflow.tasks if "complexity" in t]
+    assert loaded.dependencies == workflow.dependencies
+    assert loaded.integration_rules == workflow.integration_rules
+    assert loaded.auto_chains == workflow.auto_chains
+    assert list(loaded.planes) == list(workflow.planes)
+    for name, plane in workflow.planes.items():
+        assert loaded.planes[name].coords == plane.coords
+        assert loaded.planes[name].force == plane.force
+    assert loaded.optimize_sequence() == workflow.optimize_sequence()
+    assert sorted(loaded.plane_index.pairs()) == sorted(workflow.plane_index.pairs())
+
+
+def test_plane_set_round_trip_is_memory_mapped(tmp_path):
+    workflow = _workflow()
+    path = str(tmp_path / "planes.bin")
+    save_workflow(workflow, path)
+    loaded = load_plane_set(path)
+
+    assert loaded.names == list(workflow.planes)
+    assert np.allclose(loaded.forces, [p.force for p in workflow.planes.values()])
+    # views للقراءة فقط على الملف (بدون نسخ)
+    for array in (loaded.positions, loaded.forces, loaded.radii):
+        assert not array.flags.owndata and not array.flags.writeable
+
+    again = str(tmp_path / "planes2.bin")
+    save_plane_set(loaded, again)
+    reloaded = load_plane_set(again)
+    assert reloaded.names == loaded.names
+    assert np.array_equal(reloaded.positions, loaded.positions)
+
+
+def test_move_after_bulk_add():
+    index = PlaneGridIndex.from_planes([
+        PlaneLayer("a", [0.0, 0.0, 0.0]),
+        PlaneLayer("b", [5.0, 0.0, 0.0]),
+    ])
+    index.move("a", [4.5, 0.0, 0.0])
+    assert index.pairs() == [("a", "b")]
+    assert [p.name for p in index.query("b")] == ["a"]
+
+
+def test_round_trip_with_numpy_fields(tmp_path):
+    workflow = AISmartWorkflow()
+    workflow.add_task("a", complexity=np.int64(3))
+    workflow.add_task("b", complexity=np.float64(2.5), dependencies=["a"],
+                      proxy_weight=np.int64(12), proxy_pressure_factor=np.float32(1.5))
+    workflow.add_object_task("rock", complexity=np.int32(4))
+    workflow.add_plane_task("p", [0.0, 1.0, 0.0], np.float64(3.0), complexity=np.int64(2))
+    workflow.register_task({"name": "custom", "complexity": np.float64(1.25), "tags": np.arange(3)}, ["a"])
+
+    path = str(tmp_path / "numpy.bin")
+    save_workflow(workflow, path)
+    loaded = rebuild_workflow(path)
+
+    assert loaded.task_index["a"]["complexity"] == 3 and type(loaded.task_index["a"]["complexity"]) is int
+    assert type(loaded.task_index["rock"]["complexity"]) is int
+    assert type(loaded.task_index["p"]["complexity"]) is int
+    proxy = loaded.task_index["b"]["physics_proxy"]
+    assert proxy["weight_kg"] == 12 and type(proxy["weight_kg"]) is int
+    assert proxy["pressure_factor"] == 1.5
+    assert loaded.task_index["b"]["complexity"] == pytest.approx(workflow.task_index["b"]["complexity"])
+    assert loaded.task_index["custom"] == {"name": "custom", "complexity": 1.25, "tags": [0, 1, 2]}
+    assert loaded.render_sequentially(show_animation_log=False, time_scale=0) == \
+        pytest.approx(workflow.render_sequentially(show_animation_log=False, time_scale=0))